@@ -14,19 +14,320 @@ Cumple requisitos:
 
 import os
 import sys
+import csv
+import bisect
+import calendar
+import functools
+import itertools
 import sqlite3
 from sqlite3 import Error
 from datetime import datetime, timedelta
-import openpyxl
+from conexiones import conexion, en_transaccion, version_datos
+from cache import CacheLRU
+import instrumentacion
 
 DB_FILE = "34.db"
 TURNOS = ("M", "V", "N")  # Mañana, Tarde, Noche
+_TURNO_NORMALIZADO = {v: t for t in TURNOS for v in (t, t.lower())}  # evita strip().upper() por solicitud
+ESQUEMA_VERSION = 5  # se guarda en PRAGMA user_version
+TAMANO_BLOQUE = 5000  # filas por página al recorrer resultados grandes (exportaciones)
+TAMANO_PAGINA = 25  # filas por página en la vista de terminal
+ACEPTADA, CONFLICTO, INVALIDA = "aceptada", "conflicto", "invalida"  # estados del registro por lote
+ELIMINADA, NO_ENCONTRADA, FUERA_DE_PLAZO = "eliminada", "no_encontrada", "fuera_de_plazo"  # de cancelar_reservacion
+DIAS_RETENCION = 180  # por defecto se archivan reservaciones de hace más de estos días
+TAMANO_CACHE_FECHAS = 4096  # textos de fecha ya convertidos a ISO
+TAMANO_CACHE = 256  # entradas (fechas consultadas + catálogo de salas) en la caché LRU
+ENCABEZADOS = ['Folio', 'Cliente', 'SalaClave', 'SalaNombre', 'Horario', 'Fecha', 'Evento']
+
+
+def _migracion_v1(mi_cursor):
+    """
+    v1: índice único por espacio (fecha, sala_clave, horario). El índice por cliente lo crea v4.
+    Si hay duplicados se avisa una vez y queda el índice no único ix_reservaciones_espacio, que marca
+    la restricción como pendiente; se reintenta con completar_restriccion_unica (cli.py mantenimiento).
+    """
+    mi_cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_reservaciones_espacio
+        ON Reservaciones (fecha, sala_clave, horario)""")
+    duplicados = _crear_restriccion_unica(mi_cursor)
+    if duplicados:
+        print("No se pudo crear la restricción única: hay reservaciones duplicadas.")
+        for fecha, sala_clave, horario, n in duplicados:
+            print(f"- Sala {sala_clave}, fecha {fecha}, turno {horario}: {n} reservaciones")
+        print("Resuélvelas y ejecuta 'cli.py mantenimiento' para crearla.")
+
+
+def _crear_restriccion_unica(mi_cursor):
+    """
+    Cambia ix_reservaciones_espacio por el índice único ux_reservaciones_espacio.
+    Devuelve los espacios duplicados [(fecha, sala_clave, horario, n)] que lo impiden (vacío si se creó).
+    """
+    mi_cursor.execute("""
+        SELECT fecha, sala_clave, horario, COUNT(*)
+        FROM Reservaciones
+        GROUP BY fecha, sala_clave, horario
+        HAVING COUNT(*) > 1
+    """)
+    duplicados = mi_cursor.fetchall()
+    if duplicados:
+        return duplicados  # se queda el índice no único
+    mi_cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_reservaciones_espacio
+        ON Reservaciones (fecha, sala_clave, horario)""")
+    mi_cursor.execute("DROP INDEX ix_reservaciones_espacio")
+    return []
+
+
+def _migracion_v2(mi_cursor):
+    """
+    v2: tablas de ocupación pre-agregadas, mantenidas por triggers en cada INSERT/DELETE/UPDATE
+    de Reservaciones. Si las tablas no existían se llenan a partir de los datos actuales.
+    """
+    mi_cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'OcupacionDiaria'")
+    existia = mi_cursor.fetchone() is not None
+    mi_cursor.execute("""
+        CREATE TABLE IF NOT EXISTS OcupacionDiaria (
+            fecha TEXT NOT NULL,
+            sala_clave INTEGER NOT NULL,
+            horario TEXT NOT NULL,
+            reservadas INTEGER NOT NULL,
+            PRIMARY KEY (fecha, sala_clave, horario)
+        ) WITHOUT ROWID""")
+    mi_cursor.execute("""
+        CREATE TABLE IF NOT EXISTS OcupacionMensual (
+            mes TEXT NOT NULL,          -- YYYY-MM
+            sala_clave INTEGER NOT NULL,
+            horario TEXT NOT NULL,
+            reservadas INTEGER NOT NULL,
+            PRIMARY KEY (mes, sala_clave, horario)
+        ) WITHOUT ROWID""")
+    for nombre, evento, cuerpo in (
+        ("tr_ocupacion_insert", "AFTER INSERT ON Reservaciones", _SQL_SUMAR_OCUPACION.format(r="NEW")),
+        ("tr_ocupacion_delete", "AFTER DELETE ON Reservaciones", _SQL_RESTAR_OCUPACION.format(r="OLD")),
+        ("tr_ocupacion_update", "AFTER UPDATE OF fecha, sala_clave, horario ON Reservaciones",
+         _SQL_RESTAR_OCUPACION.format(r="OLD") + _SQL_SUMAR_OCUPACION.format(r="NEW")),
+    ):
+        mi_cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {evento} BEGIN {cuerpo} END")
+    if not existia:
+        _reconstruir_ocupacion(mi_cursor)
+
+
+_SQL_SUMAR_OCUPACION = """
+    INSERT INTO OcupacionDiaria (fecha, sala_clave, horario, reservadas)
+        VALUES ({r}.fecha, {r}.sala_clave, {r}.horario, 1)
+        ON CONFLICT (fecha, sala_clave, horario) DO UPDATE SET reservadas = reservadas + 1;
+    INSERT INTO OcupacionMensual (mes, sala_clave, horario, reservadas)
+        VALUES (substr({r}.fecha, 1, 7), {r}.sala_clave, {r}.horario, 1)
+        ON CONFLICT (mes, sala_clave, horario) DO UPDATE SET reservadas = reservadas + 1;
+"""
+_SQL_RESTAR_OCUPACION = """
+    UPDATE OcupacionDiaria SET reservadas = reservadas - 1
+        WHERE fecha = {r}.fecha AND sala_clave = {r}.sala_clave AND horario = {r}.horario;
+    UPDATE OcupacionMensual SET reservadas = reservadas - 1
+        WHERE mes = substr({r}.fecha, 1, 7) AND sala_clave = {r}.sala_clave AND horario = {r}.horario;
+"""
+
+
+def _reconstruir_ocupacion(mi_cursor):
+    mi_cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ReservacionesArchivo'")
+    fuente = "Reservaciones"
+    if mi_cursor.fetchone():
+        fuente = """(SELECT fecha, sala_clave, horario FROM Reservaciones
+                     UNION ALL SELECT fecha, sala_clave, horario FROM ReservacionesArchivo)"""
+    mi_cursor.execute("DELETE FROM OcupacionDiaria")
+    mi_cursor.execute("DELETE FROM OcupacionMensual")
+    mi_cursor.execute(f"""
+        INSERT INTO OcupacionDiaria (fecha, sala_clave, horario, reservadas)
+        SELECT fecha, sala_clave, horario, COUNT(*) FROM {fuente} GROUP BY fecha, sala_clave, horario""")
+    mi_cursor.execute(f"""
+        INSERT INTO OcupacionMensual (mes, sala_clave, horario, reservadas)
+        SELECT substr(fecha, 1, 7), sala_clave, horario, COUNT(*)
+        FROM {fuente} GROUP BY substr(fecha, 1, 7), sala_clave, horario""")
+
+
+def _migracion_v3(mi_cursor):
+    """
+    v3: ReservacionesArchivo para reservaciones pasadas, con los mismos índices que Reservaciones.
+    Sus triggers suman/restan ocupación, así que mover una fila al archivo no altera las estadísticas.
+    """
+    mi_cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ReservacionesArchivo (
+            folio INTEGER PRIMARY KEY,
+            cliente_clave INTEGER NOT NULL,
+            sala_clave INTEGER NOT NULL,
+            nombre TEXT NOT NULL,
+            horario TEXT NOT NULL,
+            fecha TEXT NOT NULL,
+            FOREIGN KEY(cliente_clave) REFERENCES Usuarios(clave),
+            FOREIGN KEY(sala_clave) REFERENCES Salas(clave)
+        )""")
+    mi_cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_archivo_espacio
+        ON ReservacionesArchivo (fecha, sala_clave, horario)""")
+    mi_cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_ocupacion_archivo_insert AFTER INSERT ON ReservacionesArchivo
+        BEGIN {_SQL_SUMAR_OCUPACION.format(r="NEW")} END""")
+    mi_cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_ocupacion_archivo_delete AFTER DELETE ON ReservacionesArchivo
+        BEGIN {_SQL_RESTAR_OCUPACION.format(r="OLD")} END""")
+
+
+def _migracion_v4(mi_cursor):
+    """
+    v4: índices (cliente_clave, fecha) en Reservaciones y ReservacionesArchivo para el historial por
+    cliente: separan próximas y pasadas con un rango y las entregan ya ordenadas por fecha.
+    Sustituyen a los índices sólo por cliente_clave, que quedan cubiertos por su prefijo.
+    """
+    mi_cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_reservaciones_cliente_fecha
+        ON Reservaciones (cliente_clave, fecha)""")
+    mi_cursor.execute("""
+        CREATE INDEX IF NOT EXISTS ix_archivo_cliente_fecha
+        ON ReservacionesArchivo (cliente_clave, fecha)""")
+    mi_cursor.execute("DROP INDEX IF EXISTS ix_reservaciones_cliente")
+    mi_cursor.execute("DROP INDEX IF EXISTS ix_archivo_cliente")
+
+
+_SQL_FILA_BUSQUEDA = """
+    SELECT {r}.folio, {r}.nombre,
+           (SELECT nombre FROM Usuarios WHERE clave = {r}.cliente_clave),
+           (SELECT nombre FROM Salas WHERE clave = {r}.sala_clave)
+"""
+_TRIGGERS_BUSQUEDA = (
+    ("tr_busqueda_insert", "AFTER INSERT ON Reservaciones",
+     "INSERT INTO Busqueda (rowid, evento, cliente, sala) " + _SQL_FILA_BUSQUEDA.format(r="NEW") + ";"),
+    # al archivar, la fila pasa primero a ReservacionesArchivo: entonces se conserva en el índice
+    ("tr_busqueda_delete", "AFTER DELETE ON Reservaciones",
+     "DELETE FROM Busqueda WHERE rowid = OLD.folio"
+     " AND NOT EXISTS (SELECT 1 FROM ReservacionesArchivo WHERE folio = OLD.folio);"),
+    ("tr_busqueda_update", "AFTER UPDATE OF nombre, cliente_clave, sala_clave ON Reservaciones",
+     "DELETE FROM Busqueda WHERE rowid = OLD.folio;"
+     " INSERT INTO Busqueda (rowid, evento, cliente, sala) " + _SQL_FILA_BUSQUEDA.format(r="NEW") + ";"),
+    ("tr_busqueda_archivo_insert", "AFTER INSERT ON ReservacionesArchivo",
+     "INSERT INTO Busqueda (rowid, evento, cliente, sala) " + _SQL_FILA_BUSQUEDA.format(r="NEW")
+     + " WHERE NOT EXISTS (SELECT 1 FROM Busqueda WHERE rowid = NEW.folio);"),
+    ("tr_busqueda_archivo_delete", "AFTER DELETE ON ReservacionesArchivo",
+     "DELETE FROM Busqueda WHERE rowid = OLD.folio;"),
+    ("tr_busqueda_usuario", "AFTER UPDATE OF nombre ON Usuarios",
+     "UPDATE Busqueda SET cliente = NEW.nombre WHERE rowid IN ("
+     "SELECT folio FROM Reservaciones WHERE cliente_clave = NEW.clave"
+     " UNION ALL SELECT folio FROM ReservacionesArchivo WHERE cliente_clave = NEW.clave);"),
+    ("tr_busqueda_sala", "AFTER UPDATE OF nombre ON Salas",
+     "UPDATE Busqueda SET sala = NEW.nombre WHERE rowid IN ("
+     "SELECT folio FROM Reservaciones WHERE sala_clave = NEW.clave"
+     " UNION ALL SELECT folio FROM ReservacionesArchivo WHERE sala_clave = NEW.clave);"),
+)
+
+
+def _migracion_v5(mi_cursor):
+    """
+    v5: índice de texto completo (FTS5) Busqueda(evento, cliente, sala) con rowid = folio,
+    sobre reservaciones vigentes y archivadas, mantenido por triggers. Sin acentos ni mayúsculas
+    (unicode61 remove_diacritics) y con índices de prefijo para buscar mientras se escribe.
+    Si el SQLite instalado no trae FTS5 se avisa, la búsqueda usa LIKE y devuelve False para que
+    user_version no avance y el índice se cree en un arranque posterior.
+    """
+    mi_cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Busqueda'")
+    existia = mi_cursor.fetchone() is not None
+    try:
+        mi_cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS Busqueda USING fts5(
+                evento, cliente, sala,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )""")
+    except sqlite3.OperationalError as e:
+        print("No se creó el índice de búsqueda (FTS5 no disponible):", e)
+        return False
+    for nombre, evento, cuerpo in _TRIGGERS_BUSQUEDA:
+        mi_cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {evento} BEGIN {cuerpo} END")
+    if not existia:
+        _reconstruir_busqueda(mi_cursor)
+    return True
+
+
+def _reconstruir_busqueda(mi_cursor):
+    mi_cursor.execute("DELETE FROM Busqueda")
+    for tabla in ("Reservaciones", "ReservacionesArchivo"):
+        mi_cursor.execute("INSERT INTO Busqueda (rowid, evento, cliente, sala) "
+                          + _SQL_FILA_BUSQUEDA.format(r="r") + f" FROM {tabla} r")
+
+
+_MIGRACIONES = (_migracion_v1, _migracion_v2, _migracion_v3, _migracion_v4, _migracion_v5)
+
+
+def _migrar_esquema(conn):
+    """
+    Actualiza en sitio una base existente hasta ESQUEMA_VERSION (ver _migracion_vN).
+    Una migración que devuelve False queda pendiente: user_version se queda en la anterior y se
+    reintenta en el siguiente arranque; las posteriores se aplican de todos modos.
+    """
+    mi_cursor = conn.cursor()
+    version = mi_cursor.execute("PRAGMA user_version").fetchone()[0]
+    nueva = ESQUEMA_VERSION
+    for numero, migracion in enumerate(_MIGRACIONES, start=1):
+        if version < numero and migracion(mi_cursor) is False:
+            nueva = min(nueva, numero - 1)
+    mi_cursor.execute(f"PRAGMA user_version = {nueva}")
+
+
+def completar_restriccion_unica():
+    """
+    Reintenta el índice único por espacio que v1 dejó pendiente por duplicados.
+    Devuelve los espacios que siguen duplicados (vacío si ya existe el índice único).
+    """
+    def operacion(conn):
+        mi_cursor = conn.cursor()
+        mi_cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ix_reservaciones_espacio'")
+        if mi_cursor.fetchone() is None:
+            return []
+        return _crear_restriccion_unica(mi_cursor)
+    return en_transaccion(DB_FILE, operacion)
+
+
+_cache = CacheLRU(maximo=TAMANO_CACHE)
+_versiones_datos = {}  # DB_FILE -> version_datos() con la que se llenaron sus entradas
+
+
+def _en_cache(clave, calcular):
+    """
+    _cache.obtener(clave, calcular), pero antes descarta las entradas de DB_FILE si la base cambió
+    desde la última consulta. Las invalidaciones puntuales sólo cubren las escrituras de este proceso;
+    data_version también detecta las de la CLI, el servicio, importar.py u otra terminal.
+    """
+    version = version_datos(DB_FILE)
+    if _versiones_datos.get(DB_FILE) != version:
+        _cache.invalidar_si(lambda c: c[0] == DB_FILE)
+        _versiones_datos[DB_FILE] = version
+    return _cache.obtener(clave, calcular)
+
+
+def invalidar_cache_fecha(fecha_iso):
+    """Descarta la disponibilidad y el reporte en caché de una fecha (tras reservar, modificar o eliminar)."""
+    _cache.invalidar((DB_FILE, "disponibilidad", fecha_iso))
+    _cache.invalidar((DB_FILE, "reporte", fecha_iso))
+    _cache.invalidar((DB_FILE, "ocupadas", fecha_iso))
+
+
+def invalidar_cache_salas():
+    """Descarta el catálogo de salas y toda la disponibilidad en caché (una sala nueva está libre en todas las fechas)."""
+    _cache.invalidar_si(lambda c: c[0] == DB_FILE and c[1] in ("salas", "capacidad", "disponibilidad"))
+
+
+def limpiar_cache():
+    """Vacía la caché de consultas (p. ej. para medir el costo real de la base)."""
+    _cache.limpiar()
+
+
+def estadisticas_cache():
+    """Aciertos, fallos y desalojos de la caché de consultas."""
+    return _cache.estadisticas()
 
 
 def Crear_tabla():
     """Crea las tablas necesarias con claves autoincrement y restricciones."""
     try:
-        with sqlite3.connect(DB_FILE) as conn:
+        with conexion(DB_FILE) as conn:
             mi_cursor = conn.cursor()
             # Usuarios
             mi_cursor.execute("""
@@ -53,6 +354,7 @@ def Crear_tabla():
                     FOREIGN KEY(cliente_clave) REFERENCES Usuarios(clave),
                     FOREIGN KEY(sala_clave) REFERENCES Salas(clave)
                 );""")
+            _migrar_esquema(conn)
             conn.commit()
             print("Tablas creadas o ya existentes (OK).")
     except Error as e:
@@ -61,6 +363,19 @@ def Crear_tabla():
         print("Se produjo el siguiente error:", e)
 
 
+def preparar_base():
+    """
+    Ejecuta Crear_tabla sólo si el esquema no está en ESQUEMA_VERSION (PRAGMA user_version).
+    Devuelve True si se ejecutó el DDL.
+    """
+    with conexion(DB_FILE) as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version == ESQUEMA_VERSION:
+        return False
+    Crear_tabla()
+    return True
+
+
 def es_fecha_valida_str(fecha_str):
     try:
         dt = datetime.strptime(fecha_str, "%d/%m/%Y")
@@ -69,6 +384,17 @@ def es_fecha_valida_str(fecha_str):
         return None
 
 
+def agregar_cliente(nombre):
+    """Inserta un cliente y devuelve su clave. Lanza ValueError si el nombre está vacío."""
+    nombre = (nombre or "").strip()
+    if not nombre:
+        raise ValueError("El nombre del usuario no puede estar vacío.")
+    with conexion(DB_FILE) as conn:
+        mi_cursor = conn.cursor()
+        mi_cursor.execute("INSERT INTO Usuarios (nombre) VALUES (?)", (nombre,))
+        return mi_cursor.lastrowid
+
+
 def Registrar_Cliente():
     while True:
         Usuario = input("Ingresa el nombre del cliente (Escribe SALIR para regresar): ").strip()
@@ -78,20 +404,35 @@ def Registrar_Cliente():
             print("El nombre del usuario no puede estar vacío.")
             continue
         try:
-            with sqlite3.connect(DB_FILE) as conn:
-                mi_cursor = conn.cursor()
-                mi_cursor.execute("INSERT INTO Usuarios (nombre) VALUES (?)", (Usuario,))
-                conn.commit()
-                clave = mi_cursor.lastrowid
-                print("Usuario registrado!")
-                print(f"Tu clave de usuario es: {clave}")
-                return
+            clave = agregar_cliente(Usuario)
+            print("Usuario registrado!")
+            print(f"Tu clave de usuario es: {clave}")
+            return
         except Error as e:
             print("Error al registrar usuario:", e)
         except Exception as e:
             print("Surgió una falla siendo esta la causa:", e)
 
 
+def agregar_sala(nombre, capacidad):
+    """Inserta una sala y devuelve su clave. Lanza ValueError si el nombre está vacío o la capacidad no es > 0."""
+    nombre = (nombre or "").strip()
+    if not nombre:
+        raise ValueError("El nombre de la sala no puede estar vacío.")
+    try:
+        capacidad = int(capacidad)
+    except (TypeError, ValueError):
+        raise ValueError("Introduce un número válido para la capacidad.")
+    if capacidad <= 0:
+        raise ValueError("La capacidad debe ser mayor que cero.")
+    with conexion(DB_FILE) as conn:
+        mi_cursor = conn.cursor()
+        mi_cursor.execute("INSERT INTO Salas (nombre, capacidad) VALUES (?, ?)", (nombre, capacidad))
+        clave = mi_cursor.lastrowid
+    invalidar_cache_salas()
+    return clave
+
+
 def Registrar_Sala():
     while True:
         SALA = input("¿Cómo se va a llamar la sala? (Escribe SALIR para regresar): ").strip()
@@ -111,14 +452,10 @@ def Registrar_Sala():
             continue
 
         try:
-            with sqlite3.connect(DB_FILE) as conn:
-                mi_cursor = conn.cursor()
-                mi_cursor.execute("INSERT INTO Salas (nombre, capacidad) VALUES (?, ?)", (SALA, capacity))
-                conn.commit()
-                clave = mi_cursor.lastrowid
-                print("Sala registrada!")
-                print(f"Tu clave de la sala es: {clave}")
-                return
+            clave = agregar_sala(SALA, capacity)
+            print("Sala registrada!")
+            print(f"Tu clave de la sala es: {clave}")
+            return
         except Error as e:
             print("Error al registrar sala:", e)
         except Exception as e:
@@ -126,19 +463,96 @@ def Registrar_Sala():
 
 
 def listar_salas():
-    with sqlite3.connect(DB_FILE) as conn:
-        mi_cursor = conn.cursor()
-        mi_cursor.execute("SELECT clave, nombre, capacidad FROM Salas ORDER BY clave")
-        return mi_cursor.fetchall()
+    def consultar():
+        with conexion(DB_FILE) as conn:
+            mi_cursor = conn.cursor()
+            mi_cursor.execute("SELECT clave, nombre, capacidad FROM Salas ORDER BY clave")
+            return tuple(mi_cursor.fetchall())
+    return list(_en_cache((DB_FILE, "salas"), consultar))
+
+
+class IndiceCapacidad:
+    """
+    Catálogo de salas ordenado por capacidad (y clave), para encontrar con bisect la primera sala
+    en la que caben n personas sin recorrer las más pequeñas.
+    """
+
+    def __init__(self, salas):
+        self.salas = sorted(salas, key=lambda sala: (sala[2], sala[0]))  # (clave, nombre, capacidad)
+        self.capacidades = [sala[2] for sala in self.salas]
+
+    def __len__(self):
+        return len(self.salas)
+
+    def desde(self, minimo):
+        """Salas con capacidad >= minimo, de la más chica a la más grande."""
+        for i in range(bisect.bisect_left(self.capacidades, minimo), len(self.salas)):
+            yield self.salas[i]
+
+
+def indice_capacidad():
+    """IndiceCapacidad del catálogo actual (en caché; se invalida junto con el catálogo de salas)."""
+    return _en_cache((DB_FILE, "capacidad"), lambda: IndiceCapacidad(listar_salas()))
+
+
+def espacios_ocupados(fecha_iso):
+    """
+    Conjunto (en caché) de (sala_clave, turno) ya reservados en una fecha, vigentes o archivados,
+    igual que disponibilidad_por_fecha. El archivo sólo se consulta si la fecha no es posterior a su
+    fecha más reciente.
+    """
+    def consultar():
+        with conexion(DB_FILE) as conn:
+            mi_cursor = conn.cursor()
+            sql = "SELECT sala_clave, horario FROM Reservaciones WHERE fecha = ?1"
+            max_archivada = _max_fecha_archivada(conn)
+            if max_archivada is not None and fecha_iso <= max_archivada:
+                sql += " UNION SELECT sala_clave, horario FROM ReservacionesArchivo WHERE fecha = ?1"
+            mi_cursor.execute(sql, (fecha_iso,))
+            return frozenset(mi_cursor.fetchall())
+    return _en_cache((DB_FILE, "ocupadas", fecha_iso), consultar)
+
+
+def recomendar_salas(asistentes, fecha_iso, turno, cantidad=5):
+    """
+    Las `cantidad` salas libres en (fecha_iso, turno) que mejor se ajustan a `asistentes`:
+    las de menor capacidad que aún alcanza, para no ocupar salas grandes con grupos pequeños.
+    Devuelve una lista de (clave, nombre, capacidad).
+    """
+    ocupados = espacios_ocupados(fecha_iso)
+    recomendadas = []
+    for sala in indice_capacidad().desde(asistentes):
+        if (sala[0], turno) not in ocupados:
+            recomendadas.append(sala)
+            if len(recomendadas) == cantidad:
+                break
+    return recomendadas
 
 
 def existe_cliente(clave):
-    with sqlite3.connect(DB_FILE) as conn:
+    with conexion(DB_FILE) as conn:
         mi_cursor = conn.cursor()
         mi_cursor.execute("SELECT nombre FROM Usuarios WHERE clave = ?", (clave,))
         return mi_cursor.fetchone()
 
 
+def _insertar_si_libre(conn, cliente_clave, sala_clave, nombre, horario, fecha_iso):
+    """
+    Inserta la reservación sólo si el espacio (fecha, sala, turno) está libre, en una sola sentencia indexada.
+    Debe llamarse dentro de en_transaccion. Devuelve el folio, o None si el espacio ya estaba ocupado.
+    """
+    mi_cursor = conn.cursor()
+    mi_cursor.execute("""
+        INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha)
+        SELECT ?, ?, ?, ?, ?
+        WHERE NOT EXISTS (
+            SELECT 1 FROM Reservaciones WHERE fecha = ? AND sala_clave = ? AND horario = ?
+        )""",
+        (cliente_clave, sala_clave, nombre, horario, fecha_iso, fecha_iso, sala_clave, horario)
+    )
+    return mi_cursor.lastrowid if mi_cursor.rowcount else None
+
+
 def Registrar_Reservacion():
     while True:
         try:
@@ -156,30 +570,9 @@ def Registrar_Reservacion():
             continue
         print(f"Cliente: {cliente[0]} (clave {valor_clave})")
 
-        salas = listar_salas()
-        if not salas:
+        if not indice_capacidad():
             print("No hay salas registradas. Registre primero una sala.")
             return
-        print("Salas disponibles (clave, nombre, capacidad):")
-        for c, n, cap in salas:
-            print(f"{c}\t{n}\t(capacidad: {cap})")
-
-        try:
-            sala_clave_str = input("Introduce la clave de la sala que deseas: ").strip()
-            sala_clave = int(sala_clave_str)
-        except ValueError:
-            print("Clave de sala inválida.")
-            continue
-
-        # validar que la sala exista
-        sala_ex = None
-        for c, n, cap in salas:
-            if c == sala_clave:
-                sala_ex = (c, n, cap)
-                break
-        if not sala_ex:
-            print("Sala no encontrada.")
-            continue
 
         Nombre = input("Ingresa el nombre de la reservación (Escribe SALIR para regresar): ").strip()
         if Nombre.upper() == 'SALIR':
@@ -204,34 +597,209 @@ def Registrar_Reservacion():
             print("Debes hacer la reservación con al menos 2 días de anticipación.")
             continue
 
-        # Comprobar conflicto: misma sala, misma fecha, mismo horario
         try:
-            with sqlite3.connect(DB_FILE) as conn:
-                mi_cursor = conn.cursor()
-                mi_cursor.execute(
-                    "SELECT 1 FROM Reservaciones WHERE sala_clave = ? AND fecha = ? AND horario = ? LIMIT 1",
-                    (sala_clave, Fecha_dt.date().isoformat(), Horario)
-                )
-                if mi_cursor.fetchone():
-                    print("La sala ya está reservada para esa fecha y turno.")
-                    continue
+            asistentes = int(input("¿Cuántas personas asistirán?: ").strip())
+            if asistentes <= 0:
+                raise ValueError
+        except ValueError:
+            print("Número de personas inválido.")
+            continue
 
-                # Insertar reservación
-                mi_cursor.execute(
-                    "INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) VALUES (?, ?, ?, ?, ?)",
-                    (valor_clave, sala_clave, Nombre, Horario, Fecha_dt.date().isoformat())
-                )
-                conn.commit()
-                folio = mi_cursor.lastrowid
-                print("¡Reservación Realizada con éxito!")
-                print(f"Folio asignado: {folio}")
-                return
+        # En lugar de listar todo el catálogo, sólo las salas libres que mejor se ajustan
+        recomendadas = recomendar_salas(asistentes, Fecha_dt.date().isoformat(), Horario)
+        if not recomendadas:
+            print(f"No hay salas libres para {asistentes} personas en esa fecha y turno.")
+            continue
+        print("Salas recomendadas (clave, nombre, capacidad):")
+        for c, n, cap in recomendadas:
+            print(f"{c}\t{n}\t(capacidad: {cap})")
+
+        try:
+            sala_clave_str = input(f"Introduce la clave de la sala que deseas [{recomendadas[0][0]}]: ").strip()
+            sala_clave = int(sala_clave_str) if sala_clave_str else recomendadas[0][0]
+        except ValueError:
+            print("Clave de sala inválida.")
+            continue
+
+        # se acepta también una sala fuera de la lista, si existe
+        if not any(c == sala_clave for c, _, _ in listar_salas()):
+            print("Sala no encontrada.")
+            continue
+
+        # Verificar e insertar de forma atómica (BEGIN IMMEDIATE, con reintentos si la base está ocupada)
+        try:
+            folio = en_transaccion(DB_FILE, lambda conn: _insertar_si_libre(
+                conn, valor_clave, sala_clave, Nombre, Horario, Fecha_dt.date().isoformat()))
+            if folio is None:
+                print("La sala ya está reservada para esa fecha y turno.")
+                continue
+            invalidar_cache_fecha(Fecha_dt.date().isoformat())
+            print("¡Reservación Realizada con éxito!")
+            print(f"Folio asignado: {folio}")
+            return
+        except sqlite3.IntegrityError as e:
+            if "UNIQUE" in str(e):
+                print("La sala ya está reservada para esa fecha y turno.")
+                continue
+            print("Error al insertar reservación:", e)
         except Error as e:
             print("Error al insertar reservación:", e)
         except Exception as e:
             print("Surgió una falla siendo esta la causa:", e)
 
 
+@functools.lru_cache(maxsize=TAMANO_CACHE_FECHAS)
+def _texto_a_fecha_iso(texto):
+    """
+    'dd/mm/aaaa' o 'YYYY-MM-DD' -> 'YYYY-MM-DD' (None si no es válida), memorizado:
+    en lotes y en el servicio se repiten pocas fechas, así que strptime corre una vez por fecha distinta.
+    """
+    texto = texto.strip()
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(texto, formato).date().isoformat()
+        except ValueError:
+            pass
+    return None
+
+
+def _fecha_a_iso(valor):
+    """Acepta date/datetime, 'dd/mm/aaaa' o 'YYYY-MM-DD' y devuelve la fecha en ISO (texto) o None."""
+    if isinstance(valor, str):
+        return _texto_a_fecha_iso(valor)
+    if isinstance(valor, datetime):
+        return valor.date().isoformat()
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return None
+
+
+def validar_solicitud(solicitud, limite_iso):
+    """
+    Valida y normaliza una solicitud (cliente_clave, sala_clave, nombre, horario, fecha) sin tocar la base.
+    limite_iso: primera fecha reservable (hoy + 2 días) en ISO; se compara como texto, que en ISO
+    respeta el orden cronológico.
+    Devuelve (None, (cliente_clave, sala_clave, nombre, horario, fecha_iso)) o (INVALIDA, motivo).
+    """
+    try:
+        cliente_clave, sala_clave, nombre, horario, fecha = solicitud
+        cliente_clave = int(cliente_clave)
+        sala_clave = int(sala_clave)
+    except (TypeError, ValueError):
+        return INVALIDA, "Solicitud mal formada o claves no numéricas."
+    if not isinstance(nombre, (str, type(None))):
+        return INVALIDA, "El nombre de la reservación debe ser texto."
+    if not isinstance(horario, str):
+        return INVALIDA, "Horario inválido."
+    nombre = (nombre or "").strip()
+    turno = _TURNO_NORMALIZADO.get(horario)
+    if turno is None:
+        turno = _TURNO_NORMALIZADO.get(horario.strip().upper())
+    fecha_iso = _fecha_a_iso(fecha)
+    if not nombre:
+        return INVALIDA, "El nombre de la reservación no puede estar vacío."
+    if turno is None:
+        return INVALIDA, "Horario inválido."
+    if fecha_iso is None:
+        return INVALIDA, "Fecha no válida."
+    if fecha_iso < limite_iso:
+        return INVALIDA, "Se requieren al menos 2 días de anticipación."
+    return None, (cliente_clave, sala_clave, nombre, turno, fecha_iso)
+
+
+def registrar_reservaciones_lote(solicitudes):
+    """
+    Registra muchas reservaciones de una sola vez (p. ej. un semestre de clases).
+    solicitudes: iterable de (cliente_clave, sala_clave, nombre, horario, fecha)
+    Aplica las mismas reglas que Registrar_Reservacion (turno válido, 2 días de anticipación),
+    revisa clientes, salas y conflictos con una sola consulta sobre una tabla temporal
+    e inserta las aceptadas con executemany en una única transacción BEGIN IMMEDIATE,
+    así que es segura con varios procesos escribiendo a la vez.
+    Devuelve una lista alineada con la entrada de (estado, detalle):
+    (ACEPTADA, folio), (CONFLICTO, motivo) o (INVALIDA, motivo).
+    """
+    solicitudes = list(solicitudes)
+    resultados = [None] * len(solicitudes)
+    limite_iso = (datetime.now().date() + timedelta(days=2)).isoformat()
+
+    candidatas = []  # (idx, cliente_clave, sala_clave, nombre, horario, fecha_iso)
+    for idx, solicitud in enumerate(solicitudes):
+        estado, detalle = validar_solicitud(solicitud, limite_iso)
+        if estado is None:
+            candidatas.append((idx, *detalle))
+        else:
+            resultados[idx] = (estado, detalle)
+
+    if not candidatas:
+        return resultados
+
+    def operacion(conn):
+        mi_cursor = conn.cursor()
+        mi_cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS lote_reservaciones (
+                idx INTEGER PRIMARY KEY,
+                cliente_clave INTEGER, sala_clave INTEGER, nombre TEXT, horario TEXT, fecha TEXT
+            )""")
+        mi_cursor.execute("DELETE FROM temp.lote_reservaciones")
+        mi_cursor.executemany("INSERT INTO temp.lote_reservaciones VALUES (?, ?, ?, ?, ?, ?)", candidatas)
+
+        # Una sola consulta: cliente existe, sala existe, espacio ya ocupado
+        mi_cursor.execute("""
+            SELECT l.idx,
+                   u.clave IS NOT NULL,
+                   s.clave IS NOT NULL,
+                   EXISTS (SELECT 1 FROM Reservaciones r
+                           WHERE r.fecha = l.fecha AND r.sala_clave = l.sala_clave AND r.horario = l.horario)
+            FROM temp.lote_reservaciones l
+            LEFT JOIN Usuarios u ON u.clave = l.cliente_clave
+            LEFT JOIN Salas s ON s.clave = l.sala_clave
+            ORDER BY l.idx
+        """)
+        estado = {idx: (cliente_ok, sala_ok, ocupado) for idx, cliente_ok, sala_ok, ocupado in mi_cursor}
+
+        aceptadas = []
+        tomados = set()  # espacios pedidos dos veces dentro del mismo lote
+        for fila in candidatas:
+            idx, cliente_clave, sala_clave, nombre, horario, fecha_iso = fila
+            cliente_ok, sala_ok, ocupado = estado[idx]
+            espacio = (fecha_iso, sala_clave, horario)
+            if not cliente_ok:
+                resultados[idx] = (INVALIDA, f"No existe el cliente {cliente_clave}.")
+            elif not sala_ok:
+                resultados[idx] = (INVALIDA, f"No existe la sala {sala_clave}.")
+            elif ocupado or espacio in tomados:
+                resultados[idx] = (CONFLICTO, "La sala ya está reservada para esa fecha y turno.")
+            else:
+                tomados.add(espacio)
+                aceptadas.append(fila)
+
+        mi_cursor.executemany(
+            "INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) VALUES (?, ?, ?, ?, ?)",
+            [fila[1:] for fila in aceptadas]
+        )
+        # Recuperar los folios asignados a través del espacio (fecha, sala, turno), que es único
+        mi_cursor.execute("DELETE FROM temp.lote_reservaciones")
+        mi_cursor.executemany(
+            "INSERT INTO temp.lote_reservaciones VALUES (?, ?, ?, ?, ?, ?)", aceptadas
+        )
+        mi_cursor.execute("""
+            SELECT l.idx, MAX(r.folio)
+            FROM temp.lote_reservaciones l
+            JOIN Reservaciones r
+              ON r.fecha = l.fecha AND r.sala_clave = l.sala_clave AND r.horario = l.horario
+            GROUP BY l.idx
+        """)
+        for idx, folio in mi_cursor:
+            resultados[idx] = (ACEPTADA, folio)
+        mi_cursor.execute("DELETE FROM temp.lote_reservaciones")
+        return aceptadas
+
+    aceptadas = en_transaccion(DB_FILE, operacion)
+    for fecha_iso in {fila[5] for fila in aceptadas}:
+        invalidar_cache_fecha(fecha_iso)
+    return resultados
+
+
 def modificar_descripciones():
     """
     Modifica la descripción (nombre del evento) de una reservación identificada por folio.
@@ -247,7 +815,7 @@ def modificar_descripciones():
             continue
 
         try:
-            with sqlite3.connect(DB_FILE) as conn:
+            with conexion(DB_FILE) as conn:
                 mi_cursor = conn.cursor()
                 mi_cursor.execute("""
                     SELECT r.folio, u.nombre, s.nombre, r.nombre, r.horario, r.fecha
@@ -271,6 +839,7 @@ def modificar_descripciones():
 
                 mi_cursor.execute("UPDATE Reservaciones SET nombre = ? WHERE folio = ?", (nuevo_nombre, folio))
                 conn.commit()
+                invalidar_cache_fecha(registro[5])
                 print("Modificación realizada con éxito.")
                 return
         except Error as e:
@@ -279,6 +848,129 @@ def modificar_descripciones():
             print("Surgió una falla siendo esta la causa:", e)
 
 
+# El texto de la consulta se arma una sola vez: siempre es idéntico y la conexión reutiliza la sentencia preparada
+_SQL_DISPONIBILIDAD = f"""
+    WITH turnos AS ({" UNION ALL ".join(f"SELECT '{t}' AS turno, {i} AS orden" for i, t in enumerate(TURNOS))})
+    SELECT s.clave, s.nombre, t.turno
+    FROM Salas s
+    CROSS JOIN turnos t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM Reservaciones r
+        WHERE r.sala_clave = s.clave AND r.fecha = ?1 AND r.horario = t.turno
+    ) AND NOT EXISTS (
+        SELECT 1 FROM ReservacionesArchivo a
+        WHERE a.sala_clave = s.clave AND a.fecha = ?1 AND a.horario = t.turno
+    )
+    ORDER BY s.clave, t.orden;
+"""
+
+
+def disponibilidad_por_fecha(fecha_iso):
+    """
+    Devuelve las combinaciones libres (sala_clave, sala_nombre, turno) para una fecha.
+    fecha_iso: fecha en formato YYYY-MM-DD
+    Se resuelve con una sola consulta: Salas x TURNOS menos lo ya reservado, vigente o archivado (anti-join),
+    y el resultado queda en caché hasta que una escritura invalide la fecha (archivar no lo cambia).
+    """
+    def consultar():
+        with conexion(DB_FILE) as conn:
+            mi_cursor = conn.cursor()
+            mi_cursor.execute(_SQL_DISPONIBILIDAD, (fecha_iso,))
+            return tuple(mi_cursor.fetchall())
+    return list(_en_cache((DB_FILE, "disponibilidad", fecha_iso), consultar))
+
+
+class MatrizOcupacion:
+    """
+    Matriz compacta sala x fecha x turno para un rango de fechas.
+    Cada celda es un byte de un bytearray: 1 = ocupado, 0 = libre.
+    """
+
+    def __init__(self, salas, fechas):
+        self.salas = salas                      # [(clave, nombre, capacidad), ...]
+        self.fechas = fechas                    # ['YYYY-MM-DD', ...]
+        self._idx_sala = {s[0]: i for i, s in enumerate(salas)}
+        self._idx_fecha = {f: i for i, f in enumerate(fechas)}
+        self._idx_turno = {t: i for i, t in enumerate(TURNOS)}
+        self.celdas = bytearray(len(salas) * len(fechas) * len(TURNOS))
+
+    def _posicion(self, i_sala, i_fecha, i_turno):
+        return (i_sala * len(self.fechas) + i_fecha) * len(TURNOS) + i_turno
+
+    def marcar(self, sala_clave, fecha_iso, turno):
+        i_sala = self._idx_sala.get(sala_clave)
+        i_fecha = self._idx_fecha.get(fecha_iso)
+        i_turno = self._idx_turno.get(turno)
+        if i_sala is None or i_fecha is None or i_turno is None:
+            return
+        self.celdas[self._posicion(i_sala, i_fecha, i_turno)] = 1
+
+    def ocupado(self, sala_clave, fecha_iso, turno):
+        pos = self._posicion(self._idx_sala[sala_clave], self._idx_fecha[fecha_iso], self._idx_turno[turno])
+        return self.celdas[pos] == 1
+
+    def libres(self, fecha_iso=None, turno=None):
+        """Genera (sala_clave, sala_nombre, fecha, turno) libres, opcionalmente filtrando fecha y/o turno."""
+        fechas = [fecha_iso] if fecha_iso else self.fechas
+        turnos = [turno] if turno else TURNOS
+        for i_sala, (clave, nombre, _) in enumerate(self.salas):
+            for f in fechas:
+                i_fecha = self._idx_fecha[f]
+                for t in turnos:
+                    if not self.celdas[self._posicion(i_sala, i_fecha, self._idx_turno[t])]:
+                        yield clave, nombre, f, t
+
+    def salas_libres_en_todas(self, turno, fechas=None):
+        """Salas libres en el turno indicado para todas las fechas dadas (por defecto todo el rango)."""
+        fechas = self.fechas if fechas is None else fechas
+        i_turno = self._idx_turno[turno]
+        resultado = []
+        for i_sala, sala in enumerate(self.salas):
+            if all(not self.celdas[self._posicion(i_sala, self._idx_fecha[f], i_turno)] for f in fechas):
+                resultado.append(sala)
+        return resultado
+
+    def fechas_por_dia_semana(self, dia_semana):
+        """Fechas del rango que caen en el día indicado (0 = lunes ... 6 = domingo)."""
+        return [f for f in self.fechas if datetime.fromisoformat(f).weekday() == dia_semana]
+
+
+def disponibilidad_rango(fecha_inicio_iso, fecha_fin_iso, capacidad_minima=1):
+    """
+    Construye la MatrizOcupacion para todas las fechas entre fecha_inicio_iso y fecha_fin_iso (inclusive).
+    Sólo considera salas con capacidad >= capacidad_minima.
+    Usa tres consultas sin importar el tamaño del rango (salas, fecha más reciente del archivo y
+    reservaciones); ReservacionesArchivo sólo se une si el rango empieza en o antes de esa fecha.
+    """
+    inicio = datetime.fromisoformat(fecha_inicio_iso).date()
+    fin = datetime.fromisoformat(fecha_fin_iso).date()
+    if fin < inicio:
+        raise ValueError("La fecha final no puede ser anterior a la inicial.")
+    fechas = [(inicio + timedelta(days=d)).isoformat() for d in range((fin - inicio).days + 1)]
+
+    with conexion(DB_FILE) as conn:
+        mi_cursor = conn.cursor()
+        mi_cursor.execute(
+            "SELECT clave, nombre, capacidad FROM Salas WHERE capacidad >= ? ORDER BY clave",
+            (capacidad_minima,)
+        )
+        matriz = MatrizOcupacion(mi_cursor.fetchall(), fechas)
+        fuente = "Reservaciones"
+        max_archivada = _max_fecha_archivada(conn)
+        if max_archivada is not None and fechas[0] <= max_archivada:
+            fuente = """(SELECT sala_clave, fecha, horario FROM Reservaciones
+                         UNION ALL SELECT sala_clave, fecha, horario FROM ReservacionesArchivo)"""
+        mi_cursor.execute(f"""
+            SELECT r.sala_clave, r.fecha, r.horario
+            FROM {fuente} r
+            JOIN Salas s ON r.sala_clave = s.clave
+            WHERE r.fecha BETWEEN ? AND ? AND s.capacidad >= ?
+        """, (fechas[0], fechas[-1], capacidad_minima))
+        for sala_clave, fecha, horario in mi_cursor:
+            matriz.marcar(sala_clave, fecha, horario)
+    return matriz
+
+
 def consulta_fecha():
     fecha_consultar = input("Dime una fecha (dd/mm/aaaa): ").strip()
     Fecha_dt = es_fecha_valida_str(fecha_consultar)
@@ -288,38 +980,108 @@ def consulta_fecha():
 
     fecha_iso = Fecha_dt.date().isoformat()
     try:
-        with sqlite3.connect(DB_FILE) as conn:
-            mi_cursor = conn.cursor()
-            # Obtener todas las salas
-            mi_cursor.execute("SELECT clave, nombre FROM Salas ORDER BY clave")
-            salas = mi_cursor.fetchall()
-            if not salas:
-                print("No hay salas registradas.")
-                return
+        if not listar_salas():
+            print("No hay salas registradas.")
+            return
 
-            disponibles = []
-            for sala_clave, sala_nombre in salas:
-                for t in TURNOS:
-                    mi_cursor.execute(
-                        "SELECT 1 FROM Reservaciones WHERE sala_clave = ? AND fecha = ? AND horario = ? LIMIT 1",
-                        (sala_clave, fecha_iso, t)
-                    )
-                    if mi_cursor.fetchone() is None:
-                        disponibles.append((sala_clave, sala_nombre, t))
-
-            if disponibles:
-                print(f"Opciones disponibles para la fecha {Fecha_dt.strftime('%d/%m/%Y')}:")
-                print("Clave\tSala\tTurno")
-                for c, n, t in disponibles:
-                    print(f"{c}\t{n}\t{t}")
-            else:
-                print(f"No hay opciones disponibles para la fecha {Fecha_dt.strftime('%d/%m/%Y')}.")
+        disponibles = disponibilidad_por_fecha(fecha_iso)
+        if disponibles:
+            print(f"Opciones disponibles para la fecha {Fecha_dt.strftime('%d/%m/%Y')}:")
+            print("Clave\tSala\tTurno")
+            for c, n, t in disponibles:
+                print(f"{c}\t{n}\t{t}")
+        else:
+            print(f"No hay opciones disponibles para la fecha {Fecha_dt.strftime('%d/%m/%Y')}.")
     except Error as e:
         print("Error en la consulta:", e)
     except Exception as e:
         print("Se produjo el siguiente error:", e)
 
 
+_SQL_RESERVACIONES = """
+    SELECT r.folio, u.nombre AS cliente, s.clave AS sala_clave, s.nombre AS sala_nombre,
+           r.horario, r.fecha, r.nombre AS evento
+    FROM {tabla} r
+    JOIN Usuarios u ON r.cliente_clave = u.clave
+    JOIN Salas s ON r.sala_clave = s.clave
+"""
+
+
+def _max_fecha_archivada(conn):
+    """Fecha más reciente en ReservacionesArchivo (None si está vacío); usa el índice por fecha."""
+    return conn.execute("SELECT MAX(fecha) FROM ReservacionesArchivo").fetchone()[0]
+
+
+_SQL_PAGINA = """
+    WHERE r.fecha BETWEEN :inicio AND :fin
+      AND (r.fecha, r.sala_clave, r.horario, r.folio) > (:fecha, :sala, :horario, :folio)
+"""
+_ORDEN_PAGINA = " ORDER BY {p}fecha, {p}sala_clave, {p}horario, {p}folio LIMIT :limite;"
+_SQL_PAGINA_VIGENTES = _SQL_RESERVACIONES.format(tabla="Reservaciones") + _SQL_PAGINA + _ORDEN_PAGINA.format(p="r.")
+# cada rama baja por su índice y SQLite mezcla ambas ya ordenadas
+_SQL_PAGINA_CON_ARCHIVO = (_SQL_RESERVACIONES.format(tabla="Reservaciones") + _SQL_PAGINA + " UNION ALL "
+                           + _SQL_RESERVACIONES.format(tabla="ReservacionesArchivo") + _SQL_PAGINA
+                           + _ORDEN_PAGINA.format(p=""))
+
+
+def paginas_reservaciones(fecha_inicio_iso=None, fecha_fin_iso=None, tamano_pagina=TAMANO_PAGINA, desde=None):
+    """
+    Genera páginas (listas) de reservaciones entre dos fechas (inclusive; None = sin límite), en orden
+    (fecha, sala_clave, horario, folio). Usa paginación por llave (keyset) en lugar de OFFSET: cada
+    página continúa después de la última fila de la anterior con una búsqueda en el índice del espacio,
+    así que pedir la página 1000 cuesta lo mismo que la primera y entre páginas no se retiene la conexión.
+    desde: llave (fecha, sala_clave, horario, folio) tras la cual continuar, p. ej. llave_pagina(fila).
+    ReservacionesArchivo sólo se une si el rango empieza en o antes de su fecha más reciente.
+    """
+    parametros = {
+        "inicio": fecha_inicio_iso or "",
+        "fin": fecha_fin_iso or "9999-12-31",
+        "limite": tamano_pagina,
+    }
+    fecha, sala, horario, folio = desde or ("", 0, "", 0)
+    with conexion(DB_FILE) as conn:
+        max_archivada = _max_fecha_archivada(conn)
+    if max_archivada is not None and parametros["inicio"] <= max_archivada:
+        sql = _SQL_PAGINA_CON_ARCHIVO
+    else:
+        sql = _SQL_PAGINA_VIGENTES
+    while True:
+        parametros.update(fecha=fecha, sala=sala, horario=horario, folio=folio)
+        with conexion(DB_FILE) as conn:
+            pagina = conn.execute(sql, parametros).fetchall()
+        if not pagina:
+            return
+        yield pagina
+        if len(pagina) < tamano_pagina:
+            return
+        fecha, sala, horario, folio = llave_pagina(pagina[-1])
+
+
+def llave_pagina(fila):
+    """Llave de paginación (fecha, sala_clave, horario, folio) de una fila de reservaciones."""
+    return fila[5], fila[2], fila[4], fila[0]
+
+
+def iterar_reservaciones(fecha_iso=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera las reservaciones (unidas con cliente y sala) de una fecha o de toda la base,
+    leyendo por páginas de tamano_bloque filas: la memoria no crece con el número de filas.
+    Cada fila: (folio, cliente, sala_clave, sala_nombre, horario, fecha, evento)
+    """
+    for pagina in paginas_reservaciones(fecha_iso, fecha_iso, tamano_bloque):
+        yield from pagina
+
+
+def reservaciones_por_fecha(fecha_iso):
+    """
+    Lista (en caché) de las reservaciones de una fecha, con el mismo formato que iterar_reservaciones.
+    La usa el servicio (GET /reporte); el reporte del menú lee por páginas con paginas_reservaciones.
+    """
+    def consultar():
+        return tuple(iterar_reservaciones(fecha_iso))
+    return list(_en_cache((DB_FILE, "reporte", fecha_iso), consultar))
+
+
 def reporte_reservaciones_por_fecha():
     fecha_consultar = input("Dime una fecha (dd/mm/aaaa): ").strip()
     Fecha_dt = es_fecha_valida_str(fecha_consultar)
@@ -329,62 +1091,90 @@ def reporte_reservaciones_por_fecha():
 
     fecha_iso = Fecha_dt.date().isoformat()
     try:
-        with sqlite3.connect(DB_FILE) as conn:
-            mi_cursor = conn.cursor()
-            mi_cursor.execute("""
-                SELECT r.folio, u.nombre AS cliente, s.clave AS sala_clave, s.nombre AS sala_nombre,
-                       r.horario, r.fecha, r.nombre AS evento
-                FROM Reservaciones r
-                JOIN Usuarios u ON r.cliente_clave = u.clave
-                JOIN Salas s ON r.sala_clave = s.clave
-                WHERE r.fecha = ?
-                ORDER BY s.clave, r.horario;
-            """, (fecha_iso,))
-            registros = mi_cursor.fetchall()
-
-            if registros:
+        total = 0
+        for numero, pagina in enumerate(paginas_reservaciones(fecha_iso, fecha_iso, TAMANO_PAGINA), start=1):
+            if numero == 1:
                 print(f"Reservaciones para la fecha {Fecha_dt.strftime('%d/%m/%Y')}:")
                 print("Folio\tCliente\tSalaClave\tSalaNombre\tHorario\tFecha\tEvento")
-                for folio, cliente, sala_clave, sala_nombre, horario, fecha, evento in registros:
-                    print(f"{folio}\t{cliente}\t{sala_clave}\t{sala_nombre}\t{horario}\t{fecha}\t{evento}")
-                # Preguntar si desea exportar este reporte
-                opcion = input("¿Quieres exportar este reporte a Excel? (S/N): ").strip().upper()
-                if opcion == 'S':
-                    exportar_registros_a_excel(registros, Fecha_dt.strftime("%Y-%m-%d"))
-            else:
-                print("No hay reservaciones para esa fecha.")
+            elif input("-- Enter para ver más, Q para terminar: ").strip().upper() == 'Q':
+                break
+            for folio, cliente, sala_clave, sala_nombre, horario, fecha, evento in pagina:
+                print(f"{folio}\t{cliente}\t{sala_clave}\t{sala_nombre}\t{horario}\t{fecha}\t{evento}")
+            total += len(pagina)
+        if not total:
+            print("No hay reservaciones para esa fecha.")
+            return
+        # Preguntar si desea exportar este reporte
+        opcion = input("¿Quieres exportar este reporte a Excel? (S/N): ").strip().upper()
+        if opcion == 'S':
+            exportar_registros_a_excel(iterar_reservaciones(fecha_iso), Fecha_dt.strftime("%Y-%m-%d"))
     except Error as e:
         print("Error al obtener reporte:", e)
     except Exception as e:
         print("Se produjo el siguiente error:", e)
 
 
-def exportar_registros_a_excel(registros, etiqueta_fecha=""):
+def nombre_reporte(etiqueta_fecha, extension, directorio=""):
+    """Ruta del archivo de reporte: Reporte_Reservaciones_<etiqueta>.<extension> dentro de directorio."""
+    return os.path.join(directorio, f"Reporte_Reservaciones_{etiqueta_fecha or 'todos'}.{extension}")
+
+
+def exportar_registros_a_excel(registros, etiqueta_fecha="", directorio=""):
     """
-    Exporta una lista de tuples a Excel.
+    Exporta registros a Excel usando el modo write-only de openpyxl: cada fila se escribe
+    directo al archivo, por lo que acepta generadores de cualquier tamaño con memoria constante.
     registros: iterable de (folio, cliente, sala_clave, sala_nombre, horario, fecha, evento)
     etiqueta_fecha: texto para el nombre del archivo
+    directorio: carpeta donde se guarda (por defecto la actual)
+    Devuelve el número de filas exportadas (None si hubo error).
     """
     try:
-        workbook = openpyxl.Workbook()
-        hoja = workbook.active
-        hoja.title = "Reservaciones"
-        encabezados = ['Folio', 'Cliente', 'SalaClave', 'SalaNombre', 'Horario', 'Fecha', 'Evento']
-        hoja.append(encabezados)
+        import openpyxl  # se importa aquí: tarda en cargar y sólo se necesita al exportar
+        workbook = openpyxl.Workbook(write_only=True)
+        hoja = workbook.create_sheet("Reservaciones")
+        hoja.append(ENCABEZADOS)
+        total = 0
         for r in registros:
             hoja.append(r)
-        filename = f"Reporte_Reservaciones_{etiqueta_fecha or 'todos'}.xlsx"
+            total += 1
+        filename = nombre_reporte(etiqueta_fecha, "xlsx", directorio)
         workbook.save(filename)
-        print(f"Reporte exportado exitosamente como '{filename}'")
+        print(f"Reporte exportado exitosamente como '{filename}' ({total} filas)")
+        return total
     except Exception as e:
         print("Error al exportar a Excel:", e)
 
 
+def exportar_registros_a_csv(registros, etiqueta_fecha="", delimitador=",", directorio=""):
+    """
+    Exporta registros a CSV (o TSV si delimitador es tabulador) sin formato de Excel.
+    Es la vía más rápida para volcados grandes; también escribe fila por fila.
+    Devuelve el número de filas exportadas (None si hubo error).
+    """
+    extension = "tsv" if delimitador == "\t" else "csv"
+    filename = nombre_reporte(etiqueta_fecha, extension, directorio)
+    try:
+        with open(filename, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo, delimiter=delimitador)
+            escritor.writerow(ENCABEZADOS)
+            total = 0
+            for r in registros:
+                escritor.writerow(r)
+                total += 1
+        print(f"Reporte exportado exitosamente como '{filename}' ({total} filas)")
+        return total
+    except Exception as e:
+        print("Error al exportar a CSV:", e)
+
+
 def exportar_base_de_datos_a_excel():
     """
     Exporta todas las reservaciones (unidas con cliente y sala) o las de una fecha específica si el usuario lo solicita.
+    Los registros se leen y escriben en streaming; se puede elegir Excel, CSV o TSV.
     """
     opcion = input("¿Deseas exportar (1) Todas las reservaciones o (2) Reservaciones de una fecha? [1/2]: ").strip()
+    fecha_iso = None
+    etiqueta = "todas"
     if opcion == '2':
         fecha_consultar = input("Dime la fecha (dd/mm/aaaa): ").strip()
         Fecha_dt = es_fecha_valida_str(fecha_consultar)
@@ -392,41 +1182,310 @@ def exportar_base_de_datos_a_excel():
             print("Formato de fecha inválido.")
             return
         fecha_iso = Fecha_dt.date().isoformat()
-        with sqlite3.connect(DB_FILE) as conn:
-            mi_cursor = conn.cursor()
-            mi_cursor.execute("""
-                SELECT r.folio, u.nombre AS cliente, s.clave AS sala_clave, s.nombre AS sala_nombre,
-                       r.horario, r.fecha, r.nombre AS evento
-                FROM Reservaciones r
-                JOIN Usuarios u ON r.cliente_clave = u.clave
-                JOIN Salas s ON r.sala_clave = s.clave
-                WHERE r.fecha = ?
-                ORDER BY s.clave, r.horario;
-            """, (fecha_iso,))
-            registros = mi_cursor.fetchall()
-            if registros:
-                exportar_registros_a_excel(registros, Fecha_dt.strftime("%Y-%m-%d"))
-            else:
+        etiqueta = Fecha_dt.strftime("%Y-%m-%d")
+    formato = input("Formato: (1) Excel, (2) CSV o (3) TSV [1/2/3]: ").strip()
+
+    try:
+        registros = iterar_reservaciones(fecha_iso)
+        primero = next(registros, None)
+        if primero is None:
+            if fecha_iso:
                 print("No hay reservaciones para esa fecha.")
-    else:
-        try:
-            with sqlite3.connect(DB_FILE) as conn:
-                mi_cursor = conn.cursor()
-                mi_cursor.execute("""
-                    SELECT r.folio, u.nombre AS cliente, s.clave AS sala_clave, s.nombre AS sala_nombre,
-                           r.horario, r.fecha, r.nombre AS evento
-                    FROM Reservaciones r
-                    JOIN Usuarios u ON r.cliente_clave = u.clave
-                    JOIN Salas s ON r.sala_clave = s.clave
-                    ORDER BY r.fecha, s.clave, r.horario;
-                """)
-                registros = mi_cursor.fetchall()
-                if registros:
-                    exportar_registros_a_excel(registros, "todas")
-                else:
-                    print("No hay reservaciones en la base de datos.")
-        except Exception as e:
-            print("Error al exportar:", e)
+            else:
+                print("No hay reservaciones en la base de datos.")
+            return
+        registros = itertools.chain([primero], registros)
+        if formato == '2':
+            exportar_registros_a_csv(registros, etiqueta)
+        elif formato == '3':
+            exportar_registros_a_csv(registros, etiqueta, delimitador="\t")
+        else:
+            exportar_registros_a_excel(registros, etiqueta)
+    except Exception as e:
+        print("Error al exportar:", e)
+
+
+_SQL_CLIENTE_PROXIMAS = (_SQL_RESERVACIONES.format(tabla="Reservaciones")
+                         + " WHERE r.cliente_clave = :cliente AND r.fecha >= :hoy ORDER BY r.fecha, r.folio;")
+_SQL_CLIENTE_PASADAS = (_SQL_RESERVACIONES.format(tabla="Reservaciones")
+                        + " WHERE r.cliente_clave = :cliente AND r.fecha < :hoy ORDER BY r.fecha DESC, r.folio DESC;")
+_SQL_CLIENTE_PASADAS_CON_ARCHIVO = (
+    _SQL_RESERVACIONES.format(tabla="Reservaciones") + " WHERE r.cliente_clave = :cliente AND r.fecha < :hoy"
+    + " UNION ALL " + _SQL_RESERVACIONES.format(tabla="ReservacionesArchivo")
+    + " WHERE r.cliente_clave = :cliente ORDER BY fecha DESC, folio DESC;")
+
+
+def iterar_reservaciones_cliente(cliente_clave, proximas=True, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera las reservaciones de un cliente con el mismo formato que iterar_reservaciones.
+    proximas=True: de hoy en adelante, de la más cercana a la más lejana.
+    proximas=False: las pasadas (incluido el archivo), de la más reciente a la más antigua.
+    Recorre el índice (cliente_clave, fecha): no lee filas de otros clientes ni ordena en memoria.
+    """
+    parametros = {"cliente": cliente_clave, "hoy": datetime.now().date().isoformat()}
+    with conexion(DB_FILE) as conn:
+        if proximas:
+            sql = _SQL_CLIENTE_PROXIMAS
+        elif _max_fecha_archivada(conn) is not None:
+            sql = _SQL_CLIENTE_PASADAS_CON_ARCHIVO
+        else:
+            sql = _SQL_CLIENTE_PASADAS
+        mi_cursor = conn.cursor()
+        mi_cursor.execute(sql, parametros)
+        while True:
+            bloque = mi_cursor.fetchmany(tamano_bloque)
+            if not bloque:
+                break
+            yield from bloque
+
+
+def reporte_reservaciones_cliente():
+    """Muestra las próximas y las pasadas de un cliente y ofrece exportarlas a Excel."""
+    clave_str = input("Clave del cliente (o SALIR): ").strip()
+    if clave_str.upper() == 'SALIR':
+        return
+    try:
+        cliente_clave = int(clave_str)
+    except ValueError:
+        print("Clave inválida.")
+        return
+
+    try:
+        if not existe_cliente(cliente_clave):
+            print(f"No existe el cliente {cliente_clave}.")
+            return
+        total = 0
+        for titulo, proximas in (("Próximas", True), ("Pasadas", False)):
+            print(f"\n{titulo}:")
+            print("Folio\tSalaClave\tSalaNombre\tHorario\tFecha\tEvento")
+            n = 0
+            for folio, _, sala_clave, sala_nombre, horario, fecha, evento in iterar_reservaciones_cliente(
+                    cliente_clave, proximas):
+                print(f"{folio}\t{sala_clave}\t{sala_nombre}\t{horario}\t{fecha}\t{evento}")
+                n += 1
+            if not n:
+                print("(ninguna)")
+            total += n
+        if not total:
+            return
+        opcion = input("¿Quieres exportar este historial a Excel? (S/N): ").strip().upper()
+        if opcion == 'S':
+            exportar_registros_a_excel(
+                itertools.chain(iterar_reservaciones_cliente(cliente_clave, True),
+                                iterar_reservaciones_cliente(cliente_clave, False)),
+                f"cliente_{cliente_clave}")
+    except Error as e:
+        print("Error al obtener el historial:", e)
+    except Exception as e:
+        print("Se produjo el siguiente error:", e)
+
+
+TAMANO_BUSQUEDA = 50  # resultados por búsqueda
+# peso de cada columna de Busqueda en el ranking bm25: el evento pesa más que el cliente y la sala
+_SQL_BUSQUEDA = """
+    WITH hallazgos AS (
+        SELECT rowid AS folio, bm25(Busqueda, 10.0, 5.0, 1.0) AS rango
+        FROM Busqueda WHERE Busqueda MATCH ? ORDER BY rango LIMIT ?
+    )
+    SELECT r.folio, u.nombre, s.clave, s.nombre, r.horario, r.fecha, r.nombre, h.rango
+    FROM hallazgos h JOIN Reservaciones r ON r.folio = h.folio
+    JOIN Usuarios u ON r.cliente_clave = u.clave JOIN Salas s ON r.sala_clave = s.clave
+    UNION ALL
+    SELECT r.folio, u.nombre, s.clave, s.nombre, r.horario, r.fecha, r.nombre, h.rango
+    FROM hallazgos h JOIN ReservacionesArchivo r ON r.folio = h.folio
+    JOIN Usuarios u ON r.cliente_clave = u.clave JOIN Salas s ON r.sala_clave = s.clave
+    ORDER BY 8, 1;
+"""
+_FILTRO_LIKE = """
+    WHERE r.nombre LIKE :patron ESCAPE '\\' OR u.nombre LIKE :patron ESCAPE '\\'
+       OR s.nombre LIKE :patron ESCAPE '\\'
+"""
+_SQL_BUSQUEDA_LIKE = (_SQL_RESERVACIONES.format(tabla="Reservaciones") + _FILTRO_LIKE + " UNION ALL "
+                      + _SQL_RESERVACIONES.format(tabla="ReservacionesArchivo") + _FILTRO_LIKE + " LIMIT :limite;")
+
+
+def _consulta_fts(texto):
+    """
+    Convierte lo que escribe el usuario en una consulta FTS5: todas las palabras son requeridas y la
+    última se toma como prefijo (se puede buscar sin terminar de escribirla). Sólo la última, porque
+    expandir un prefijo de una palabra frecuente cuesta mucho más que buscarla exacta.
+    """
+    palabras = [f'"{p.replace(chr(34), chr(34) * 2)}"' for p in texto.split()]
+    if palabras:
+        palabras[-1] += "*"
+    return " ".join(palabras)
+
+
+def buscar_reservaciones(texto, limite=TAMANO_BUSQUEDA):
+    """
+    Busca reservaciones (vigentes y archivadas) por nombre del evento, del cliente o de la sala.
+    Sin distinguir acentos ni mayúsculas y con la última palabra como prefijo; el resultado viene
+    ordenado por relevancia (bm25) y tiene el formato de iterar_reservaciones.
+    Si la base no tiene índice FTS5 usa buscar_reservaciones_like.
+    """
+    consulta = _consulta_fts(texto)
+    if not consulta:
+        return []
+    with conexion(DB_FILE) as conn:
+        mi_cursor = conn.cursor()
+        mi_cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Busqueda'")
+        if mi_cursor.fetchone() is None:
+            return buscar_reservaciones_like(texto, limite)
+        mi_cursor.execute(_SQL_BUSQUEDA, (consulta, limite))
+        return [fila[:7] for fila in mi_cursor.fetchall()]
+
+
+def buscar_reservaciones_like(texto, limite=TAMANO_BUSQUEDA):
+    """Búsqueda con LIKE '%texto%' (recorre todas las reservaciones); respaldo sin FTS5 y referencia de benchmark."""
+    texto = texto.strip()
+    if not texto:
+        return []
+    patron = "%" + texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    with conexion(DB_FILE) as conn:
+        return conn.execute(_SQL_BUSQUEDA_LIKE, {"patron": patron, "limite": limite}).fetchall()
+
+
+def buscar_reservaciones_menu():
+    texto = input("Texto a buscar (evento, cliente o sala): ").strip()
+    if not texto:
+        print("Búsqueda vacía.")
+        return
+    try:
+        registros = buscar_reservaciones(texto)
+        if not registros:
+            print("No se encontraron reservaciones.")
+            return
+        print("Folio\tCliente\tSalaClave\tSalaNombre\tHorario\tFecha\tEvento")
+        for folio, cliente, sala_clave, sala_nombre, horario, fecha, evento in registros:
+            print(f"{folio}\t{cliente}\t{sala_clave}\t{sala_nombre}\t{horario}\t{fecha}\t{evento}")
+        if len(registros) == TAMANO_BUSQUEDA:
+            print(f"(se muestran los {TAMANO_BUSQUEDA} más relevantes)")
+    except Error as e:
+        print("Error al buscar:", e)
+    except Exception as e:
+        print("Se produjo el siguiente error:", e)
+
+
+def reconstruir_ocupacion():
+    """Recalcula las tablas de ocupación desde Reservaciones (bases existentes o tras cargas externas)."""
+    en_transaccion(DB_FILE, lambda conn: _reconstruir_ocupacion(conn.cursor()))
+
+
+def ocupacion_diaria(fecha_iso, sala_clave=None):
+    """
+    Ocupación de una fecha por turno, leída de OcupacionDiaria (no recorre Reservaciones).
+    Con sala_clave sólo cuenta esa sala; si no, suma todas.
+    Devuelve [(turno, reservadas, total_salas, tasa)]; la tasa usa el número actual de salas.
+    """
+    total_salas = 1 if sala_clave is not None else len(listar_salas())
+    with conexion(DB_FILE) as conn:
+        mi_cursor = conn.cursor()
+        if sala_clave is None:
+            mi_cursor.execute("""SELECT horario, SUM(reservadas) FROM OcupacionDiaria
+                                 WHERE fecha = ? GROUP BY horario""", (fecha_iso,))
+        else:
+            mi_cursor.execute("""SELECT horario, reservadas FROM OcupacionDiaria
+                                 WHERE fecha = ? AND sala_clave = ?""", (fecha_iso, sala_clave))
+        reservadas = dict(mi_cursor.fetchall())
+    return [(t, reservadas.get(t, 0), total_salas, reservadas.get(t, 0) / total_salas if total_salas else 0.0)
+            for t in TURNOS]
+
+
+def ocupacion_mensual(mes):
+    """
+    Ocupación de un mes ('YYYY-MM') por sala y turno, leída de OcupacionMensual.
+    Devuelve [(sala_clave, sala_nombre, turno, reservadas, dias_del_mes, tasa)].
+    """
+    anio, num_mes = (int(x) for x in mes.split("-"))
+    dias = calendar.monthrange(anio, num_mes)[1]
+    with conexion(DB_FILE) as conn:
+        mi_cursor = conn.cursor()
+        mi_cursor.execute("SELECT sala_clave, horario, reservadas FROM OcupacionMensual WHERE mes = ?", (mes,))
+        reservadas = {(c, t): n for c, t, n in mi_cursor.fetchall()}
+    resultado = []
+    for clave, nombre, _ in listar_salas():
+        for t in TURNOS:
+            n = reservadas.get((clave, t), 0)
+            resultado.append((clave, nombre, t, n, dias, n / dias))
+    return resultado
+
+
+def archivar_reservaciones(fecha_corte_iso=None, tamano_lote=TAMANO_BLOQUE):
+    """
+    Mueve a ReservacionesArchivo las reservaciones con fecha anterior a fecha_corte_iso
+    (por defecto hoy - DIAS_RETENCION), en lotes de tamano_lote, una transacción por lote.
+    El corte no puede ser posterior a hoy: sólo se archivan fechas que ya no se pueden reservar.
+    Devuelve el número de reservaciones movidas.
+    """
+    hoy = datetime.now().date()
+    if fecha_corte_iso is None:
+        fecha_corte_iso = (hoy - timedelta(days=DIAS_RETENCION)).isoformat()
+    if fecha_corte_iso > hoy.isoformat():
+        raise ValueError("La fecha de corte no puede ser posterior a hoy.")
+
+    def mover_lote(conn):
+        mi_cursor = conn.cursor()
+        mi_cursor.execute("CREATE TEMP TABLE IF NOT EXISTS archivo_lote (folio INTEGER PRIMARY KEY)")
+        mi_cursor.execute("DELETE FROM temp.archivo_lote")
+        mi_cursor.execute("""
+            INSERT INTO temp.archivo_lote
+            SELECT folio FROM Reservaciones WHERE fecha < ? ORDER BY fecha LIMIT ?""",
+            (fecha_corte_iso, tamano_lote))
+        mi_cursor.execute("""
+            INSERT INTO ReservacionesArchivo (folio, cliente_clave, sala_clave, nombre, horario, fecha)
+            SELECT folio, cliente_clave, sala_clave, nombre, horario, fecha
+            FROM Reservaciones WHERE folio IN (SELECT folio FROM temp.archivo_lote)""")
+        mi_cursor.execute("DELETE FROM Reservaciones WHERE folio IN (SELECT folio FROM temp.archivo_lote)")
+        return mi_cursor.rowcount
+
+    total = 0
+    while True:
+        movidas = en_transaccion(DB_FILE, mover_lote)
+        total += movidas
+        if movidas < tamano_lote:
+            break
+    return total
+
+
+def mantenimiento_base():
+    """
+    ANALYZE + VACUUM: recompacta el archivo tras archivar y actualiza las estadísticas del planificador.
+    Antes reintenta la restricción única pendiente; devuelve los espacios duplicados que la impiden.
+    """
+    duplicados = completar_restriccion_unica()
+    with conexion(DB_FILE) as conn:
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return duplicados
+
+
+def cancelar_reservacion(folio):
+    """
+    Elimina una reservación sin pedir confirmación (uso programático).
+    Aplica la misma regla de 3 días que eliminar_reservacion.
+    Devuelve (estado, mensaje) con estado ELIMINADA, NO_ENCONTRADA o FUERA_DE_PLAZO.
+    """
+    def operacion(conn):
+        mi_cursor = conn.cursor()
+        mi_cursor.execute("SELECT fecha FROM Reservaciones WHERE folio = ?", (folio,))
+        registro = mi_cursor.fetchone()
+        if not registro:
+            return NO_ENCONTRADA, None
+        fecha_res = datetime.fromisoformat(registro[0]).date()
+        if (fecha_res - datetime.now().date()).days < 3:
+            return FUERA_DE_PLAZO, None
+        mi_cursor.execute("DELETE FROM Reservaciones WHERE folio = ?", (folio,))
+        return ELIMINADA, registro[0]
+
+    estado, fecha_iso = en_transaccion(DB_FILE, operacion)
+    if estado == NO_ENCONTRADA:
+        return estado, f"No se encontró una reservación con folio {folio}."
+    if estado == FUERA_DE_PLAZO:
+        return estado, "Solo pueden eliminarse reservaciones con al menos 3 días de anticipación."
+    invalidar_cache_fecha(fecha_iso)
+    return estado, f"Reservación con folio {folio} eliminada exitosamente."
 
 
 def eliminar_reservacion():
@@ -440,7 +1499,8 @@ def eliminar_reservacion():
         return
 
     try:
-        with sqlite3.connect(DB_FILE) as conn:
+        # la conexión de lectura vuelve al pool antes de en_transaccion, que toma otra
+        with conexion(DB_FILE) as conn:
             mi_cursor = conn.cursor()
             mi_cursor.execute("""
                 SELECT r.folio, u.nombre AS cliente, s.nombre AS sala, r.nombre AS evento, r.horario, r.fecha
@@ -450,32 +1510,33 @@ def eliminar_reservacion():
                 WHERE r.folio = ?
             """, (folio,))
             registro = mi_cursor.fetchone()
-            if not registro:
-                print(f"No se encontró una reservación con folio {folio}.")
-                return
+        if not registro:
+            print(f"No se encontró una reservación con folio {folio}.")
+            return
 
-            print("Reservación encontrada:")
-            print("Folio\tCliente\tSala\tEvento\tHorario\tFecha")
-            print(f"{registro[0]}\t{registro[1]}\t{registro[2]}\t{registro[3]}\t{registro[4]}\t{registro[5]}")
+        print("Reservación encontrada:")
+        print("Folio\tCliente\tSala\tEvento\tHorario\tFecha")
+        print(f"{registro[0]}\t{registro[1]}\t{registro[2]}\t{registro[3]}\t{registro[4]}\t{registro[5]}")
 
-            # verificar regla de 3 días
-            fecha_res = datetime.fromisoformat(registro[5]).date()
-            dias_restantes = (fecha_res - datetime.now().date()).days
-            if dias_restantes < 3:
-                print("Solo pueden eliminarse reservaciones con al menos 3 días de anticipación.")
-                return
+        # verificar regla de 3 días
+        fecha_res = datetime.fromisoformat(registro[5]).date()
+        dias_restantes = (fecha_res - datetime.now().date()).days
+        if dias_restantes < 3:
+            print("Solo pueden eliminarse reservaciones con al menos 3 días de anticipación.")
+            return
 
-            confirm = input("¿Confirma eliminación? Esto NO se puede deshacer. (S/N): ").strip().upper()
-            if confirm != 'S':
-                print("Eliminación cancelada.")
-                return
+        confirm = input("¿Confirma eliminación? Esto NO se puede deshacer. (S/N): ").strip().upper()
+        if confirm != 'S':
+            print("Eliminación cancelada.")
+            return
 
-            mi_cursor.execute("DELETE FROM Reservaciones WHERE folio = ?", (folio,))
-            conn.commit()
-            if mi_cursor.rowcount > 0:
-                print(f"Reservación con folio {folio} eliminada exitosamente.")
-            else:
-                print("No se pudo eliminar (posible condición de carrera).")
+        eliminada = en_transaccion(DB_FILE, lambda c: c.execute(
+            "DELETE FROM Reservaciones WHERE folio = ?", (folio,)).rowcount > 0)
+        invalidar_cache_fecha(registro[5])
+        if eliminada:
+            print(f"Reservación con folio {folio} eliminada exitosamente.")
+        else:
+            print("La reservación ya había sido eliminada desde otra terminal.")
     except Exception as e:
         print("Se produjo el siguiente error:", e)
 
@@ -497,8 +1558,10 @@ def menu():
         print("7. Salir del programa")
         print("8. Eliminar reservación")
         print("9. Exportar base de datos a Excel")
+        print("10. Reservaciones de un cliente")
+        print("11. Buscar reservaciones por evento, cliente o sala")
         try:
-            opcion = int(input("Selecciona una opción (1-9): ").strip())
+            opcion = int(input("Selecciona una opción (1-11): ").strip())
             if opcion == 1:
                 Registrar_Reservacion()
             elif opcion == 2:
@@ -513,19 +1576,29 @@ def menu():
                 Registrar_Cliente()
             elif opcion == 7:
                 print("Saliendo del programa...")
+                stats = estadisticas_cache()
+                print(f"Caché de consultas: {stats['aciertos']} aciertos, {stats['fallos']} fallos.")
                 sys.exit(0)
             elif opcion == 8:
                 eliminar_reservacion()
             elif opcion == 9:
                 exportar_base_de_datos_a_excel()
+            elif opcion == 10:
+                reporte_reservaciones_cliente()
+            elif opcion == 11:
+                buscar_reservaciones_menu()
             else:
-                print("Opción no válida. Por favor, selecciona un número entre 1 y 9.")
+                print("Opción no válida. Por favor, selecciona un número entre 1 y 11.")
         except ValueError:
-            print("Entrada no válida. Por favor, ingresa un número entre 1 y 9.")
+            print("Entrada no válida. Por favor, ingresa un número entre 1 y 11.")
         except KeyboardInterrupt:
             print("\nInterrupción. Saliendo.")
             sys.exit(0)
 
 
+if instrumentacion.habilitado_por_entorno():
+    instrumentacion.activar(sys.modules[__name__])
+
+
 if __name__ == "__main__":
     menu()
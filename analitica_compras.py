@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Analítica de bitácoras de compra en streaming (las métricas de Evidencia_Uno para archivos de varios GB)
+- Una sola pasada con generadores: entradas vendidas, primer y último comprador, compradores en
+  orden de primera compra (sin repetir) y cantidad de compradores distintos
+- Se lee en bloques de TAMANO_BLOQUE líneas: cada bloque se deduplica con un dict antes de buscar
+  sus nombres en los ya vistos (los compradores frecuentes se revisan una vez por bloque)
+- Modo "exacto": guarda el nombre de cada comprador distinto
+- Modo "huellas": guarda una huella blake2b de 64 bits por comprador distinto en lugar del nombre
+  (menos memoria con nombres largos). Dos nombres con la misma huella cuentan como uno y el segundo no aparece en
+  --unicos; con n compradores distintos la probabilidad de alguna colisión es menor que n² / 2^65
+  (~3e-6 con 10 millones, ~3e-4 con 100 millones)
+- Modo "aproximado": HyperLogLog, memoria fija (2^precision bytes) sin importar el tamaño del flujo
+- Con --procesos N el archivo se parte en N fragmentos por líneas completas, cada proceso resume el
+  suyo y los resúmenes parciales se combinan en orden
+
+El archivo tiene un comprador por línea, o es un CSV del que se toma la columna --columna.
+
+Uso:
+    python analitica_compras.py entradas.log --procesos 8 --unicos compradores_unicos.txt
+    python analitica_compras.py entradas.csv --columna 2 --modo aproximado
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+PRECISION_HLL = 14  # 16384 registros: error típico ~0.8 %
+TAMANO_BLOQUE = 65536  # compradores que se deduplican juntos antes de revisar los ya vistos
+MODOS = ("exacto", "huellas", "aproximado")
+
+
+def huella(texto):
+    """Hash estable de 64 bits (hash() cambia entre procesos, así que no sirve para combinar fragmentos)."""
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """Contador aproximado de distintos: 2^precision registros de un byte; se combinan con máximo por registro."""
+
+    def __init__(self, precision=PRECISION_HLL):
+        if not 4 <= precision <= 18:
+            raise ValueError("La precisión de HyperLogLog debe estar entre 4 y 18.")
+        self.precision = precision
+        self.registros = bytearray(1 << precision)
+
+    def agregar_huella(self, h):
+        resto_bits = 64 - self.precision
+        indice = h >> resto_bits
+        resto = h & ((1 << resto_bits) - 1)
+        rango = resto_bits - resto.bit_length() + 1  # posición del primer 1
+        if rango > self.registros[indice]:
+            self.registros[indice] = rango
+
+    def combinar(self, otro):
+        if otro.precision != self.precision:
+            raise ValueError("Sólo se combinan HyperLogLog de la misma precisión.")
+        self.registros = bytearray(map(max, self.registros, otro.registros))
+
+    def estimar(self):
+        m = len(self.registros)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimado = alfa * m * m / sum(2.0 ** -r for r in self.registros)
+        vacios = self.registros.count(0)
+        if estimado <= 2.5 * m and vacios:
+            estimado = m * math.log(m / vacios)  # corrección para cardinalidades pequeñas
+        return round(estimado)
+
+
+class ResumenCompras:
+    """
+    Métricas de un flujo de compradores, calculadas al vuelo.
+    salida_unicos: archivo de texto abierto donde se escribe cada comprador la primera vez que aparece
+    (modos exacto y huellas). Dos resúmenes de tramos consecutivos se combinan con combinar().
+    """
+
+    def __init__(self, modo="exacto", precision=PRECISION_HLL, salida_unicos=None):
+        if modo not in MODOS:
+            raise ValueError(f"Modo desconocido: {modo}")
+        if salida_unicos is not None and modo == "aproximado":
+            raise ValueError("La lista de compradores únicos requiere el modo exacto o huellas.")
+        self.modo = modo
+        self.ventas = 0
+        self.primero = None
+        self.ultimo = None
+        self.vistos = set() if modo != "aproximado" else None  # nombres (exacto) o huellas
+        self.hll = HyperLogLog(precision) if modo == "aproximado" else None
+        self.salida_unicos = salida_unicos
+
+    def clave(self, comprador):
+        """Lo que se guarda en vistos por cada comprador distinto."""
+        return huella(comprador) if self.modo == "huellas" else comprador
+
+    def agregar(self, comprador):
+        self.agregar_bloque([comprador])
+
+    def agregar_bloque(self, compradores):
+        """Agrega una lista de compradores en orden; cada nombre distinto del bloque se revisa una vez."""
+        if not compradores:
+            return
+        if not self.ventas:
+            self.primero = compradores[0]
+        self.ventas += len(compradores)
+        self.ultimo = compradores[-1]
+        distintos_bloque = dict.fromkeys(compradores)  # conserva el orden de primera aparición
+        if self.vistos is None:
+            for comprador in distintos_bloque:
+                self.hll.agregar_huella(huella(comprador))
+            return
+        vistos = self.vistos
+        if self.modo == "exacto":
+            nuevos = [comprador for comprador in distintos_bloque if comprador not in vistos]
+            vistos.update(nuevos)
+        else:
+            nuevos = []
+            for comprador in distintos_bloque:
+                h = huella(comprador)
+                if h not in vistos:
+                    vistos.add(h)
+                    nuevos.append(comprador)
+        if self.salida_unicos is not None and nuevos:
+            self.salida_unicos.write("\n".join(nuevos) + "\n")
+
+    def consumir(self, compradores, tamano_bloque=TAMANO_BLOQUE):
+        """Consume un iterable (p. ej. un generador) de compradores en bloques de memoria acotada."""
+        compradores = iter(compradores)
+        while True:
+            bloque = list(islice(compradores, tamano_bloque))
+            if not bloque:
+                return self
+            self.agregar_bloque(bloque)
+
+    def combinar(self, otro):
+        """Agrega el resumen de un tramo POSTERIOR del flujo."""
+        if otro.ventas:
+            if not self.ventas:
+                self.primero = otro.primero
+            self.ultimo = otro.ultimo
+            self.ventas += otro.ventas
+        if self.vistos is not None and otro.vistos is not None:
+            self.vistos |= otro.vistos
+        if self.hll is not None and otro.hll is not None:
+            self.hll.combinar(otro.hll)
+        return self
+
+    @property
+    def distintos(self):
+        return len(self.vistos) if self.vistos is not None else self.hll.estimar()
+
+    def como_dict(self):
+        return {
+            "entradas_vendidas": self.ventas,
+            "primer_comprador": self.primero,
+            "ultimo_comprador": self.ultimo,
+            "compradores_distintos": self.distintos,
+            "modo": self.modo,
+        }
+
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        estado["salida_unicos"] = None  # los archivos abiertos no viajan entre procesos
+        return estado
+
+
+def leer_compradores(ruta, inicio=0, fin=None, columna=None, delimitador=","):
+    """
+    Genera los compradores (sin espacios extremos, omitiendo vacíos) de las líneas que EMPIEZAN
+    en [inicio, fin) bytes del archivo. Con columna, cada línea es un registro CSV.
+    """
+    def lineas():
+        with open(ruta, "rb") as archivo:
+            archivo.seek(inicio)
+            posicion = inicio
+            for linea in archivo:
+                if fin is not None and posicion >= fin:
+                    break
+                posicion += len(linea)
+                yield linea.decode("utf-8")
+
+    if columna is None:
+        for linea in lineas():
+            comprador = linea.strip()
+            if comprador:
+                yield comprador
+    else:
+        for registro in csv.reader(lineas(), delimiter=delimitador):
+            if len(registro) > columna and registro[columna].strip():
+                yield registro[columna].strip()
+
+
+def dividir_en_fragmentos(ruta, partes):
+    """Parte el archivo en hasta `partes` rangos de bytes [inicio, fin) que empiezan al inicio de una línea."""
+    tamano = os.path.getsize(ruta)
+    cortes = [0]
+    with open(ruta, "rb") as archivo:
+        for k in range(1, partes):
+            archivo.seek(max(tamano * k // partes, cortes[-1]))
+            if archivo.tell() > 0:
+                archivo.seek(archivo.tell() - 1)
+                archivo.readline()  # avanzar hasta el inicio de la siguiente línea
+            cortes.append(min(archivo.tell(), tamano))
+    cortes.append(tamano)
+    return [(a, b) for a, b in zip(cortes, cortes[1:]) if b > a]
+
+
+def _resumir_fragmento(ruta, inicio, fin, modo, precision, columna, delimitador, ruta_unicos):
+    """Corre en otro proceso. Si ruta_unicos, escribe ahí los primeros de este fragmento y no devuelve los vistos."""
+    compradores = leer_compradores(ruta, inicio, fin, columna, delimitador)
+    if ruta_unicos is None:
+        return ResumenCompras(modo, precision).consumir(compradores)
+    with open(ruta_unicos, "w", encoding="utf-8") as salida:
+        resumen = ResumenCompras(modo, precision, salida).consumir(compradores)
+    resumen.vistos = None  # la lista del fragmento ya los contiene; se recalculan al combinar
+    return resumen
+
+
+def resumir_archivo(ruta, procesos=1, modo="exacto", precision=PRECISION_HLL, ruta_unicos=None,
+                    columna=None, delimitador=","):
+    """
+    Resume una bitácora completa. Con procesos > 1 la reparte en fragmentos; al combinar, la lista de
+    únicos de cada fragmento se filtra (en orden) contra los compradores ya vistos en los anteriores.
+    Devuelve el ResumenCompras total.
+    """
+    fragmentos = dividir_en_fragmentos(ruta, procesos) if procesos > 1 else [(0, None)]
+    if len(fragmentos) <= 1:
+        salida = open(ruta_unicos, "w", encoding="utf-8") if ruta_unicos else None
+        try:
+            resumen = ResumenCompras(modo, precision, salida)
+            return resumen.consumir(leer_compradores(ruta, columna=columna, delimitador=delimitador))
+        finally:
+            if salida:
+                salida.close()
+
+    temporal = tempfile.mkdtemp(prefix="analitica_") if ruta_unicos else None
+    try:
+        rutas_unicos = [os.path.join(temporal, f"fragmento_{k}.txt") if temporal else None
+                        for k in range(len(fragmentos))]
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            parciales = list(pool.map(_resumir_fragmento, *zip(*[
+                (ruta, inicio, fin, modo, precision, columna, delimitador, rutas_unicos[k])
+                for k, (inicio, fin) in enumerate(fragmentos)])))
+        total = ResumenCompras(modo, precision)
+        for parcial in parciales:
+            total.combinar(parcial)
+        if ruta_unicos:
+            with open(ruta_unicos, "w", encoding="utf-8") as salida:
+                for ruta_fragmento in rutas_unicos:
+                    with open(ruta_fragmento, encoding="utf-8") as archivo:
+                        for linea in archivo:
+                            clave = total.clave(linea[:-1])
+                            if clave not in total.vistos:
+                                total.vistos.add(clave)
+                                salida.write(linea)
+        return total
+    finally:
+        if temporal:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Métricas de una bitácora de compras en una sola pasada.")
+    parser.add_argument("archivo")
+    parser.add_argument("--procesos", type=int, default=1, help="fragmentos procesados en paralelo")
+    parser.add_argument("--modo", choices=MODOS, default="exacto",
+                        help="distintos por nombre (exacto), por huella de 64 bits o con HyperLogLog")
+    parser.add_argument("--precision", type=int, default=PRECISION_HLL, help="bits de índice de HyperLogLog")
+    parser.add_argument("--unicos", help="escribir aquí los compradores en orden de primera compra")
+    parser.add_argument("--columna", type=int, help="columna del comprador si el archivo es CSV (desde 0)")
+    parser.add_argument("--delimitador", default=",")
+    parser.add_argument("--listar", action="store_true", help="imprimir la lista completa en orden de compra")
+    parser.add_argument("--json", action="store_true", help="imprimir el resumen como JSON")
+    args = parser.parse_args(argv)
+
+    if args.listar:
+        print("Lista de compradores en orden de compra:")
+        for comprador in leer_compradores(args.archivo, columna=args.columna, delimitador=args.delimitador):
+            print("-", comprador)
+    resumen = resumir_archivo(args.archivo, args.procesos, args.modo, args.precision, args.unicos,
+                              args.columna, args.delimitador)
+    if args.json:
+        print(json.dumps(resumen.como_dict(), ensure_ascii=False, indent=2))
+        return 0
+    print("Entradas vendidas:", resumen.ventas)
+    print("Primer comprador:", resumen.primero)
+    print("Último comprador:", resumen.ultimo)
+    aproximado = " (aprox.)" if args.modo == "aproximado" else ""
+    print(f"Cantidad de compradores distintos{aproximado}:", resumen.distintos)
+    if args.unicos:
+        print(f"Compradores en orden de primera compra guardados en '{args.unicos}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Benchmark de búsqueda de texto: índice FTS5 contra LIKE '%...%'
+- Usa (o genera) las bases sintéticas de benchmark.py y les crea el índice de búsqueda si no lo tienen
+- Busca nombres de clientes, de salas y de eventos al azar con buscar_reservaciones (FTS5, por relevancia)
+  y con buscar_reservaciones_like (recorre la tabla)
+- Reporta mediana y p95 por escala y tipo de búsqueda, en JSON
+
+Uso:
+    python bench_busqueda.py --escalas 10000,1000000
+"""
+
+import argparse
+import contextlib
+import json
+import random
+import sys
+import time
+
+import Evidencia_Tres as reservas
+import benchmark
+from conexiones import cerrar_todas
+
+
+def terminos(meta, cantidad, semilla=11):
+    """Términos de búsqueda (tipo, texto) sobre los nombres que genera benchmark.generar_base."""
+    rnd = random.Random(semilla)
+    resultado = []
+    for _ in range(cantidad):
+        resultado.append(("cliente", f"Cliente {rnd.randint(1, meta['usuarios'])}"))
+        resultado.append(("sala", f"Sala {rnd.randint(1, meta['salas'])}"))
+        resultado.append(("evento", f"Evento {rnd.randrange(meta['reservaciones'])}"))
+    return resultado
+
+
+def medir(ruta, meta, repeticiones, limite):
+    reservas.DB_FILE = ruta
+    with contextlib.redirect_stdout(sys.stderr):
+        inicio = time.perf_counter()
+        reservas.preparar_base()  # crea y llena el índice FTS5 si la base es anterior a la v5
+        segundos_indice = time.perf_counter() - inicio
+    tiempos = {}
+    for tipo, texto in terminos(meta, repeticiones):
+        for metodo, funcion in (("fts5", reservas.buscar_reservaciones),
+                                ("like", reservas.buscar_reservaciones_like)):
+            inicio = time.perf_counter()
+            funcion(texto, limite)
+            tiempos.setdefault((tipo, metodo), []).append((time.perf_counter() - inicio) * 1000)
+    return segundos_indice, tiempos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda FTS5 contra LIKE.")
+    parser.add_argument("--escalas", default="10000,100000,1000000")
+    parser.add_argument("--usuarios", type=int, default=10000)
+    parser.add_argument("--salas", type=int, default=500)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--limite", type=int, default=reservas.TAMANO_BUSQUEDA, help="resultados por búsqueda")
+    parser.add_argument("--datos", default=benchmark.DIRECTORIO_DATOS)
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for escala in (int(e) for e in args.escalas.split(",")):
+        with contextlib.redirect_stdout(sys.stderr):
+            ruta, meta = benchmark.preparar_base(args.usuarios, args.salas, escala, args.datos)
+        segundos_indice, tiempos = medir(ruta, meta, args.repeticiones, args.limite)
+        print(f"Escala {escala}: índice listo en {segundos_indice:.2f} s", file=sys.stderr)
+        for (tipo, metodo), valores in sorted(tiempos.items()):
+            fila = {"reservaciones": escala, "busqueda": tipo, "metodo": metodo, **benchmark.resumir(valores)}
+            resultados.append(fila)
+            print(f"  {tipo:8s} {metodo:5s} mediana {fila['mediana_ms']:10.3f} ms   p95 {fila['p95_ms']:10.3f} ms",
+                  file=sys.stderr)
+        cerrar_todas()
+    print(json.dumps({"limite": args.limite, "resultados": resultados}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
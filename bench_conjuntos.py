@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Benchmark de conjuntos.py contra set
+- Genera dos listas de IDs (p. ej. inscritos en Python y en Java) con traslape y duplicados
+- Para cada respaldo (set de str, set de int, ConjuntoOrdenado, ConjuntoBitmap) mide la memoria
+  del conjunto construido (tracemalloc) y el tiempo de construcción, unión, intersección,
+  diferencia, intersection_update y difference_update
+- Con --archivos mide además operar_archivos (ordenamiento externo + mezcla en streaming)
+
+Uso:
+    python bench_conjuntos.py --ids 10000000 --rango 40000000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import conjuntos
+
+RESPALDOS = ("set_str", "set_int", "ordenado", "bitmap")
+
+
+def generar_ids(cantidad, rango, semilla):
+    return np.random.default_rng(semilla).integers(0, rango, cantidad, dtype=np.int64)
+
+
+def construir(respaldo, ids):
+    if respaldo == "set_str":
+        return set(map(str, ids.tolist()))
+    if respaldo == "set_int":
+        return set(ids.tolist())
+    return conjuntos.crear(ids, respaldo)
+
+
+def memoria(respaldo, ids):
+    """Bytes que ocupa el conjunto ya construido (sin contar la lista de IDs de entrada)."""
+    gc.collect()
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    conjunto = construir(respaldo, ids)
+    usada = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    del conjunto
+    return usada
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return (time.perf_counter() - inicio) * 1000, resultado
+
+
+def medir_respaldo(respaldo, ids_a, ids_b):
+    fila = {"respaldo": respaldo, "memoria_mb": round(memoria(respaldo, ids_a) / 2**20, 1)}
+    fila["construir_ms"], a = cronometrar(lambda: construir(respaldo, ids_a))
+    b = construir(respaldo, ids_b)
+    fila["union_ms"], u = cronometrar(lambda: a.union(b))
+    fila["interseccion_ms"], i = cronometrar(lambda: a.intersection(b))
+    fila["diferencia_ms"], d = cronometrar(lambda: a.difference(b))
+    copia = a.copy()
+    fila["intersection_update_ms"], _ = cronometrar(lambda: copia.intersection_update(b))
+    copia = a.copy()
+    fila["difference_update_ms"], _ = cronometrar(lambda: copia.difference_update(b))
+    fila["tamanos"] = [len(u), len(i), len(d)]
+    return {k: round(v, 1) if isinstance(v, float) else v for k, v in fila.items()}
+
+
+def medir_archivos(ids_a, ids_b, tamano_bloque):
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        rutas = []
+        for nombre, ids in (("a", ids_a), ("b", ids_b)):
+            ruta = os.path.join(tmp, f"{nombre}.txt")
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                for inicio in range(0, len(ids), tamano_bloque):
+                    archivo.write("\n".join(map(str, ids[inicio:inicio + tamano_bloque].tolist())) + "\n")
+            rutas.append(ruta)
+        for operacion in conjuntos.OPERACIONES:
+            ms, total = cronometrar(lambda: conjuntos.operar_archivos(
+                rutas[0], rutas[1], operacion, os.path.join(tmp, "salida.txt"), tamano_bloque, directorio_temporal=tmp))
+            resultados[operacion] = {"ms": round(ms, 1), "ids": total}
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de conjuntos compactos contra set.")
+    parser.add_argument("--ids", type=int, default=2000000, help="IDs por lista (con duplicados)")
+    parser.add_argument("--rango", type=int, default=4000000, help="los IDs van de 0 a rango - 1")
+    parser.add_argument("--respaldos", default=",".join(RESPALDOS))
+    parser.add_argument("--archivos", action="store_true", help="medir también operar_archivos")
+    parser.add_argument("--bloque", type=int, default=conjuntos.TAMANO_BLOQUE // 4,
+                        help="IDs por bloque para operar_archivos")
+    args = parser.parse_args(argv)
+
+    ids_a = generar_ids(args.ids, args.rango, 1)
+    ids_b = generar_ids(args.ids, args.rango, 2)
+    informe = {"ids": args.ids, "rango": args.rango, "resultados": []}
+    for respaldo in args.respaldos.split(","):
+        fila = medir_respaldo(respaldo, ids_a, ids_b)
+        informe["resultados"].append(fila)
+        print(f"{respaldo:9s} {fila['memoria_mb']:8.1f} MB  construir {fila['construir_ms']:9.1f} ms  "
+              f"unión {fila['union_ms']:8.1f} ms  intersección {fila['interseccion_ms']:8.1f} ms  "
+              f"diferencia {fila['diferencia_ms']:8.1f} ms", file=sys.stderr)
+    if args.archivos:
+        informe["archivos"] = medir_archivos(ids_a, ids_b, args.bloque)
+    print(json.dumps(informe, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Benchmark de coordenadas.py
+- Genera N puntos GPS (o usa un archivo binario existente con --archivo) y los abre mapeados en memoria
+- Clasificación de hemisferios: el ciclo por tupla de Evidencia_Uno contra clasificar() vectorizado y
+  contra contar_hemisferios() sobre el archivo mapeado; reporta puntos por segundo
+- IndiceCuadricula: tiempo de construcción y mediana/p95 de consultas de caja y de punto más cercano,
+  comparadas con recorrer todos los puntos (máscara vectorizada / haversine contra todos)
+
+Uso:
+    python bench_coordenadas.py --puntos 10000000
+    python bench_coordenadas.py --archivo puntos.bin --consultas 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import coordenadas
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+def resumir(segundos):
+    ordenados = sorted(s * 1000 for s in segundos)
+    return {"mediana_ms": round(statistics.median(ordenados), 3),
+            "p95_ms": round(ordenados[min(len(ordenados) - 1, int(0.95 * len(ordenados)))], 3)}
+
+
+def generar_puntos(ruta, cantidad, semilla):
+    """Mitad uniforme en el globo, mitad concentrada alrededor de unas cuantas ciudades (como flotas GPS)."""
+    rng = np.random.default_rng(semilla)
+    ciudades = np.array([(19.43, -99.13), (40.71, -74.0), (-23.55, -46.63), (51.5, -0.12), (35.68, 139.69)])
+    with open(ruta, "wb") as archivo:
+        for inicio in range(0, cantidad, coordenadas.TAMANO_BLOQUE):
+            n = min(coordenadas.TAMANO_BLOQUE, cantidad - inicio)
+            uniformes = n // 2
+            centros = ciudades[rng.integers(0, len(ciudades), n - uniformes)]
+            latitudes = np.concatenate((rng.uniform(-90, 90, uniformes), centros[:, 0] + rng.normal(0, 0.3, n - uniformes)))
+            longitudes = np.concatenate((rng.uniform(-180, 180, uniformes), centros[:, 1] + rng.normal(0, 0.3, n - uniformes)))
+            np.column_stack((np.clip(latitudes, -90, 90), longitudes)).tofile(archivo)
+
+
+def medir_clasificacion(puntos, muestra_ciclo):
+    resultados = {}
+    tuplas = list(map(tuple, np.asarray(puntos[:muestra_ciclo]).tolist()))
+    segundos, _ = cronometrar(lambda: [coordenadas.hemisferios_tupla(t) for t in tuplas])
+    resultados["ciclo_por_tupla"] = len(tuplas) / segundos
+    memoria = np.asarray(puntos)
+    latitudes, longitudes = np.ascontiguousarray(memoria[:, 0]), np.ascontiguousarray(memoria[:, 1])
+    segundos, _ = cronometrar(lambda: coordenadas.clasificar(latitudes, longitudes))
+    resultados["clasificar_vectorizado"] = len(latitudes) / segundos
+    segundos, _ = cronometrar(lambda: coordenadas.contar_hemisferios(puntos))
+    resultados["contar_hemisferios_mapeado"] = len(puntos) / segundos
+    return {metodo: round(valor) for metodo, valor in resultados.items()}, latitudes, longitudes
+
+
+def medir_indice(latitudes, longitudes, consultas, lado_caja, semilla):
+    rng = np.random.default_rng(semilla)
+    informe = {}
+    informe["construir_s"], indice = cronometrar(lambda: coordenadas.IndiceCuadricula(latitudes, longitudes))
+    informe["construir_s"] = round(informe["construir_s"], 3)
+    informe["tamano_celda"] = round(indice.tamano_celda, 4)
+    muestras = rng.integers(0, len(latitudes), consultas)  # consultas alrededor de puntos existentes
+    tiempos = {"caja_indice": [], "caja_recorrido": [], "cercano_indice": [], "cercano_recorrido": []}
+    for k in muestras.tolist():
+        lat, lon = float(latitudes[k]), float(longitudes[k])
+        caja = (lat - lado_caja / 2, lon - lado_caja / 2, lat + lado_caja / 2, lon + lado_caja / 2)
+        segundos, por_indice = cronometrar(lambda: indice.en_caja(*caja))
+        tiempos["caja_indice"].append(segundos)
+        segundos, por_recorrido = cronometrar(lambda: np.flatnonzero(coordenadas._en_caja(latitudes, longitudes, *caja)))
+        tiempos["caja_recorrido"].append(segundos)
+        assert np.array_equal(por_indice, por_recorrido)
+        lat, lon = lat + rng.normal(0, 0.05), lon + rng.normal(0, 0.05)
+        segundos, (_, distancia) = cronometrar(lambda: indice.mas_cercano(lat, lon))
+        tiempos["cercano_indice"].append(segundos)
+        segundos, distancias = cronometrar(lambda: coordenadas.haversine_km(lat, lon, latitudes, longitudes))
+        tiempos["cercano_recorrido"].append(segundos)
+        assert abs(float(distancias.min()) - distancia) < 1e-9
+    informe.update({consulta: resumir(valores) for consulta, valores in tiempos.items()})
+    return informe
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de clasificación e índice de coordenadas.")
+    parser.add_argument("--puntos", type=int, default=2000000)
+    parser.add_argument("--archivo", help="archivo binario (lat, lon) float64 existente en lugar de generar")
+    parser.add_argument("--muestra-ciclo", type=int, default=1000000, help="puntos para el ciclo por tupla")
+    parser.add_argument("--consultas", type=int, default=100)
+    parser.add_argument("--lado-caja", type=float, default=1.0, help="lado de las cajas consultadas, en grados")
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = args.archivo
+        if ruta is None:
+            ruta = os.path.join(tmp, "puntos.bin")
+            generar_puntos(ruta, args.puntos, args.semilla)
+        puntos = coordenadas.abrir_puntos(ruta)
+        rendimiento, latitudes, longitudes = medir_clasificacion(puntos, args.muestra_ciclo)
+        del puntos
+    for metodo, por_segundo in rendimiento.items():
+        print(f"{metodo:28s} {por_segundo / 1e6:10.2f} M puntos/s", file=sys.stderr)
+    indice = medir_indice(latitudes, longitudes, args.consultas, args.lado_caja, args.semilla)
+    print(f"índice: {indice['construir_s']} s, celda {indice['tamano_celda']}°", file=sys.stderr)
+    for consulta in ("caja_indice", "caja_recorrido", "cercano_indice", "cercano_recorrido"):
+        print(f"  {consulta:18s} mediana {indice[consulta]['mediana_ms']:10.3f} ms   "
+              f"p95 {indice[consulta]['p95_ms']:10.3f} ms", file=sys.stderr)
+    print(json.dumps({"puntos": len(latitudes), "puntos_por_segundo": rendimiento, "indice": indice}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
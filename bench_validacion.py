@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Microbenchmark del costo por reservación: validación e inserción
+- Genera N solicitudes sintéticas (por defecto un millón) con fechas dd/mm/aaaa, turnos en
+  mayúsculas/minúsculas y una fracción de solicitudes inválidas
+- Compara el costo de CPU por solicitud de la validación original (strptime + isoformat por
+  solicitud) contra validar_solicitud (fechas memorizadas, turnos precalculados)
+- Inserta M reservaciones válidas en una base temporal, una transacción por reservación con
+  _insertar_si_libre (como Registrar_Reservacion) contra registrar_reservaciones_lote, y reporta
+  el tiempo por reservación de cada camino
+
+Uso:
+    python bench_validacion.py --solicitudes 1000000 --reservaciones 20000
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import Evidencia_Tres as reservas
+from conexiones import cerrar_todas, conexion, en_transaccion
+
+
+def validar_original(solicitud, limite):
+    """La validación tal como estaba antes de validar_solicitud (referencia para comparar)."""
+    try:
+        cliente_clave, sala_clave, nombre, horario, fecha = solicitud
+        cliente_clave = int(cliente_clave)
+        sala_clave = int(sala_clave)
+    except (TypeError, ValueError):
+        return reservas.INVALIDA, "Solicitud mal formada o claves no numéricas."
+    nombre = (nombre or "").strip()
+    horario = (horario or "").strip().upper()
+    try:
+        fecha = datetime.strptime(fecha.strip(), "%d/%m/%Y").date()
+    except ValueError:
+        try:
+            fecha = datetime.strptime(fecha.strip(), "%Y-%m-%d").date()
+        except ValueError:
+            fecha = None
+    if not nombre:
+        return reservas.INVALIDA, "El nombre de la reservación no puede estar vacío."
+    if horario not in reservas.TURNOS:
+        return reservas.INVALIDA, "Horario inválido."
+    if fecha is None:
+        return reservas.INVALIDA, "Fecha no válida."
+    if fecha < limite:
+        return reservas.INVALIDA, "Se requieren al menos 2 días de anticipación."
+    return None, (cliente_clave, sala_clave, nombre, horario, fecha.isoformat())
+
+
+def generar_solicitudes(cantidad, dias=365, semilla=7):
+    """Solicitudes repartidas en `dias` fechas a partir de hoy; ~5 % son inválidas."""
+    rnd = random.Random(semilla)
+    hoy = datetime.now().date()
+    fechas = [(hoy + timedelta(days=d)).strftime("%d/%m/%Y") for d in range(dias)] + ["31/02/2030", "2030-13-01"]
+    turnos = list(reservas.TURNOS) + [t.lower() for t in reservas.TURNOS] + ["X"]
+    return [
+        (rnd.randint(1, 10000), rnd.randint(1, 500), f"Evento {i}" if i % 97 else "  ",
+         rnd.choice(turnos), rnd.choice(fechas))
+        for i in range(cantidad)
+    ]
+
+
+def medir_validacion(solicitudes):
+    limite = datetime.now().date() + timedelta(days=2)
+    limite_iso = limite.isoformat()
+    reservas._texto_a_fecha_iso.cache_clear()
+
+    inicio = time.process_time()
+    antes = [validar_original(s, limite) for s in solicitudes]
+    segundos_antes = time.process_time() - inicio
+
+    inicio = time.process_time()
+    despues = [reservas.validar_solicitud(s, limite_iso) for s in solicitudes]
+    segundos_despues = time.process_time() - inicio
+
+    assert antes == despues, "las dos validaciones deben dar el mismo resultado"
+    return segundos_antes, segundos_despues
+
+
+def solicitudes_libres(cantidad, salas):
+    """Solicitudes válidas del cliente 1, cada una a un espacio distinto, desde dentro de 3 días."""
+    hoy = datetime.now().date()
+    resultado = []
+    for i in range(cantidad):
+        dia, resto = divmod(i, salas * len(reservas.TURNOS))
+        sala, turno = divmod(resto, len(reservas.TURNOS))
+        fecha = (hoy + timedelta(days=3 + dia)).strftime("%d/%m/%Y")
+        resultado.append((1, sala + 1, f"Evento {i}", reservas.TURNOS[turno], fecha))
+    return resultado
+
+
+def _base_temporal(ruta, salas):
+    reservas.DB_FILE = ruta
+    with contextlib.redirect_stdout(sys.stderr):
+        reservas.preparar_base()
+    with conexion(ruta) as conn:
+        conn.execute("INSERT INTO Usuarios (nombre) VALUES ('Cliente 1')")
+        conn.executemany("INSERT INTO Salas (nombre, capacidad) VALUES (?, 10)",
+                         ((f"Sala {i}",) for i in range(1, salas + 1)))
+    reservas.invalidar_cache_salas()
+
+
+def medir_insercion(cantidad, salas, directorio):
+    """Segundos para insertar `cantidad` reservaciones por cada camino, cada uno en su propia base."""
+    solicitudes = solicitudes_libres(cantidad, salas)
+    limite_iso = (datetime.now().date() + timedelta(days=2)).isoformat()
+
+    _base_temporal(os.path.join(directorio, "por_reservacion.db"), salas)
+    inicio = time.perf_counter()
+    for solicitud in solicitudes:
+        _, datos = reservas.validar_solicitud(solicitud, limite_iso)
+        folio = en_transaccion(reservas.DB_FILE, lambda conn: reservas._insertar_si_libre(conn, *datos))
+        assert folio is not None, "los espacios generados son distintos"
+        reservas.invalidar_cache_fecha(datos[4])
+    segundos_por_reservacion = time.perf_counter() - inicio
+    cerrar_todas()
+
+    _base_temporal(os.path.join(directorio, "lote.db"), salas)
+    inicio = time.perf_counter()
+    resultados = reservas.registrar_reservaciones_lote(solicitudes)
+    segundos_lote = time.perf_counter() - inicio
+    cerrar_todas()
+    assert all(estado == reservas.ACEPTADA for estado, _ in resultados)
+    return segundos_por_reservacion, segundos_lote
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmark de validación e inserción de reservaciones.")
+    parser.add_argument("--solicitudes", type=int, default=1000000, help="solicitudes a validar")
+    parser.add_argument("--reservaciones", type=int, default=20000, help="reservaciones a insertar (0 = omitir)")
+    parser.add_argument("--salas", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    solicitudes = generar_solicitudes(args.solicitudes)
+    antes, despues = medir_validacion(solicitudes)
+    n = args.solicitudes
+    informe = {
+        "solicitudes": n,
+        "validacion_us_antes": round(antes / n * 1e6, 3),
+        "validacion_us_despues": round(despues / n * 1e6, 3),
+        "validacion_aceleracion": round(antes / despues, 2) if despues else None,
+        "cache_fechas": reservas._texto_a_fecha_iso.cache_info()._asdict(),
+    }
+    if args.reservaciones:
+        with tempfile.TemporaryDirectory() as tmp:
+            individual, lote = medir_insercion(args.reservaciones, args.salas, tmp)
+        m = args.reservaciones
+        informe.update({
+            "reservaciones": m,
+            "insercion_us_por_reservacion": round(individual / m * 1e6, 3),
+            "insercion_us_lote": round(lote / m * 1e6, 3),
+            "insercion_aceleracion": round(individual / lote, 2) if lote else None,
+        })
+    print(json.dumps(informe, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
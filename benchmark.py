@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Benchmark del Sistema de Reservaciones a escala realista
+- Genera bases sintéticas con N Usuarios, M Salas y K Reservaciones repartidas en fechas y TURNOS
+- Mide las operaciones principales: verificación de conflicto, disponibilidad de una fecha,
+  recomendación de sala, reporte por fecha, historial de un cliente, exportación completa y eliminación
+- Corre en varias escalas y guarda resultados en JSON para comparar entre versiones
+
+Uso:
+    python benchmark.py --escalas 10000,1000000,10000000 --salida resultados.json
+    python benchmark.py --escalas 10000 --comparar resultados_anteriores.json
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import Evidencia_Tres as reservas
+from conexiones import cerrar_todas, conexion, en_transaccion
+
+DIRECTORIO_DATOS = "bench_datos"
+OCUPACION = 0.5          # fracción de espacios (fecha, sala, turno) ocupados
+TAMANO_LOTE = 50000
+TOLERANCIA_REGRESION = 1.25  # 25 % más lento que la referencia se marca como regresión
+
+
+def _zancada(total):
+    """Un paso coprimo con `total` para recorrer los espacios en un orden pseudoaleatorio sin repetir."""
+    paso = int(total * 0.6180339887) | 1
+    while math.gcd(paso, total) != 1:
+        paso += 2
+    return paso
+
+
+def generar_base(ruta, usuarios, salas, reservaciones, fecha_inicio=None):
+    """
+    Crea una base sintética en `ruta`. Las reservaciones ocupan OCUPACION de los espacios disponibles
+    en tantos días como hagan falta, empezando en fecha_inicio (por defecto, dentro de 10 días
+    para que la regla de 3 días permita eliminarlas).
+    Devuelve los metadatos de la base (fechas, conteos).
+    """
+    fecha_inicio = fecha_inicio or (datetime.now().date() + timedelta(days=10))
+    espacios_por_dia = salas * len(reservas.TURNOS)
+    dias = max(1, math.ceil(reservaciones / OCUPACION / espacios_por_dia))
+    total_espacios = dias * espacios_por_dia
+    paso = _zancada(total_espacios)
+
+    reservas.DB_FILE = ruta
+    reservas.Crear_tabla()
+    cerrar_todas()
+    conn = sqlite3.connect(ruta)
+    conn.execute("PRAGMA synchronous = OFF")
+    try:
+        conn.executemany("INSERT INTO Usuarios (nombre) VALUES (?)",
+                         ((f"Cliente {i}",) for i in range(1, usuarios + 1)))
+        conn.executemany("INSERT INTO Salas (nombre, capacidad) VALUES (?, ?)",
+                         ((f"Sala {i}", 5 + (i * 7) % 96) for i in range(1, salas + 1)))
+        conn.commit()
+
+        def filas():
+            for j in range(reservaciones):
+                espacio = (j * paso) % total_espacios
+                dia, resto = divmod(espacio, espacios_por_dia)
+                sala, turno = divmod(resto, len(reservas.TURNOS))
+                yield (1 + (j * 7919) % usuarios, sala + 1, f"Evento {j}", reservas.TURNOS[turno],
+                       (fecha_inicio + timedelta(days=dia)).isoformat())
+
+        generador = filas()
+        while True:
+            lote = [f for _, f in zip(range(TAMANO_LOTE), generador)]
+            if not lote:
+                break
+            conn.executemany(
+                "INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) VALUES (?, ?, ?, ?, ?)",
+                lote)
+            conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    return {"usuarios": usuarios, "salas": salas, "reservaciones": reservaciones,
+            "fecha_inicio": fecha_inicio.isoformat(), "dias": dias}
+
+
+def preparar_base(usuarios, salas, reservaciones, directorio=DIRECTORIO_DATOS):
+    """Reutiliza la base sintética de esa escala si ya existe; si no, la genera."""
+    os.makedirs(directorio, exist_ok=True)
+    nombre = f"bench_u{usuarios}_s{salas}_r{reservaciones}"
+    ruta = os.path.join(directorio, nombre + ".db")
+    ruta_meta = os.path.join(directorio, nombre + ".json")
+    if os.path.exists(ruta) and os.path.exists(ruta_meta):
+        with open(ruta_meta, encoding="utf-8") as f:
+            meta = json.load(f)
+        if date.fromisoformat(meta["fecha_inicio"]) > datetime.now().date() + timedelta(days=3):
+            return ruta, meta
+        os.remove(ruta)  # las fechas ya no permiten eliminar: se regenera
+    inicio = time.perf_counter()
+    meta = generar_base(ruta, usuarios, salas, reservaciones)
+    meta["segundos_generacion"] = round(time.perf_counter() - inicio, 2)
+    with open(ruta_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return ruta, meta
+
+
+def _medir(funcion, repeticiones, preparar=None):
+    """Ejecuta funcion() `repeticiones` veces y devuelve tiempos en ms; preparar() corre fuera de la medición."""
+    tiempos = []
+    for _ in range(repeticiones):
+        argumento = preparar() if preparar else None
+        inicio = time.perf_counter()
+        funcion(argumento)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def medir_operaciones(ruta, meta, repeticiones=20, exportar=True):
+    reservas.DB_FILE = ruta
+    reservas.limpiar_cache()
+    rnd = random.Random(42)
+    inicio = date.fromisoformat(meta["fecha_inicio"])
+    fechas = [(inicio + timedelta(days=d)).isoformat() for d in range(meta["dias"])]
+
+    with conexion(ruta) as conn:
+        max_folio = conn.execute("SELECT MAX(folio) FROM Reservaciones").fetchone()[0]
+
+    def reservacion_al_azar(_=None):
+        with conexion(ruta) as conn:
+            while True:
+                fila = conn.execute(
+                    "SELECT folio, cliente_clave, sala_clave, nombre, horario, fecha FROM Reservaciones WHERE folio = ?",
+                    (rnd.randint(1, max_folio),)).fetchone()
+                if fila:
+                    return fila
+
+    def conflicto(fila):
+        _, cliente, sala, nombre, horario, fecha = fila
+        folio = en_transaccion(ruta, lambda c: reservas._insertar_si_libre(c, cliente, sala, nombre, horario, fecha))
+        assert folio is None
+
+    def disponibilidad(fecha):
+        reservas.limpiar_cache()
+        reservas.disponibilidad_por_fecha(fecha)
+
+    def reporte(fecha):
+        reservas.limpiar_cache()
+        reservas.reservaciones_por_fecha(fecha)
+
+    def recomendar(fecha):
+        reservas.limpiar_cache()
+        reservas.recomendar_salas(rnd.randint(1, 100), fecha, rnd.choice(reservas.TURNOS))
+
+    def historial(cliente):
+        for proximas in (True, False):
+            for _ in reservas.iterar_reservaciones_cliente(cliente, proximas):
+                pass
+
+    eliminadas = []
+
+    def eliminar(fila):
+        estado, mensaje = reservas.cancelar_reservacion(fila[0])
+        assert estado == reservas.ELIMINADA, mensaje
+        eliminadas.append(fila)
+
+    resultados = {
+        "conflicto": _medir(conflicto, repeticiones, reservacion_al_azar),
+        "disponibilidad": _medir(disponibilidad, repeticiones, lambda: rnd.choice(fechas)),
+        "recomendar_sala": _medir(recomendar, repeticiones, lambda: rnd.choice(fechas)),
+        "reporte_fecha": _medir(reporte, repeticiones, lambda: rnd.choice(fechas)),
+        "historial_cliente": _medir(historial, repeticiones, lambda: rnd.randint(1, meta["usuarios"])),
+        "eliminar": _medir(eliminar, repeticiones, reservacion_al_azar),
+    }
+
+    # restaurar lo eliminado para que la base sirva en la siguiente corrida
+    with conexion(ruta) as conn:
+        conn.executemany(
+            "INSERT INTO Reservaciones (folio, cliente_clave, sala_clave, nombre, horario, fecha) VALUES (?, ?, ?, ?, ?, ?)",
+            eliminadas)
+
+    if exportar:
+        directorio_actual = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                resultados["exportar_csv"] = _medir(
+                    lambda _: reservas.exportar_registros_a_csv(reservas.iterar_reservaciones(), "bench"), 1)
+            finally:
+                os.chdir(directorio_actual)
+    return resultados
+
+
+def resumir(tiempos):
+    ordenados = sorted(tiempos)
+    return {
+        "repeticiones": len(tiempos),
+        "min_ms": round(ordenados[0], 3),
+        "mediana_ms": round(statistics.median(ordenados), 3),
+        "p95_ms": round(ordenados[min(len(ordenados) - 1, int(0.95 * len(ordenados)))], 3),
+    }
+
+
+def comparar(actual, referencia, tolerancia=TOLERANCIA_REGRESION):
+    """Lista de (escala, operacion, mediana_anterior, mediana_actual) más lentas que la tolerancia."""
+    previas = {(r["reservaciones"], r["operacion"]): r["mediana_ms"] for r in referencia["resultados"]}
+    regresiones = []
+    for r in actual["resultados"]:
+        anterior = previas.get((r["reservaciones"], r["operacion"]))
+        if anterior and r["mediana_ms"] > anterior * tolerancia:
+            regresiones.append((r["reservaciones"], r["operacion"], anterior, r["mediana_ms"]))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del sistema de reservaciones.")
+    parser.add_argument("--escalas", default="10000,100000,1000000",
+                        help="número de reservaciones por escala, separado por comas")
+    parser.add_argument("--usuarios", type=int, default=10000)
+    parser.add_argument("--salas", type=int, default=500)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--sin-exportar", action="store_true", help="omitir la exportación completa")
+    parser.add_argument("--datos", default=DIRECTORIO_DATOS, help="directorio de las bases sintéticas")
+    parser.add_argument("--salida", help="archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para detectar regresiones")
+    args = parser.parse_args(argv)
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "resultados": [],
+    }
+    for escala in (int(e) for e in args.escalas.split(",")):
+        # los mensajes de Evidencia_Tres van a stderr para que stdout sea sólo el JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            ruta, meta = preparar_base(args.usuarios, args.salas, escala, args.datos)
+            print(f"Escala {escala} reservaciones ({meta['dias']} días): {ruta}")
+            medidas = medir_operaciones(ruta, meta, args.repeticiones, not args.sin_exportar)
+        for operacion, tiempos in medidas.items():
+            fila = {"reservaciones": escala, "usuarios": args.usuarios, "salas": args.salas,
+                    "operacion": operacion, **resumir(tiempos)}
+            informe["resultados"].append(fila)
+            print(f"  {operacion:17s} mediana {fila['mediana_ms']:10.3f} ms   p95 {fila['p95_ms']:10.3f} ms",
+                  file=sys.stderr)
+        cerrar_todas()
+
+    salida = json.dumps(informe, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(salida)
+    else:
+        print(salida)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regresiones = comparar(informe, json.load(f))
+        for escala, operacion, antes, ahora in regresiones:
+            print(f"REGRESIÓN {operacion} @ {escala}: {antes:.3f} ms -> {ahora:.3f} ms", file=sys.stderr)
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
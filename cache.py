@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Caché en proceso con desalojo LRU
+- Tamaño acotado: al llenarse se desaloja la entrada usada hace más tiempo
+- Invalidación explícita por clave o por condición (la hacen las funciones que escriben)
+- Contadores de aciertos/fallos para comprobar que la caché vale la pena
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    def __init__(self, maximo=256):
+        self.maximo = maximo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self._generacion = 0  # cambia en cada invalidación
+
+    def obtener(self, clave, calcular):
+        """Devuelve el valor de `clave`; si no está, lo calcula con calcular() y lo guarda."""
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+            generacion = self._generacion
+        valor = calcular()
+        with self._lock:
+            if generacion != self._generacion:
+                # hubo una escritura mientras se calculaba: el valor puede estar viejo, no se guarda
+                return valor
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+        return valor
+
+    def invalidar(self, clave):
+        with self._lock:
+            self._generacion += 1
+            self._datos.pop(clave, None)
+
+    def invalidar_si(self, condicion):
+        """Elimina todas las entradas cuya clave cumpla condicion(clave)."""
+        with self._lock:
+            self._generacion += 1
+            for clave in [c for c in self._datos if condicion(c)]:
+                del self._datos[clave]
+
+    def limpiar(self):
+        with self._lock:
+            self._generacion += 1
+            self._datos.clear()
+
+    def estadisticas(self):
+        total = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._datos),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "tasa_aciertos": self.aciertos / total if total else 0.0,
+        }
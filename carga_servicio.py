@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Generador de carga para servicio.py
+- Abre `concurrencia` conexiones keep-alive y reparte entre ellas `peticiones` consultas
+- Por defecto consulta disponibilidad de fechas al azar; con --reservar mezcla POST /reservaciones
+- Reporta rendimiento (peticiones/s), códigos de respuesta y latencia p50/p95/p99 del lado cliente
+
+Uso:
+    python servicio.py --puerto 8080 &
+    python carga_servicio.py --url http://127.0.0.1:8080 --peticiones 5000 --concurrencia 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from servicio import percentil
+
+
+async def _peticion(reader, writer, host, metodo, ruta, cuerpo=None):
+    datos = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else b""
+    writer.write(
+        f"{metodo} {ruta} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(datos)}\r\n\r\n".encode("latin-1") + datos
+    )
+    await writer.drain()
+    linea = await reader.readline()
+    estado = int(linea.split()[1])
+    longitud = 0
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        nombre, _, valor = h.decode("latin-1").partition(":")
+        if nombre.strip().lower() == "content-length":
+            longitud = int(valor.strip())
+    await reader.readexactly(longitud)
+    return estado
+
+
+async def _cliente(host, puerto, cola, latencias, codigos, fechas, porcentaje_reservas):
+    reader, writer = await asyncio.open_connection(host, puerto)
+    try:
+        while True:
+            try:
+                cola.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            fecha = random.choice(fechas)
+            inicio = time.perf_counter()
+            if random.random() * 100 < porcentaje_reservas:
+                cuerpo = {"cliente_clave": 1, "sala_clave": random.randint(1, 5), "nombre": "Carga",
+                          "horario": random.choice("MVN"), "fecha": fecha}
+                estado = await _peticion(reader, writer, host, "POST", "/reservaciones", cuerpo)
+            else:
+                estado = await _peticion(reader, writer, host, "GET", f"/disponibilidad?fecha={fecha}")
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            codigos[estado] += 1
+    finally:
+        writer.close()
+
+
+async def generar_carga(url, peticiones=2000, concurrencia=100, dias=30, porcentaje_reservas=0):
+    partes = urlsplit(url)
+    host, puerto = partes.hostname, partes.port or 80
+    hoy = datetime.now().date()
+    fechas = [(hoy + timedelta(days=3 + d)).strftime("%d/%m/%Y") for d in range(dias)]
+    cola = asyncio.Queue()
+    for i in range(peticiones):
+        cola.put_nowait(i)
+    latencias, codigos = [], Counter()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _cliente(host, puerto, cola, latencias, codigos, fechas, porcentaje_reservas)
+        for _ in range(concurrencia)
+    ))
+    segundos = time.perf_counter() - inicio
+    ordenadas = sorted(latencias)
+    return {
+        "peticiones": len(latencias),
+        "segundos": round(segundos, 3),
+        "peticiones_por_segundo": round(len(latencias) / segundos, 1) if segundos else 0.0,
+        "codigos": dict(codigos),
+        "p50_ms": round(percentil(ordenadas, 50), 3),
+        "p95_ms": round(percentil(ordenadas, 95), 3),
+        "p99_ms": round(percentil(ordenadas, 99), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de carga para el servicio de reservaciones.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--peticiones", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, default=100)
+    parser.add_argument("--dias", type=int, default=30, help="fechas distintas a consultar")
+    parser.add_argument("--reservar", type=float, default=0, help="porcentaje de peticiones que reservan")
+    args = parser.parse_args(argv)
+    resultado = asyncio.run(generar_carga(args.url, args.peticiones, args.concurrencia,
+                                          args.dias, args.reservar))
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Catálogo de precios compacto (el dict `productos` de Evidencia_Uno para millones de SKUs)
+- Misma semántica que el dict: catalogo["leche"], catalogo["huevo"] = 20, in, len, get, y se recorre
+  en orden de alta con keys/values/items
+- Los precios viven en una columna NumPy (float64 por omisión) y cada nombre se guarda una sola vez,
+  en UTF-8, dentro de un bloque de bytes con su columna de inicios: la posición es el ID del producto
+- Índice por huella de 64 bits ordenada (búsqueda binaria vectorizada); los nombres recién dados de
+  alta esperan en un dict pequeño hasta que se reordena el índice
+- actualizar(nombres, precios) fija los precios de un lote completo de una vez y da de alta los nuevos
+- guardar() escribe un archivo binario; abrir() lo mapea en memoria (arranque casi instantáneo) y con
+  modo "r+" los cambios de precio se escriben directo en el archivo
+- Con una columna entera (--dtype int64, p. ej. centavos) un precio con decimales es un error, no se trunca
+
+No se borran productos (como en Evidencia_Uno, sólo se agregan y se cambian precios).
+
+Uso:
+    python catalogo.py importar precios.csv catalogo.cat
+    python catalogo.py precio catalogo.cat leche pan
+    python catalogo.py actualizar catalogo.cat cambios.csv
+    python catalogo.py ejemplos
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+import struct
+import sys
+from itertools import chain, islice
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIA = b"CATPRE01"
+ENCABEZADO = struct.Struct("<8s8sqq")  # magia, dtype de precios, productos, bytes de nombres
+CAPACIDAD_INICIAL = 1024
+MINIMO_PENDIENTES = 4096  # nombres fuera del índice ordenado antes de reindexar (o n/8 si es mayor)
+TAMANO_BLOQUE = 1 << 20  # filas por bloque al importar CSV y al recorrer el catálogo
+DTYPE_PRECIO = "float64"
+
+
+def _requiere_numpy():
+    if np is None:
+        raise ImportError("El catálogo compacto requiere NumPy (pip install numpy).")
+
+
+def _huella(codificado):
+    return int.from_bytes(hashlib.blake2b(codificado, digest_size=8).digest(), "little")
+
+
+def _alinear(posicion):
+    return (posicion + 7) // 8 * 8
+
+
+class CatalogoPrecios:
+    """
+    Diccionario nombre → precio respaldado por columnas NumPy.
+    productos: dict o iterable de pares (nombre, precio) para la carga inicial.
+    """
+
+    def __init__(self, productos=(), dtype=DTYPE_PRECIO):
+        _requiere_numpy()
+        self.dtype = np.dtype(dtype)
+        self._n = 0
+        self._precios = np.zeros(CAPACIDAD_INICIAL, dtype=self.dtype)
+        self._inicios = np.zeros(CAPACIDAD_INICIAL + 1, dtype=np.int64)  # nombre i = _nombres[inicios[i]:inicios[i+1]]
+        self._nombres = bytearray()
+        self._huellas = np.empty(0, dtype=np.uint64)  # ordenadas
+        self._orden = np.empty(0, dtype=np.int64)  # posición del producto de cada huella
+        self._pendientes = {}  # nombre -> posición, todavía fuera del índice ordenado
+        self.update(productos)
+
+    # ------------------------------------------------------------------
+    # Índice de nombres
+    # ------------------------------------------------------------------
+
+    def _nombre_bytes(self, posicion):
+        return bytes(self._nombres[self._inicios[posicion]:self._inicios[posicion + 1]])
+
+    def _posicion(self, nombre):
+        """Posición del producto o -1."""
+        posicion = self._pendientes.get(nombre)
+        if posicion is not None:
+            return posicion
+        codificado = nombre.encode("utf-8")
+        h = np.uint64(_huella(codificado))
+        i = int(np.searchsorted(self._huellas, h))
+        while i < len(self._huellas) and self._huellas[i] == h:
+            if self._nombre_bytes(self._orden[i]) == codificado:
+                return int(self._orden[i])
+            i += 1
+        return -1
+
+    def posiciones(self, nombres):
+        """Arreglo con la posición de cada nombre (-1 si no existe), con una sola búsqueda binaria vectorizada."""
+        codificados = [nombre.encode("utf-8") for nombre in nombres]
+        resultado = np.full(len(codificados), -1, dtype=np.int64)
+        if len(self._huellas) and codificados:
+            huellas = np.fromiter(map(_huella, codificados), dtype=np.uint64, count=len(codificados))
+            indices = np.minimum(np.searchsorted(self._huellas, huellas), len(self._huellas) - 1)
+            candidatos = self._orden[indices]
+            for k in np.flatnonzero(self._huellas[indices] == huellas).tolist():
+                if self._nombre_bytes(candidatos[k]) == codificados[k]:
+                    resultado[k] = candidatos[k]
+                else:  # dos nombres con la misma huella: se revisan todos los empates
+                    resultado[k] = self._posicion(nombres[k])
+        if self._pendientes:
+            for k in np.flatnonzero(resultado < 0).tolist():
+                resultado[k] = self._pendientes.get(nombres[k], -1)
+        return resultado
+
+    def _reindexar(self):
+        if not self._pendientes:
+            return
+        nuevas = np.fromiter((_huella(nombre.encode("utf-8")) for nombre in self._pendientes),
+                             dtype=np.uint64, count=len(self._pendientes))
+        huellas = np.concatenate((self._huellas, nuevas))
+        orden = np.concatenate((self._orden, np.fromiter(self._pendientes.values(), dtype=np.int64)))
+        acomodo = np.argsort(huellas, kind="stable")
+        self._huellas = huellas[acomodo]
+        self._orden = orden[acomodo]
+        self._pendientes = {}
+
+    def _asegurar_capacidad(self, extra):
+        necesaria = self._n + extra
+        if necesaria > len(self._precios):
+            capacidad = max(necesaria, 2 * len(self._precios), CAPACIDAD_INICIAL)
+            precios = np.zeros(capacidad, dtype=self.dtype)
+            precios[:self._n] = self._precios[:self._n]
+            inicios = np.zeros(capacidad + 1, dtype=np.int64)
+            inicios[:self._n + 1] = self._inicios[:self._n + 1]
+            self._precios, self._inicios = precios, inicios
+        if not isinstance(self._nombres, bytearray):  # venía mapeado de un archivo
+            self._nombres = bytearray(self._nombres[:self._inicios[self._n]].tobytes())
+
+    def _agregar(self, nombres):
+        """Da de alta nombres nuevos y distintos; devuelve sus posiciones."""
+        codificados = [nombre.encode("utf-8") for nombre in nombres]
+        self._asegurar_capacidad(len(codificados))
+        primera = self._n
+        longitudes = np.fromiter(map(len, codificados), dtype=np.int64, count=len(codificados))
+        self._inicios[primera + 1:primera + 1 + len(codificados)] = self._inicios[primera] + np.cumsum(longitudes)
+        self._nombres += b"".join(codificados)
+        self._n += len(codificados)
+        self._pendientes.update(zip(nombres, range(primera, self._n)))
+        if len(self._pendientes) > max(MINIMO_PENDIENTES, self._n // 8):
+            self._reindexar()
+        return np.arange(primera, self._n, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Semántica de dict
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, nombre):
+        posicion = self._posicion(nombre)
+        if posicion < 0:
+            raise KeyError(nombre)
+        return self._precios[posicion].item()
+
+    def __setitem__(self, nombre, precio):
+        precio = self._a_precios(precio)
+        posicion = self._posicion(nombre)
+        if posicion < 0:
+            posicion = self._agregar([nombre])[0]
+        self._precios[posicion] = precio
+
+    def __contains__(self, nombre):
+        return self._posicion(nombre) >= 0
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        return self.keys()
+
+    def get(self, nombre, predeterminado=None):
+        posicion = self._posicion(nombre)
+        return predeterminado if posicion < 0 else self._precios[posicion].item()
+
+    def keys(self):
+        for inicio in range(0, self._n, TAMANO_BLOQUE):
+            fin = min(inicio + TAMANO_BLOQUE, self._n)
+            inicios = self._inicios[inicio:fin + 1]
+            texto = bytes(self._nombres[inicios[0]:inicios[-1]])
+            cortes = (inicios - inicios[0]).tolist()
+            for a, b in zip(cortes, cortes[1:]):
+                yield texto[a:b].decode("utf-8")
+
+    def values(self):
+        for inicio in range(0, self._n, TAMANO_BLOQUE):
+            yield from self._precios[inicio:inicio + TAMANO_BLOQUE].tolist()
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def update(self, otro):
+        """Como dict.update: acepta un dict o cualquier iterable de pares (también vacío), por bloques."""
+        pares = iter(otro.items() if hasattr(otro, "items") else otro)
+        while True:
+            bloque = list(islice(pares, TAMANO_BLOQUE))
+            if not bloque:
+                return
+            nombres, precios = zip(*bloque)
+            self.actualizar(nombres, precios)
+
+    # ------------------------------------------------------------------
+    # Operaciones por lote
+    # ------------------------------------------------------------------
+
+    def _a_precios(self, precios):
+        """Convierte al dtype de la columna; con dtype entero rechaza decimales en lugar de truncarlos."""
+        valores = np.asarray(precios)
+        if self.dtype.kind in "iu" and valores.dtype.kind in "fc":
+            if not np.all(np.isfinite(valores) & (valores == np.trunc(valores))):
+                raise ValueError(f"Precio con decimales en un catálogo {self.dtype}: usa float64 o centavos.")
+        return valores.astype(self.dtype)
+
+    @property
+    def precios(self):
+        """
+        Vista de la columna de precios en orden de alta: con el dtype por omisión (float64)
+        catalogo.precios[:] *= 1.1 cambia todos a la vez.
+        """
+        return self._precios[:self._n]
+
+    def consultar(self, nombres):
+        """Precios de un lote de nombres como arreglo; KeyError con el primero que no exista."""
+        nombres = list(nombres)
+        posiciones = self.posiciones(nombres)
+        faltantes = np.flatnonzero(posiciones < 0)
+        if len(faltantes):
+            raise KeyError(nombres[faltantes[0]])
+        return self._precios[posiciones]
+
+    def actualizar(self, nombres, precios):
+        """
+        Fija el precio de cada nombre del lote (un precio por nombre o uno solo para todos).
+        Los nombres que no existen se dan de alta; si uno se repite gana el último, como en dict.update.
+        """
+        nombres = list(nombres)
+        if not nombres:
+            return
+        precios = np.broadcast_to(self._a_precios(precios), (len(nombres),))
+        posiciones = self.posiciones(nombres)
+        faltantes = np.flatnonzero(posiciones < 0)
+        if len(faltantes):
+            nuevos = list(dict.fromkeys(nombres[k] for k in faltantes.tolist()))
+            asignadas = dict(zip(nuevos, self._agregar(nuevos).tolist()))
+            posiciones[faltantes] = [asignadas[nombres[k]] for k in faltantes.tolist()]
+        acomodo = np.argsort(posiciones, kind="stable")
+        posiciones = posiciones[acomodo]
+        ultimos = np.append(posiciones[1:] != posiciones[:-1], True)  # la última aparición de cada posición
+        self._precios[posiciones[ultimos]] = precios[acomodo][ultimos]
+
+    # ------------------------------------------------------------------
+    # Archivo binario
+    # ------------------------------------------------------------------
+
+    def guardar(self, ruta):
+        """
+        Escribe el catálogo como: encabezado | precios | inicios | huellas | orden | nombres UTF-8,
+        cada sección alineada a 8 bytes. Se escribe a un temporal y se reemplaza al final.
+        """
+        self._reindexar()
+        secciones = (self._precios[:self._n], self._inicios[:self._n + 1], self._huellas, self._orden)
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(ENCABEZADO.pack(MAGIA, self.dtype.str.encode(), self._n, int(self._inicios[self._n])))
+            for seccion in secciones:
+                np.ascontiguousarray(seccion).tofile(archivo)
+                archivo.write(b"\0" * (_alinear(archivo.tell()) - archivo.tell()))
+            archivo.write(memoryview(self._nombres)[:int(self._inicios[self._n])])
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def abrir(cls, ruta, modo="r"):
+        """
+        Mapea en memoria un archivo de guardar(). modo "r": sólo lectura; "r+": los cambios de precio se
+        escriben en el archivo (ver sincronizar); "c": copia al escribir. Dar de alta productos nuevos
+        pasa las columnas a memoria y hay que guardar() de nuevo.
+        """
+        _requiere_numpy()
+        with open(ruta, "rb") as archivo:
+            magia, dtype, n, bytes_nombres = ENCABEZADO.unpack(archivo.read(ENCABEZADO.size))
+        if magia != MAGIA:
+            raise ValueError(f"'{ruta}' no es un catálogo de precios.")
+        catalogo = cls.__new__(cls)
+        catalogo.dtype = np.dtype(dtype.rstrip(b"\0").decode())
+        catalogo._n = n
+        catalogo._pendientes = {}
+        posicion = ENCABEZADO.size
+
+        def mapear(tipo, cantidad):
+            nonlocal posicion
+            if not cantidad:
+                return np.zeros(0, dtype=tipo)
+            arreglo = np.memmap(ruta, dtype=tipo, mode=modo, offset=posicion, shape=(cantidad,))
+            posicion = _alinear(posicion + arreglo.nbytes)
+            return arreglo
+
+        catalogo._precios = mapear(catalogo.dtype, n)
+        catalogo._inicios = mapear(np.int64, n + 1)
+        catalogo._huellas = mapear(np.uint64, n)
+        catalogo._orden = mapear(np.int64, n)
+        catalogo._nombres = mapear(np.uint8, bytes_nombres)
+        return catalogo
+
+    def sincronizar(self, ruta):
+        """Persiste los cambios: si las columnas siguen mapeadas (modo "r+") basta con flush; si no, guardar()."""
+        if isinstance(self._precios, np.memmap) and self._precios.mode == "r+" and not self._pendientes:
+            self._precios.flush()
+        else:
+            self.guardar(ruta)
+
+    def __repr__(self):
+        muestra = ", ".join(f"{nombre!r}: {precio}" for nombre, precio in islice(self.items(), 5))
+        return f"CatalogoPrecios({{{muestra}{', ...' if self._n > 5 else ''}}}, productos={self._n})"
+
+
+def _es_numero(texto):
+    try:
+        float(texto)
+    except ValueError:
+        return False
+    return True
+
+
+def leer_csv(ruta, delimitador=",", tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera bloques (nombres, precios_texto) de un CSV nombre,precio.
+    Si el precio de la primera fila no es un número se toma como encabezado (clave,precio) y se omite.
+    """
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        filas = (fila for fila in csv.reader(archivo, delimiter=delimitador) if len(fila) >= 2)
+        primera = next(filas, None)
+        if primera is not None and _es_numero(primera[1]):
+            filas = chain((primera,), filas)
+        while True:
+            bloque = list(islice(filas, tamano_bloque))
+            if not bloque:
+                return
+            yield [fila[0].strip() for fila in bloque], [fila[1].strip() for fila in bloque]
+
+
+def cargar_csv(catalogo, ruta, delimitador=","):
+    """Aplica un CSV nombre,precio al catálogo por lotes; devuelve las filas leídas."""
+    total = 0
+    for nombres, precios in leer_csv(ruta, delimitador):
+        catalogo.actualizar(nombres, np.asarray(precios).astype(catalogo.dtype))  # "19.99" en int64 es ValueError
+        total += len(nombres)
+    return total
+
+
+def ejemplos():
+    """Los ejercicios del dict de Evidencia_Uno sobre el catálogo."""
+    productos = CatalogoPrecios({"manzana": 10, "pan": 15, "leche": 25})
+    print("Precio de la leche:", productos["leche"])
+    productos["huevo"] = 20
+    productos["pan"] = 18
+    print("Lista de productos y precios:")
+    for producto, precio in productos.items():
+        print(f"- {producto}: {precio}")
+    productos.actualizar(["manzana", "leche"], [12, 27])
+    print("Después de actualizar el lote (manzana, leche):", dict(productos.items()))
+    productos.precios[:] *= 1.1
+    print("Con 10% de aumento:", {producto: round(precio, 2) for producto, precio in productos.items()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Catálogo de precios compacto en archivo binario mapeado.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("importar", help="crear un catálogo desde un CSV nombre,precio")
+    p.add_argument("csv")
+    p.add_argument("catalogo")
+    p.add_argument("--dtype", default=DTYPE_PRECIO, help="tipo de la columna de precios (float64, int64 en centavos...)")
+    p.add_argument("--delimitador", default=",")
+    p = sub.add_parser("actualizar", help="aplicar un CSV nombre,precio a un catálogo existente")
+    p.add_argument("catalogo")
+    p.add_argument("csv")
+    p.add_argument("--delimitador", default=",")
+    p = sub.add_parser("precio", help="consultar precios")
+    p.add_argument("catalogo")
+    p.add_argument("nombres", nargs="+")
+    p = sub.add_parser("listar", help="mostrar productos y precios en orden de alta")
+    p.add_argument("catalogo")
+    p.add_argument("--limite", type=int, default=20)
+    sub.add_parser("ejemplos", help="ejercicios del dict de Evidencia_Uno")
+    args = parser.parse_args(argv)
+
+    if args.comando == "ejemplos":
+        ejemplos()
+        return 0
+    if args.comando == "importar":
+        catalogo = CatalogoPrecios(dtype=args.dtype)
+        try:
+            filas = cargar_csv(catalogo, args.csv, args.delimitador)
+        except ValueError as e:
+            print(f"Precio inválido en '{args.csv}': {e}")
+            return 1
+        catalogo.guardar(args.catalogo)
+        print(f"{filas} filas importadas: {len(catalogo)} productos guardados en '{args.catalogo}'")
+        return 0
+    if args.comando == "actualizar":
+        catalogo = CatalogoPrecios.abrir(args.catalogo, "r+")
+        antes = len(catalogo)
+        try:
+            filas = cargar_csv(catalogo, args.csv, args.delimitador)
+        except ValueError as e:
+            print(f"Precio inválido en '{args.csv}': {e}")
+            return 1
+        catalogo.sincronizar(args.catalogo)
+        print(f"{filas} precios aplicados; {len(catalogo) - antes} productos nuevos")
+        return 0
+
+    catalogo = CatalogoPrecios.abrir(args.catalogo)
+    if args.comando == "precio":
+        for nombre in args.nombres:
+            precio = catalogo.get(nombre)
+            print(f"{nombre}: {precio}" if precio is not None else f"{nombre}: no existe en el catálogo")
+    else:
+        print(f"Lista de productos y precios ({len(catalogo)} en total):")
+        for producto, precio in islice(catalogo.items(), args.limite):
+            print(f"- {producto}: {precio}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Interfaz de línea de comandos (no interactiva) del Sistema de Reservaciones
+- Subcomandos: reservar, disponibilidad, recomendar, reporte, reportes, exportar, eliminar, sala, cliente,
+  historial, buscar, ocupacion, reconstruir-ocupacion, archivar y mantenimiento
+- `lote ARCHIVO` ejecuta un comando por línea en un solo proceso y sobre la misma conexión
+- El DDL se omite si el esquema ya está en la versión actual
+- --tiempos muestra el tiempo de arranque y la latencia de cada operación
+- --perfil [--traza archivo.json] activa la instrumentación de SQL y operaciones
+
+Ejemplos:
+    python cli.py disponibilidad 15/11/2030
+    python cli.py reservar 2 1 "Clase de dibujo" M 15/11/2030
+    python cli.py --tiempos lote comandos.txt
+"""
+
+import time
+
+_INICIO = time.perf_counter()
+
+import argparse
+import itertools
+import os
+import shlex
+import sqlite3
+import sys
+
+import Evidencia_Tres as reservas
+import instrumentacion
+
+
+OPCIONES_GLOBALES = ("db", "tiempos", "perfil", "traza")  # valen para todo el lote; en una línea se ignorarían
+
+
+def _fecha_iso(texto):
+    fecha_dt = reservas.es_fecha_valida_str(texto)
+    if not fecha_dt:
+        raise argparse.ArgumentTypeError("Formato de fecha no válido. Usa dd/mm/aaaa.")
+    return fecha_dt.date().isoformat()
+
+
+def cmd_reservar(args):
+    estado, detalle = reservas.registrar_reservaciones_lote(
+        [(args.cliente, args.sala, args.nombre, args.turno, args.fecha)]
+    )[0]
+    if estado == reservas.ACEPTADA:
+        print(f"Folio asignado: {detalle}")
+        return 0
+    print(f"{estado}: {detalle}")
+    return 1
+
+
+def cmd_disponibilidad(args):
+    if args.hasta:
+        matriz = reservas.disponibilidad_rango(args.fecha, args.hasta, args.capacidad)
+        print("Clave\tSala\tFecha\tTurno")
+        for c, n, f, t in matriz.libres():
+            print(f"{c}\t{n}\t{f}\t{t}")
+        return 0
+    print("Clave\tSala\tTurno")
+    for c, n, t in reservas.disponibilidad_por_fecha(args.fecha):
+        print(f"{c}\t{n}\t{t}")
+    return 0
+
+
+def cmd_recomendar(args):
+    salas = reservas.recomendar_salas(args.asistentes, args.fecha, args.turno, args.cantidad)
+    if not salas:
+        print(f"No hay salas libres para {args.asistentes} personas en esa fecha y turno.")
+        return 1
+    print("Clave\tSala\tCapacidad")
+    for c, n, cap in salas:
+        print(f"{c}\t{n}\t{cap}")
+    return 0
+
+
+def cmd_reporte(args):
+    total = 0
+    for pagina in reservas.paginas_reservaciones(args.fecha, args.hasta or args.fecha, args.pagina):
+        if not total:
+            print("\t".join(reservas.ENCABEZADOS))
+        for r in pagina:
+            print("\t".join(str(v) for v in r))
+        total += len(pagina)
+    if not total:
+        print("No hay reservaciones para esa fecha.")
+    return 0
+
+
+def cmd_exportar(args):
+    registros = reservas.iterar_reservaciones(args.fecha)
+    etiqueta = args.fecha or "todas"
+    if args.formato == "csv":
+        total = reservas.exportar_registros_a_csv(registros, etiqueta)
+    elif args.formato == "tsv":
+        total = reservas.exportar_registros_a_csv(registros, etiqueta, delimitador="\t")
+    else:
+        total = reservas.exportar_registros_a_excel(registros, etiqueta)
+    return 0 if total is not None else 1
+
+
+def cmd_reportes(args):
+    import reportes_rango  # el pool de procesos sólo se carga para este comando
+    if args.fecha > args.hasta:
+        print("La fecha inicial debe ser anterior o igual a la final.")
+        return 1
+    if args.un_libro:
+        resumen = reportes_rango.generar_libro_unico(args.fecha, args.hasta, args.directorio)
+    else:
+        resumen = reportes_rango.generar_reportes(args.fecha, args.hasta, args.procesos, args.directorio, args.formato)
+    reportes_rango.imprimir_resumen(resumen)
+    return 1 if resumen["errores"] else 0
+
+
+def cmd_eliminar(args):
+    estado, mensaje = reservas.cancelar_reservacion(args.folio)
+    print(mensaje)
+    return 0 if estado == reservas.ELIMINADA else 1
+
+
+def cmd_sala(args):
+    clave = reservas.agregar_sala(args.nombre, args.capacidad)
+    print(f"Tu clave de la sala es: {clave}")
+    return 0
+
+
+def cmd_cliente(args):
+    clave = reservas.agregar_cliente(args.nombre)
+    print(f"Tu clave de usuario es: {clave}")
+    return 0
+
+
+def cmd_historial(args):
+    if not reservas.existe_cliente(args.cliente):
+        print(f"No existe el cliente {args.cliente}.")
+        return 1
+    if args.exportar:
+        registros = itertools.chain(reservas.iterar_reservaciones_cliente(args.cliente, True),
+                                    reservas.iterar_reservaciones_cliente(args.cliente, False))
+        total = reservas.exportar_registros_a_excel(registros, f"cliente_{args.cliente}")
+        return 0 if total is not None else 1
+    for titulo, proximas in (("Próximas", True), ("Pasadas", False)):
+        print(f"# {titulo}")
+        print("\t".join(reservas.ENCABEZADOS))
+        for r in reservas.iterar_reservaciones_cliente(args.cliente, proximas):
+            print("\t".join(str(v) for v in r))
+    return 0
+
+
+def cmd_buscar(args):
+    registros = reservas.buscar_reservaciones(args.texto, args.limite)
+    if not registros:
+        print("No se encontraron reservaciones.")
+        return 0
+    print("\t".join(reservas.ENCABEZADOS))
+    for r in registros:
+        print("\t".join(str(v) for v in r))
+    return 0
+
+
+def cmd_ocupacion(args):
+    if args.mes:
+        print("Clave\tSala\tTurno\tReservadas\tDías\tTasa")
+        for c, n, t, r, d, tasa in reservas.ocupacion_mensual(args.mes):
+            print(f"{c}\t{n}\t{t}\t{r}\t{d}\t{tasa:.1%}")
+    else:
+        print("Turno\tReservadas\tSalas\tTasa")
+        for t, r, total, tasa in reservas.ocupacion_diaria(args.fecha, args.sala):
+            print(f"{t}\t{r}\t{total}\t{tasa:.1%}")
+    return 0
+
+
+def cmd_reconstruir_ocupacion(args):
+    reservas.reconstruir_ocupacion()
+    print("Estadísticas de ocupación reconstruidas.")
+    return 0
+
+
+def _mantenimiento():
+    duplicados = reservas.mantenimiento_base()
+    print("ANALYZE y VACUUM completados.")
+    if duplicados:
+        print("La restricción única sigue pendiente; espacios con más de una reservación:")
+        for fecha, sala_clave, horario, n in duplicados:
+            print(f"- Sala {sala_clave}, fecha {fecha}, turno {horario}: {n} reservaciones")
+
+
+def cmd_archivar(args):
+    movidas = reservas.archivar_reservaciones(args.corte, args.lote)
+    print(f"Reservaciones archivadas: {movidas}")
+    if args.mantenimiento:
+        _mantenimiento()
+    return 0
+
+
+def cmd_mantenimiento(args):
+    _mantenimiento()
+    return 0
+
+
+def construir_parser():
+    parser = argparse.ArgumentParser(description="Sistema de Reservaciones de Salas (modo no interactivo).")
+    parser.add_argument("--db", help=f"archivo de base de datos (por defecto {reservas.DB_FILE})")
+    parser.add_argument("--tiempos", action="store_true", help="mostrar arranque y latencia por operación")
+    parser.add_argument("--perfil", action="store_true",
+                        help="instrumentar SQL y operaciones; resumen al salir (igual que RESERVAS_PERFIL=1)")
+    parser.add_argument("--traza", help="con --perfil, guardar la traza JSON en este archivo")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("reservar", help="registrar una reservación")
+    p.add_argument("cliente", type=int)
+    p.add_argument("sala", type=int)
+    p.add_argument("nombre")
+    p.add_argument("turno", type=str.upper, choices=reservas.TURNOS)
+    p.add_argument("fecha", help="dd/mm/aaaa")
+    p.set_defaults(funcion=cmd_reservar)
+
+    p = sub.add_parser("disponibilidad", help="espacios libres de una fecha o de un rango")
+    p.add_argument("fecha", type=_fecha_iso, help="dd/mm/aaaa")
+    p.add_argument("--hasta", type=_fecha_iso, help="fecha final del rango (dd/mm/aaaa)")
+    p.add_argument("--capacidad", type=int, default=1, help="capacidad mínima (sólo con --hasta)")
+    p.set_defaults(funcion=cmd_disponibilidad)
+
+    p = sub.add_parser("recomendar", help="salas libres que mejor se ajustan a un número de personas")
+    p.add_argument("asistentes", type=int)
+    p.add_argument("fecha", type=_fecha_iso, help="dd/mm/aaaa")
+    p.add_argument("turno", type=str.upper, choices=reservas.TURNOS)
+    p.add_argument("--cantidad", type=int, default=5, help="número de salas a sugerir")
+    p.set_defaults(funcion=cmd_recomendar)
+
+    p = sub.add_parser("reporte", help="reservaciones de una fecha o de un rango")
+    p.add_argument("fecha", type=_fecha_iso, help="dd/mm/aaaa")
+    p.add_argument("--hasta", type=_fecha_iso, help="fecha final del rango (dd/mm/aaaa)")
+    p.add_argument("--pagina", type=int, default=reservas.TAMANO_BLOQUE, help="filas por página leída")
+    p.set_defaults(funcion=cmd_reporte)
+
+    p = sub.add_parser("exportar", help="exportar reservaciones")
+    p.add_argument("--fecha", type=_fecha_iso, help="sólo esta fecha (dd/mm/aaaa)")
+    p.add_argument("--formato", choices=("xlsx", "csv", "tsv"), default="xlsx")
+    p.set_defaults(funcion=cmd_exportar)
+
+    p = sub.add_parser("reportes", help="un reporte por día para un rango de fechas, en paralelo")
+    p.add_argument("fecha", type=_fecha_iso, help="primera fecha (dd/mm/aaaa)")
+    p.add_argument("hasta", type=_fecha_iso, help="última fecha, inclusive (dd/mm/aaaa)")
+    p.add_argument("--procesos", type=int, help="procesos que escriben archivos (por defecto uno por CPU)")
+    p.add_argument("--directorio", default="", help="carpeta de salida")
+    grupo = p.add_mutually_exclusive_group()
+    grupo.add_argument("--formato", choices=("xlsx", "csv", "tsv"), default="xlsx")
+    grupo.add_argument("--un-libro", action="store_true", help="un solo libro de Excel con una hoja por día")
+    p.set_defaults(funcion=cmd_reportes)
+
+    p = sub.add_parser("eliminar", help="eliminar una reservación (regla de 3 días, sin confirmación)")
+    p.add_argument("folio", type=int)
+    p.set_defaults(funcion=cmd_eliminar)
+
+    p = sub.add_parser("sala", help="registrar una sala")
+    p.add_argument("nombre")
+    p.add_argument("capacidad", type=int)
+    p.set_defaults(funcion=cmd_sala)
+
+    p = sub.add_parser("cliente", help="registrar un cliente")
+    p.add_argument("nombre")
+    p.set_defaults(funcion=cmd_cliente)
+
+    p = sub.add_parser("historial", help="próximas y pasadas reservaciones de un cliente")
+    p.add_argument("cliente", type=int, help="clave del cliente")
+    p.add_argument("--exportar", action="store_true", help="exportar el historial a Excel")
+    p.set_defaults(funcion=cmd_historial)
+
+    p = sub.add_parser("buscar", help="buscar reservaciones por evento, cliente o sala (texto completo)")
+    p.add_argument("texto")
+    p.add_argument("--limite", type=int, default=reservas.TAMANO_BUSQUEDA)
+    p.set_defaults(funcion=cmd_buscar)
+
+    p = sub.add_parser("ocupacion", help="tasa de ocupación de una fecha (por turno) o de un mes (por sala y turno)")
+    grupo = p.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--fecha", type=_fecha_iso, help="dd/mm/aaaa")
+    grupo.add_argument("--mes", help="YYYY-MM")
+    p.add_argument("--sala", type=int, help="clave de la sala (sólo con --fecha)")
+    p.set_defaults(funcion=cmd_ocupacion)
+
+    p = sub.add_parser("reconstruir-ocupacion", help="recalcular las estadísticas de ocupación")
+    p.set_defaults(funcion=cmd_reconstruir_ocupacion)
+
+    p = sub.add_parser("archivar", help="mover reservaciones pasadas a ReservacionesArchivo")
+    p.add_argument("--corte", type=_fecha_iso,
+                   help=f"archivar antes de esta fecha (dd/mm/aaaa); por defecto hoy - {reservas.DIAS_RETENCION} días")
+    p.add_argument("--lote", type=int, default=reservas.TAMANO_BLOQUE, help="filas por transacción")
+    p.add_argument("--mantenimiento", action="store_true", help="ejecutar ANALYZE y VACUUM al terminar")
+    p.set_defaults(funcion=cmd_archivar)
+
+    p = sub.add_parser("mantenimiento", help="ANALYZE y VACUUM (y la restricción única pendiente)")
+    p.set_defaults(funcion=cmd_mantenimiento)
+
+    p = sub.add_parser("lote", help="ejecutar un comando por línea desde un archivo ('-' para stdin)")
+    p.add_argument("archivo")
+    p.set_defaults(funcion=None)
+    return parser
+
+
+def ejecutar(args, tiempos=False):
+    """Ejecuta un comando ya parseado; devuelve su código de salida."""
+    inicio = time.perf_counter()
+    try:
+        codigo = args.funcion(args)
+    except ValueError as e:
+        print(e)
+        codigo = 1
+    except sqlite3.Error as e:
+        print("Error de base de datos:", e)
+        codigo = 1
+    if tiempos:
+        print(f"[{args.comando}] {(time.perf_counter() - inicio) * 1000:.2f} ms", file=sys.stderr)
+    return codigo
+
+
+def ejecutar_lote(parser, ruta, tiempos=False):
+    """Ejecuta cada línea del archivo como un comando; ignora líneas vacías y comentarios (#)."""
+    archivo = sys.stdin if ruta == "-" else open(ruta, encoding="utf-8")
+    errores = 0
+    total = 0
+    inicio = time.perf_counter()
+    try:
+        for num_linea, linea in enumerate(archivo, start=1):
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            try:
+                args = parser.parse_args(shlex.split(linea))
+            except SystemExit:
+                print(f"Línea {num_linea}: comando inválido: {linea}")
+                errores += 1
+                continue
+            if args.funcion is None:
+                print(f"Línea {num_linea}: no se permite 'lote' dentro de un lote.")
+                errores += 1
+                continue
+            globales = [f"--{opcion}" for opcion in OPCIONES_GLOBALES if getattr(args, opcion)]
+            if globales:
+                print(f"Línea {num_linea}: no se permiten opciones globales dentro de un lote: {', '.join(globales)}.")
+                errores += 1
+                continue
+            total += 1
+            if ejecutar(args, tiempos) != 0:
+                errores += 1
+    finally:
+        if archivo is not sys.stdin:
+            archivo.close()
+    if tiempos:
+        segundos = time.perf_counter() - inicio
+        promedio = segundos / total * 1000 if total else 0.0
+        print(f"[lote] {total} operaciones en {segundos:.3f} s ({promedio:.2f} ms/op)", file=sys.stderr)
+    return 1 if errores else 0
+
+
+def main(argv=None):
+    parser = construir_parser()
+    args = parser.parse_args(argv)
+    if args.db:
+        reservas.DB_FILE = args.db
+    if args.perfil:
+        instrumentacion.activar(reservas, traza=args.traza)
+    reservas.preparar_base()
+    if args.tiempos:
+        print(f"[arranque] {(time.perf_counter() - _INICIO) * 1000:.2f} ms", file=sys.stderr)
+    try:
+        if args.funcion is None:
+            return ejecutar_lote(parser, args.archivo, args.tiempos)
+        return ejecutar(args, args.tiempos)
+    except BrokenPipeError:
+        # quien leía la salida (p. ej. `| head`) ya terminó; stdout va a devnull para que el cierre no falle
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Capa de conexiones SQLite compartidas
+- Reutiliza conexiones en lugar de abrir una nueva por cada función
+- Un pool por archivo de base de datos, seguro para varios hilos
+- Modo WAL y pragmas ajustados (synchronous, cache_size, mmap_size)
+- Activa foreign_keys, que el esquema declara pero SQLite no aplica por defecto
+- Transacciones BEGIN IMMEDIATE con reintentos acotados cuando la base está ocupada
+- version_datos(): PRAGMA data_version para saber si otra conexión o proceso escribió
+"""
+
+import atexit
+import itertools
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+TAMANO_POOL = 4
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),     # seguro con WAL, evita un fsync por commit
+    ("cache_size", -20000),        # ~20 MB de caché de páginas
+    ("mmap_size", 268435456),      # 256 MB mapeados en memoria
+    ("foreign_keys", "ON"),
+    ("busy_timeout", 5000),        # ms a esperar si otro proceso tiene el candado
+)
+FABRICA_CONEXION = sqlite3.Connection  # instrumentacion.activar() la reemplaza
+REINTENTOS = 8
+ESPERA_BASE = 0.01  # segundos; se duplica en cada reintento
+ESPERA_POOL = 30  # segundos a esperar una conexión libre antes de fallar
+
+
+def configurar_conexion(conn):
+    """Aplica los PRAGMAS a una conexión recién abierta."""
+    for nombre, valor in PRAGMAS:
+        conn.execute(f"PRAGMA {nombre} = {valor}")
+    return conn
+
+
+class PoolAgotado(sqlite3.OperationalError):
+    """No se liberó ninguna conexión del pool a tiempo (p. ej. un hilo que pide una segunda sin soltar la primera)."""
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones a un mismo archivo.
+    Las conexiones se crean bajo demanda hasta `tamano`; si todas están en uso se espera a que se libere una
+    hasta `espera` segundos y luego se lanza PoolAgotado.
+    """
+
+    def __init__(self, db_file, tamano=TAMANO_POOL, espera=ESPERA_POOL):
+        self.db_file = db_file
+        self.tamano = tamano
+        self.espera = espera
+        self._libres = queue.LifoQueue()
+        self._abiertas = set()  # libres y en uso; tras un fork el hijo las conserva sin cerrarlas
+        self._creadas = 0
+        self._lock = threading.Lock()
+
+    def _abrir(self):
+        conn = sqlite3.connect(self.db_file, check_same_thread=False, factory=FABRICA_CONEXION)
+        configurar_conexion(conn)
+        with self._lock:
+            self._abiertas.add(conn)
+        return conn
+
+    def tomar(self):
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._creadas < self.tamano:
+                self._creadas += 1
+                crear = True
+            else:
+                crear = False
+        if crear:
+            try:
+                return self._abrir()
+            except Exception:
+                with self._lock:
+                    self._creadas -= 1
+                raise
+        try:
+            return self._libres.get(timeout=self.espera)
+        except queue.Empty:
+            raise PoolAgotado(f"Ninguna de las {self.tamano} conexiones a {self.db_file} se liberó "
+                              f"en {self.espera} s.") from None
+
+    def devolver(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._libres.put(conn)
+
+    @contextmanager
+    def conexion(self):
+        """
+        Igual que `with sqlite3.connect(...) as conn`: commit al salir sin error, rollback si hay excepción.
+        Al terminar, la conexión vuelve al pool en lugar de cerrarse.
+        """
+        conn = self.tomar()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.devolver(conn)
+
+    def cerrar(self):
+        while True:
+            try:
+                conn = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._abiertas.discard(conn)
+                self._creadas -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_heredados = []  # pools y vigías del proceso padre, referenciados en el hijo para que nunca se finalicen
+_vigias = {}  # db_file -> (conexión dedicada, candado, número de vigía)
+_numeros_vigia = itertools.count(1)
+
+
+def obtener_pool(db_file, tamano=TAMANO_POOL):
+    with _pools_lock:
+        pool = _pools.get(db_file)
+        if pool is None:
+            pool = PoolConexiones(db_file, tamano)
+            _pools[db_file] = pool
+        return pool
+
+
+def conexion(db_file):
+    """Context manager con una conexión del pool compartido para db_file."""
+    return obtener_pool(db_file).conexion()
+
+
+def version_datos(db_file):
+    """
+    (número de vigía, PRAGMA data_version) de una conexión dedicada a db_file que nunca escribe.
+    data_version cambia cada vez que otra conexión confirma una escritura, sea del pool de este
+    proceso, de la CLI, del servicio o de otra terminal; el número distingue una vigía reabierta
+    (p. ej. tras cerrar_todas), cuya cuenta vuelve a empezar.
+    """
+    with _pools_lock:
+        vigia = _vigias.get(db_file)
+        if vigia is None:
+            vigia = (sqlite3.connect(db_file, check_same_thread=False), threading.Lock(), next(_numeros_vigia))
+            _vigias[db_file] = vigia
+    conn, candado, numero = vigia
+    with candado:
+        return numero, conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def es_bloqueo(error):
+    """True si el error es 'database is locked' / 'busy', es decir, vale la pena reintentar."""
+    mensaje = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in mensaje or "busy" in mensaje)
+
+
+def en_transaccion(db_file, operacion, intentos=REINTENTOS, espera=ESPERA_BASE):
+    """
+    Ejecuta operacion(conn) dentro de BEGIN IMMEDIATE y hace commit al terminar.
+    BEGIN IMMEDIATE toma el candado de escritura antes de leer, así que una verificación
+    seguida de un INSERT dentro de operacion es atómica frente a otros procesos e hilos.
+    Si la base está ocupada se reintenta hasta `intentos` veces con espera exponencial y jitter.
+    """
+    for intento in range(intentos):
+        try:
+            with conexion(db_file) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                return operacion(conn)
+        except sqlite3.OperationalError as e:
+            if not es_bloqueo(e) or intento == intentos - 1:
+                raise
+            time.sleep(espera * (2 ** intento) * random.uniform(0.5, 1.5))
+
+
+def cerrar_todas():
+    """Cierra las conexiones libres de todos los pools (al cerrar se hace checkpoint del WAL)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        vigias = list(_vigias.values())
+        _pools.clear()
+        _vigias.clear()
+    for pool in pools:
+        pool.cerrar()
+    for conn, candado, _ in vigias:
+        with candado:
+            conn.close()
+
+
+def _descartar_tras_fork():
+    """
+    En un proceso hijo no se usan ni se cierran las conexiones del padre: cerrarlas (también si las
+    finaliza el recolector) libera candados y el WAL que el padre sigue usando. Sus pools quedan
+    referenciados en _heredados y el hijo abre los suyos desde cero.
+    """
+    global _pools_lock
+    _heredados.extend(_pools.values())
+    _heredados.extend(_vigias.values())
+    _pools.clear()
+    _vigias.clear()
+    _pools_lock = threading.Lock()
+
+
+atexit.register(cerrar_todas)
+os.register_at_fork(after_in_child=_descartar_tras_fork)
@@ -0,0 +1,673 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Conjuntos de enteros a gran escala (a partir de los ejercicios de Evidencia_Dos)
+- Misma API que set: union, intersection, difference, symmetric_difference, intersection_update,
+  difference_update, update, add, remove, discard, pop, in, len, |, &, -, ^ ...
+- ConjuntoOrdenado: arreglo NumPy int64 ordenado y sin duplicados (8 bytes por elemento contra
+  ~60-100 de un set de str); las operaciones son mezclas vectorizadas por bloques
+- ConjuntoBitmap: un bit por valor del rango [minimo, maximo]; para rangos densos de IDs
+- crear(valores, "auto") elige el respaldo según la densidad; "set" devuelve un set normal
+- operar_archivos() combina archivos de IDs (uno por línea) más grandes que la memoria:
+  ordenamiento externo por corridas y mezcla en streaming sobre archivos binarios mapeados
+
+Los IDs deben ser enteros; para IDs de texto (p. ej. matrículas "A01234567") se pasa `convertir`.
+Los conjuntos guardan sólo el entero convertido: el texto original no se recupera después, a menos
+que `convertir` sea reversible (p. ej. quitar un prefijo fijo "A" que luego se vuelve a poner).
+
+Uso:
+    python conjuntos.py interseccion estudiantes_python.txt estudiantes_java.txt --salida ambos.txt
+    python conjuntos.py ejemplos
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+try:
+    import numpy as np
+except ImportError:  # sólo el respaldo "set" funciona sin NumPy
+    np = None
+
+TAMANO_BLOQUE = 1 << 22  # enteros por bloque al leer, ordenar o mezclar (32 MB en int64)
+DENSIDAD_BITMAP = 1 / 64  # desde esta fracción del rango ocupada el bitmap pesa menos que el arreglo
+OPERACIONES = ("union", "interseccion", "diferencia", "diferencia_simetrica")
+
+
+def _requiere_numpy():
+    if np is None:
+        raise ImportError("Los conjuntos compactos requieren NumPy (pip install numpy).")
+
+
+# ---------------------------------------------------------------------------
+# Primitivas sobre arreglos int64 ordenados y sin duplicados
+# (np.unique/np.union1d usan hash en NumPy 2.x y son varias veces más lentos que ordenar)
+# ---------------------------------------------------------------------------
+
+def _unicos_ordenados(arreglo, kind=None):
+    """kind se pasa a np.sort: el quicksort por omisión es el más rápido con datos en desorden."""
+    arreglo = np.sort(np.asarray(arreglo, dtype=np.int64), kind=kind)
+    if len(arreglo) < 2:
+        return arreglo
+    mascara = np.empty(len(arreglo), dtype=bool)
+    mascara[0] = True
+    np.not_equal(arreglo[1:], arreglo[:-1], out=mascara[1:])
+    return arreglo[mascara]
+
+
+def _pertenecen(valores, ordenado):
+    """Máscara: qué elementos de `valores` están en el arreglo `ordenado` (búsqueda binaria vectorizada)."""
+    if not len(ordenado):
+        return np.zeros(len(valores), dtype=bool)
+    posiciones = np.searchsorted(ordenado, valores)
+    posiciones[posiciones == len(ordenado)] = 0
+    return ordenado[posiciones] == valores
+
+
+def _mezclar(a, b):
+    # kind="stable" usa timsort para int64, que detecta las dos corridas ya ordenadas: la mezcla es lineal
+    # (el quicksort por omisión no aprovecha el orden previo)
+    return _unicos_ordenados(np.concatenate((a, b)), kind="stable")
+
+
+def _interseccion(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return a[_pertenecen(a, b)]
+
+
+def _diferencia(a, b):
+    return a[~_pertenecen(a, b)]
+
+
+def _diferencia_simetrica(a, b):
+    return np.sort(np.concatenate((_diferencia(a, b), _diferencia(b, a))), kind="stable")
+
+
+_PRIMITIVAS = {
+    "union": _mezclar,
+    "interseccion": _interseccion,
+    "diferencia": _diferencia,
+    "diferencia_simetrica": _diferencia_simetrica,
+}
+
+
+def combinar_por_bloques(a, b, operacion, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Genera, en orden, los bloques del resultado de `operacion` entre dos arreglos ordenados sin
+    duplicados (pueden ser np.memmap). En cada paso toma un bloque de cada lado, opera sólo hasta
+    el menor de sus dos últimos valores y avanza: la memoria depende de tamano_bloque, no del tamaño
+    de las entradas.
+    """
+    primitiva = _PRIMITIVAS[operacion]
+    i = j = 0
+    while i < len(a) and j < len(b):
+        bloque_a = np.asarray(a[i:i + tamano_bloque])
+        bloque_b = np.asarray(b[j:j + tamano_bloque])
+        corte = min(bloque_a[-1], bloque_b[-1])
+        hasta_a = int(np.searchsorted(bloque_a, corte, side="right"))
+        hasta_b = int(np.searchsorted(bloque_b, corte, side="right"))
+        resultado = primitiva(bloque_a[:hasta_a], bloque_b[:hasta_b])
+        if len(resultado):
+            yield resultado
+        i += hasta_a
+        j += hasta_b
+    restos = []
+    if operacion in ("union", "diferencia", "diferencia_simetrica"):
+        restos.append((a, i))
+    if operacion in ("union", "diferencia_simetrica"):
+        restos.append((b, j))
+    for arreglo, desde in restos:
+        for inicio in range(desde, len(arreglo), tamano_bloque):
+            yield np.asarray(arreglo[inicio:inicio + tamano_bloque])
+
+
+def _concatenar(bloques):
+    bloques = list(bloques)
+    return np.concatenate(bloques) if bloques else np.empty(0, dtype=np.int64)
+
+
+def _como_arreglo(valores):
+    """Cualquier iterable de enteros (o un conjunto compacto) -> arreglo int64 ordenado sin duplicados."""
+    if isinstance(valores, ConjuntoOrdenado):
+        return valores.valores
+    if isinstance(valores, ConjuntoBitmap):
+        return valores.a_arreglo()
+    if isinstance(valores, np.ndarray):
+        return _unicos_ordenados(valores)
+    if isinstance(valores, (set, frozenset, list, tuple)):
+        return _unicos_ordenados(np.fromiter(valores, dtype=np.int64, count=len(valores)))
+    return _unicos_ordenados(np.fromiter(valores, dtype=np.int64))
+
+
+# ---------------------------------------------------------------------------
+# Respaldo 1: arreglo ordenado
+# ---------------------------------------------------------------------------
+
+class ConjuntoOrdenado:
+    """
+    Conjunto de enteros como arreglo NumPy int64 ordenado y sin duplicados.
+    Pertenencia por búsqueda binaria; unión/intersección/diferencia por mezcla vectorizada.
+    add/remove individuales cuestan O(n): para cargas masivas conviene update() con muchos valores.
+    """
+
+    def __init__(self, valores=()):
+        _requiere_numpy()
+        self.valores = _como_arreglo(valores)
+
+    @classmethod
+    def _envolver(cls, arreglo):
+        """Crea el conjunto a partir de un arreglo que ya está ordenado y sin duplicados."""
+        conjunto = cls.__new__(cls)
+        conjunto.valores = arreglo
+        return conjunto
+
+    @classmethod
+    def desde_archivo(cls, ruta):
+        """Abre (mapeado en memoria, sin leerlo) un archivo binario int64 ordenado, p. ej. de ordenar_archivo."""
+        _requiere_numpy()
+        if not os.path.getsize(ruta):
+            return cls._envolver(np.empty(0, dtype=np.int64))
+        return cls._envolver(np.memmap(ruta, dtype=np.int64, mode="r"))
+
+    def guardar(self, ruta):
+        """Guarda los valores como int64 binario (se reabre con desde_archivo)."""
+        with open(ruta, "wb") as archivo:
+            for inicio in range(0, len(self.valores), TAMANO_BLOQUE):
+                archivo.write(np.ascontiguousarray(self.valores[inicio:inicio + TAMANO_BLOQUE]).tobytes())
+
+    def _operar(self, operacion, otros):
+        resultado = self.valores
+        for otro in otros:
+            resultado = _concatenar(combinar_por_bloques(resultado, _como_arreglo(otro), operacion))
+        return resultado
+
+    # --- operaciones que devuelven un conjunto nuevo ---
+    def union(self, *otros):
+        return ConjuntoOrdenado._envolver(self._operar("union", otros))
+
+    def intersection(self, *otros):
+        return ConjuntoOrdenado._envolver(self._operar("interseccion", otros))
+
+    def difference(self, *otros):
+        return ConjuntoOrdenado._envolver(self._operar("diferencia", otros))
+
+    def symmetric_difference(self, otro):
+        return ConjuntoOrdenado._envolver(self._operar("diferencia_simetrica", [otro]))
+
+    # --- operaciones en sitio ---
+    def update(self, *otros):
+        self.valores = self._operar("union", otros)
+
+    def intersection_update(self, *otros):
+        self.valores = self._operar("interseccion", otros)
+
+    def difference_update(self, *otros):
+        self.valores = self._operar("diferencia", otros)
+
+    def symmetric_difference_update(self, otro):
+        self.valores = self._operar("diferencia_simetrica", [otro])
+
+    def add(self, valor):
+        posicion = int(np.searchsorted(self.valores, valor))
+        if posicion == len(self.valores) or self.valores[posicion] != valor:
+            self.valores = np.insert(self.valores, posicion, valor)
+
+    def discard(self, valor):
+        posicion = int(np.searchsorted(self.valores, valor))
+        if posicion < len(self.valores) and self.valores[posicion] == valor:
+            self.valores = np.delete(self.valores, posicion)
+            return True
+        return False
+
+    def remove(self, valor):
+        if not self.discard(valor):
+            raise KeyError(valor)
+
+    def pop(self):
+        """Quita y devuelve el mayor elemento (set.pop quita uno arbitrario)."""
+        if not len(self.valores):
+            raise KeyError("pop from an empty set")
+        valor = int(self.valores[-1])
+        self.valores = self.valores[:-1]
+        return valor
+
+    def clear(self):
+        self.valores = np.empty(0, dtype=np.int64)
+
+    def copy(self):
+        return ConjuntoOrdenado._envolver(np.array(self.valores))
+
+    # --- comparaciones ---
+    def isdisjoint(self, otro):
+        return not len(self.intersection(otro))
+
+    def issubset(self, otro):
+        return bool(_pertenecen(self.valores, _como_arreglo(otro)).all())
+
+    def issuperset(self, otro):
+        return ConjuntoOrdenado._envolver(_como_arreglo(otro)).issubset(self)
+
+    def __contains__(self, valor):
+        posicion = int(np.searchsorted(self.valores, valor))
+        return posicion < len(self.valores) and self.valores[posicion] == valor
+
+    def __len__(self):
+        return len(self.valores)
+
+    def __iter__(self):
+        for inicio in range(0, len(self.valores), TAMANO_BLOQUE):
+            yield from self.valores[inicio:inicio + TAMANO_BLOQUE].tolist()
+
+    def __eq__(self, otro):
+        if isinstance(otro, (ConjuntoOrdenado, ConjuntoBitmap, set, frozenset)):
+            otro = _como_arreglo(otro)
+            return len(otro) == len(self.valores) and bool(np.array_equal(otro, self.valores))
+        return NotImplemented
+
+    def __repr__(self):
+        muestra = ", ".join(str(v) for v in self.valores[:10].tolist())
+        return f"ConjuntoOrdenado({{{muestra}{', ...' if len(self) > 10 else ''}}}, {len(self)} elementos)"
+
+    __or__, __and__, __sub__, __xor__ = union, intersection, difference, symmetric_difference
+    __le__, __ge__ = issubset, issuperset
+
+    def __ior__(self, otro):
+        self.update(otro)
+        return self
+
+    def __iand__(self, otro):
+        self.intersection_update(otro)
+        return self
+
+    def __isub__(self, otro):
+        self.difference_update(otro)
+        return self
+
+    def __ixor__(self, otro):
+        self.symmetric_difference_update(otro)
+        return self
+
+
+# ---------------------------------------------------------------------------
+# Respaldo 2: bitmap para rangos densos
+# ---------------------------------------------------------------------------
+
+class ConjuntoBitmap:
+    """
+    Conjunto de enteros como mapa de bits sobre [base, base + 8 * len(bits)).
+    Un bit por valor posible: conviene cuando los IDs ocupan buena parte de su rango
+    (p. ej. matrículas consecutivas). Las operaciones son AND/OR/AND NOT byte a byte.
+    """
+
+    def __init__(self, valores=(), minimo=None, maximo=None):
+        _requiere_numpy()
+        if isinstance(valores, ConjuntoBitmap):
+            self.base, self.bits = valores.base, valores.bits.copy()
+            return
+        arreglo = valores if isinstance(valores, np.ndarray) else _como_arreglo(valores)
+        arreglo = np.asarray(arreglo, dtype=np.int64)
+        if minimo is None:
+            minimo = int(arreglo.min()) if len(arreglo) else 0
+        if maximo is None:
+            maximo = int(arreglo.max()) if len(arreglo) else minimo
+        self.base = minimo - minimo % 8  # alineado a byte para operar sin desplazar bits
+        self.bits = np.zeros((maximo - self.base) // 8 + 1, dtype=np.uint8)
+        self._marcar(arreglo)
+
+    @classmethod
+    def _envolver(cls, base, bits):
+        conjunto = cls.__new__(cls)
+        conjunto.base, conjunto.bits = base, bits
+        return conjunto
+
+    @property
+    def fin(self):
+        return self.base + 8 * len(self.bits)
+
+    def _ampliar(self, minimo, maximo):
+        """Extiende el rango para cubrir [minimo, maximo]."""
+        base = min(self.base, minimo - minimo % 8)
+        fin = max(self.fin, maximo + 1)
+        if base == self.base and fin == self.fin:
+            return
+        bits = np.zeros((fin - base + 7) // 8, dtype=np.uint8)
+        desde = (self.base - base) // 8
+        bits[desde:desde + len(self.bits)] = self.bits
+        self.base, self.bits = base, bits
+
+    def _marcar(self, arreglo):
+        for inicio in range(0, len(arreglo), TAMANO_BLOQUE):
+            posiciones = arreglo[inicio:inicio + TAMANO_BLOQUE] - self.base
+            np.bitwise_or.at(self.bits, posiciones >> 3, np.left_shift(1, posiciones & 7).astype(np.uint8))
+
+    def a_arreglo(self):
+        """Los valores como arreglo int64 ordenado."""
+        return np.flatnonzero(np.unpackbits(self.bits, bitorder="little")).astype(np.int64) + self.base
+
+    def _recortar(self, otro):
+        """
+        Los bytes de `otro` sólo dentro de [base, fin) de este conjunto. Basta para intersección y
+        diferencia, que nunca conservan valores de fuera: un valor aislado muy lejano en `otro` no
+        obliga a reservar un bitmap sobre todo su rango.
+        """
+        if isinstance(otro, ConjuntoBitmap):
+            bits = np.zeros_like(self.bits)
+            desde, hasta = max(self.base, otro.base), min(self.fin, otro.fin)
+            if desde < hasta:
+                bits[(desde - self.base) // 8:(hasta - self.base) // 8] = \
+                    otro.bits[(desde - otro.base) // 8:(hasta - otro.base) // 8]
+            return bits
+        arreglo = _como_arreglo(otro)
+        arreglo = arreglo[np.searchsorted(arreglo, self.base):np.searchsorted(arreglo, self.fin)]
+        return ConjuntoBitmap(arreglo, self.base, self.fin - 1).bits
+
+    def _alinear(self, otro):
+        """Los bytes de ambos conjuntos sobre un mismo rango: (base, bits_propios, bits_del_otro)."""
+        if not isinstance(otro, ConjuntoBitmap):
+            arreglo = _como_arreglo(otro)
+            if not len(arreglo):
+                return self.base, self.bits, np.zeros_like(self.bits)
+            otro = ConjuntoBitmap(arreglo)
+        base = min(self.base, otro.base)
+        fin = max(self.fin, otro.fin)
+        resultado = []
+        for conjunto in (self, otro):
+            if conjunto.base == base and conjunto.fin == fin:
+                resultado.append(conjunto.bits)
+            else:
+                bits = np.zeros((fin - base) // 8, dtype=np.uint8)
+                desde = (conjunto.base - base) // 8
+                bits[desde:desde + len(conjunto.bits)] = conjunto.bits
+                resultado.append(bits)
+        return base, resultado[0], resultado[1]
+
+    def _operar(self, operacion, otros):
+        base, bits = self.base, self.bits
+        for otro in otros:
+            actual = ConjuntoBitmap._envolver(base, bits)
+            if operacion in ("interseccion", "diferencia"):
+                propios, ajenos = bits, actual._recortar(otro)
+            else:
+                base, propios, ajenos = actual._alinear(otro)
+            if operacion == "union":
+                bits = propios | ajenos
+            elif operacion == "interseccion":
+                bits = propios & ajenos
+            elif operacion == "diferencia":
+                bits = propios & ~ajenos
+            else:
+                bits = propios ^ ajenos
+        return base, bits
+
+    def union(self, *otros):
+        return ConjuntoBitmap._envolver(*self._operar("union", otros))
+
+    def intersection(self, *otros):
+        return ConjuntoBitmap._envolver(*self._operar("interseccion", otros))
+
+    def difference(self, *otros):
+        return ConjuntoBitmap._envolver(*self._operar("diferencia", otros))
+
+    def symmetric_difference(self, otro):
+        return ConjuntoBitmap._envolver(*self._operar("diferencia_simetrica", [otro]))
+
+    def update(self, *otros):
+        self.base, self.bits = self._operar("union", otros)
+
+    def intersection_update(self, *otros):
+        self.base, self.bits = self._operar("interseccion", otros)
+
+    def difference_update(self, *otros):
+        self.base, self.bits = self._operar("diferencia", otros)
+
+    def symmetric_difference_update(self, otro):
+        self.base, self.bits = self._operar("diferencia_simetrica", [otro])
+
+    def add(self, valor):
+        self._ampliar(valor, valor)
+        posicion = valor - self.base
+        self.bits[posicion >> 3] |= 1 << (posicion & 7)
+
+    def discard(self, valor):
+        if valor not in self:
+            return False
+        posicion = valor - self.base
+        self.bits[posicion >> 3] &= ~(1 << (posicion & 7)) & 0xFF
+        return True
+
+    def remove(self, valor):
+        if not self.discard(valor):
+            raise KeyError(valor)
+
+    def pop(self):
+        """Quita y devuelve el mayor elemento."""
+        ocupados = np.flatnonzero(self.bits)
+        if not len(ocupados):
+            raise KeyError("pop from an empty set")
+        indice = int(ocupados[-1])
+        valor = self.base + 8 * indice + int(self.bits[indice]).bit_length() - 1
+        self.discard(valor)
+        return valor
+
+    def clear(self):
+        self.bits[:] = 0
+
+    def copy(self):
+        return ConjuntoBitmap._envolver(self.base, self.bits.copy())
+
+    def isdisjoint(self, otro):
+        return not len(self.intersection(otro))
+
+    def issubset(self, otro):
+        return not len(self.difference(otro))
+
+    def issuperset(self, otro):
+        arreglo = _como_arreglo(otro)
+        if not len(arreglo):
+            return True
+        if arreglo[0] < self.base or arreglo[-1] >= self.fin:
+            return False
+        posiciones = arreglo - self.base
+        return bool(((self.bits[posiciones >> 3] >> (posiciones & 7)) & 1).all())
+
+    def __contains__(self, valor):
+        posicion = valor - self.base
+        if posicion < 0 or valor >= self.fin:
+            return False
+        return bool((self.bits[posicion >> 3] >> (posicion & 7)) & 1)
+
+    def __len__(self):
+        if hasattr(np, "bitwise_count"):
+            return int(np.bitwise_count(self.bits).sum(dtype=np.int64))
+        return int(np.unpackbits(self.bits).sum(dtype=np.int64))
+
+    def __iter__(self):
+        return iter(self.a_arreglo().tolist())
+
+    def __eq__(self, otro):
+        if isinstance(otro, (ConjuntoOrdenado, ConjuntoBitmap, set, frozenset)):
+            return ConjuntoOrdenado._envolver(self.a_arreglo()) == otro
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ConjuntoBitmap([{self.base}, {self.fin}), {len(self)} elementos, {self.bits.nbytes} bytes)"
+
+    __or__, __and__, __sub__, __xor__ = union, intersection, difference, symmetric_difference
+    __le__, __ge__ = issubset, issuperset
+
+    def __ior__(self, otro):
+        self.update(otro)
+        return self
+
+    def __iand__(self, otro):
+        self.intersection_update(otro)
+        return self
+
+    def __isub__(self, otro):
+        self.difference_update(otro)
+        return self
+
+    def __ixor__(self, otro):
+        self.symmetric_difference_update(otro)
+        return self
+
+
+def crear(valores=(), respaldo="auto"):
+    """
+    Crea un conjunto con la API de set.
+    respaldo: "set" (set de Python), "ordenado" (ConjuntoOrdenado), "bitmap" (ConjuntoBitmap) o
+    "auto": bitmap si los valores ocupan al menos DENSIDAD_BITMAP de su rango, si no arreglo ordenado.
+    """
+    if respaldo == "set":
+        return set(valores)
+    if respaldo == "ordenado":
+        return ConjuntoOrdenado(valores)
+    if respaldo == "bitmap":
+        return ConjuntoBitmap(valores)
+    if respaldo != "auto":
+        raise ValueError(f"Respaldo desconocido: {respaldo}")
+    arreglo = _como_arreglo(valores)
+    if len(arreglo) and len(arreglo) >= (int(arreglo[-1]) - int(arreglo[0]) + 1) * DENSIDAD_BITMAP:
+        return ConjuntoBitmap(arreglo)
+    return ConjuntoOrdenado._envolver(arreglo)
+
+
+# ---------------------------------------------------------------------------
+# Archivos más grandes que la memoria
+# ---------------------------------------------------------------------------
+
+def leer_ids(ruta, tamano_bloque=TAMANO_BLOQUE, convertir=None):
+    """
+    Genera bloques int64 de un archivo de texto con un ID por línea (las líneas vacías se ignoran).
+    convertir: función str -> int para IDs que no son números (por defecto int). El resultado sólo
+    tiene los enteros: para volver a escribir IDs de texto, convertir debe poder invertirse.
+    """
+    _requiere_numpy()
+    with open(ruta, encoding="utf-8") as archivo:
+        while True:
+            lineas = archivo.readlines(tamano_bloque * 8)  # ~tamano_bloque líneas de IDs cortos
+            if not lineas:
+                break
+            ids = "".join(lineas).split()
+            yield np.fromiter(map(convertir or int, ids), dtype=np.int64, count=len(ids))
+
+
+def _escribir_bloques(bloques, ruta):
+    total = 0
+    with open(ruta, "wb") as archivo:
+        for bloque in bloques:
+            archivo.write(np.ascontiguousarray(bloque, dtype=np.int64).tobytes())
+            total += len(bloque)
+    return total
+
+
+def _abrir(ruta):
+    return ConjuntoOrdenado.desde_archivo(ruta).valores
+
+
+def ordenar_archivo(ruta, destino, tamano_bloque=TAMANO_BLOQUE, convertir=None, directorio_temporal=None):
+    """
+    Ordenamiento externo: lee el archivo de IDs en bloques, ordena y deduplica cada bloque en una corrida
+    binaria y mezcla las corridas de dos en dos (en streaming) hasta dejar una sola en `destino`.
+    Devuelve el número de IDs distintos.
+    """
+    temporal = tempfile.mkdtemp(prefix="conjuntos_", dir=directorio_temporal)
+    try:
+        corridas = []
+        for numero, bloque in enumerate(leer_ids(ruta, tamano_bloque, convertir)):
+            corrida = os.path.join(temporal, f"corrida_{numero}.bin")
+            _escribir_bloques([_unicos_ordenados(bloque)], corrida)
+            corridas.append(corrida)
+        if not corridas:
+            return _escribir_bloques([], destino)
+        pasada = 0
+        while len(corridas) > 1:
+            siguientes = []
+            for k in range(0, len(corridas) - 1, 2):
+                mezcla = os.path.join(temporal, f"mezcla_{pasada}_{k}.bin")
+                _escribir_bloques(combinar_por_bloques(_abrir(corridas[k]), _abrir(corridas[k + 1]),
+                                                       "union", tamano_bloque), mezcla)
+                os.remove(corridas[k])
+                os.remove(corridas[k + 1])
+                siguientes.append(mezcla)
+            if len(corridas) % 2:
+                siguientes.append(corridas[-1])
+            corridas = siguientes
+            pasada += 1
+        shutil.move(corridas[0], destino)
+        return os.path.getsize(destino) // 8
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+def operar_archivos(ruta_a, ruta_b, operacion, salida, tamano_bloque=TAMANO_BLOQUE, convertir=None,
+                    directorio_temporal=None):
+    """
+    Aplica `operacion` (ver OPERACIONES) a dos archivos de IDs de cualquier tamaño y escribe el resultado
+    en `salida`, un ID por línea y en orden. La memoria usada depende de tamano_bloque.
+    Devuelve el número de IDs del resultado.
+    """
+    if operacion not in OPERACIONES:
+        raise ValueError(f"Operación desconocida: {operacion}")
+    temporal = tempfile.mkdtemp(prefix="conjuntos_", dir=directorio_temporal)
+    try:
+        ordenados = []
+        for nombre, ruta in (("a", ruta_a), ("b", ruta_b)):
+            destino = os.path.join(temporal, f"{nombre}.bin")
+            ordenar_archivo(ruta, destino, tamano_bloque, convertir, temporal)
+            ordenados.append(_abrir(destino))
+        total = 0
+        with open(salida, "w", encoding="utf-8") as archivo:
+            for bloque in combinar_por_bloques(ordenados[0], ordenados[1], operacion, tamano_bloque):
+                archivo.write("\n".join(map(str, bloque.tolist())) + "\n")
+                total += len(bloque)
+        del ordenados  # cerrar los mapas antes de borrar los archivos
+        return total
+    finally:
+        shutil.rmtree(temporal, ignore_errors=True)
+
+
+def ejemplos(respaldo):
+    """Los ejercicios numéricos de Evidencia_Dos (4, 6 y 8) con el respaldo indicado."""
+    A, B = crear({1, 2, 3, 4, 5}, respaldo), crear({4, 5, 6, 7}, respaldo)
+    print("Ejercicio 4 (A - B):", sorted(A.difference(B)))
+    print("Ejercicio 4 (B - A):", sorted(B.difference(A)))
+    A, B = crear({1, 2, 3, 4, 5}, respaldo), crear({3, 4, 5, 6}, respaldo)
+    A.intersection_update(B)
+    print("Ejercicio 6 (A después de intersection_update):", sorted(A))
+    A, B = crear({1, 2, 3, 4, 5, 6}, respaldo), crear({4, 5, 6, 7, 8, 9}, respaldo)
+    print("Ejercicio 8 (unión):", sorted(A.union(B)))
+    print("Ejercicio 8 (intersección):", sorted(A.intersection(B)))
+    print("Ejercicio 8 (A - B):", sorted(A.difference(B)))
+    print("Ejercicio 8 (B - A):", sorted(B.difference(A)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Operaciones de conjuntos sobre archivos de IDs (uno por línea).")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    for operacion in OPERACIONES:
+        p = sub.add_parser(operacion, help=f"{operacion} de dos archivos de IDs")
+        p.add_argument("a")
+        p.add_argument("b")
+        p.add_argument("--salida", required=True, help="archivo de resultado (un ID por línea, ordenado)")
+        p.add_argument("--bloque", type=int, default=TAMANO_BLOQUE, help="IDs por bloque en memoria")
+        p.add_argument("--temporal", help="directorio para las corridas intermedias")
+    p = sub.add_parser("ejemplos", help="ejercicios de Evidencia_Dos con cada respaldo")
+    args = parser.parse_args(argv)
+
+    if args.comando == "ejemplos":
+        for respaldo in ("set", "ordenado", "bitmap"):
+            print(f"--- respaldo: {respaldo}")
+            ejemplos(respaldo)
+        return 0
+    total = operar_archivos(args.a, args.b, args.comando, args.salida, args.bloque,
+                            directorio_temporal=args.temporal)
+    print(f"{args.comando}: {total} IDs escritos en '{args.salida}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Coordenadas GPS a gran escala (la tupla `coordenadas` de Evidencia_Uno para millones de puntos)
+- clasificar() decide hemisferio Norte/Sur y Oriental/Occidental de arreglos completos de latitud y
+  longitud de una vez, con las mismas reglas que Evidencia_Uno (lat > 0 es Norte, lon < 0 es Occidental)
+- clasificar_regiones() asigna cada punto a la primera región (caja lat/lon) que lo contiene
+- Los puntos se guardan en archivos binarios float64 (lat, lon) por punto que se abren mapeados en
+  memoria; contar_hemisferios() los recorre por bloques sin cargarlos completos
+- IndiceCuadricula: cuadrícula lat/lon ordenada por celda para consultas de caja (una rebanada contigua
+  por fila de la cuadrícula) y de punto más cercano (distancia haversine, exacta también cerca de los
+  polos y del antimeridiano)
+
+Uso:
+    python coordenadas.py importar puntos.csv puntos.bin
+    python coordenadas.py hemisferios puntos.bin
+    python coordenadas.py caja puntos.bin 14.5 -118.5 32.7 -86.7
+    python coordenadas.py cercano puntos.bin 19.4326 -99.1332
+"""
+
+import argparse
+import math
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RADIO_TIERRA_KM = 6371.0088
+TAMANO_BLOQUE = 1 << 22  # puntos por bloque al recorrer un archivo
+PUNTOS_POR_CELDA = 16  # densidad objetivo al elegir el tamaño de celda automáticamente
+CUADRANTES = ("Sur-Oriental", "Sur-Occidental", "Norte-Oriental", "Norte-Occidental")
+
+
+def _requiere_numpy():
+    if np is None:
+        raise ImportError("El módulo de coordenadas requiere NumPy (pip install numpy).")
+
+
+# ---------------------------------------------------------------------------
+# Clasificación
+# ---------------------------------------------------------------------------
+
+def hemisferios_tupla(coordenada):
+    """La versión escalar de Evidencia_Uno, para una sola tupla (lat, lon)."""
+    norte_sur = "Hemisferio Norte" if coordenada[0] > 0 else "Hemisferio Sur"
+    oriente_occidente = "Hemisferio Occidental" if coordenada[1] < 0 else "Hemisferio Oriental"
+    return norte_sur, oriente_occidente
+
+
+def clasificar(latitudes, longitudes):
+    """Código de cuadrante por punto (índice en CUADRANTES): 2 * norte + occidental, como uint8."""
+    codigos = np.greater(latitudes, 0).astype(np.uint8)
+    codigos <<= 1
+    codigos |= np.less(longitudes, 0)
+    return codigos
+
+
+def clasificar_regiones(latitudes, longitudes, regiones):
+    """
+    regiones: lista de (lat_min, lon_min, lat_max, lon_max). Devuelve por punto el índice de la primera
+    región que lo contiene o -1. Si lon_min > lon_max la región cruza el antimeridiano.
+    """
+    resultado = np.full(len(latitudes), -1, dtype=np.int32)
+    for k in range(len(regiones) - 1, -1, -1):  # al revés: la primera región que coincida queda al final
+        resultado[_en_caja(latitudes, longitudes, *regiones[k])] = k
+    return resultado
+
+
+def _en_caja(latitudes, longitudes, lat_min, lon_min, lat_max, lon_max):
+    mascara = (latitudes >= lat_min) & (latitudes <= lat_max)
+    if lon_min <= lon_max:
+        mascara &= (longitudes >= lon_min) & (longitudes <= lon_max)
+    else:
+        mascara &= (longitudes >= lon_min) | (longitudes <= lon_max)
+    return mascara
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distancia de gran círculo en km; acepta escalares o arreglos."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+# ---------------------------------------------------------------------------
+# Archivos binarios de puntos
+# ---------------------------------------------------------------------------
+
+def abrir_puntos(ruta, modo="r"):
+    """Mapea un archivo float64 (lat, lon) como arreglo (n, 2) sin leerlo."""
+    _requiere_numpy()
+    if not os.path.getsize(ruta):
+        return np.empty((0, 2), dtype=np.float64)
+    return np.memmap(ruta, dtype=np.float64, mode=modo).reshape(-1, 2)
+
+
+def guardar_puntos(ruta, latitudes, longitudes):
+    with open(ruta, "wb") as archivo:
+        for inicio in range(0, len(latitudes), TAMANO_BLOQUE):
+            bloque = np.column_stack((latitudes[inicio:inicio + TAMANO_BLOQUE],
+                                      longitudes[inicio:inicio + TAMANO_BLOQUE])).astype(np.float64)
+            bloque.tofile(archivo)
+
+
+def importar_csv(ruta_csv, ruta_binaria, tamano_bloque=TAMANO_BLOQUE):
+    """Convierte un CSV lat,lon (una línea por punto, sin encabezado) al formato binario; devuelve los puntos."""
+    _requiere_numpy()
+    total = 0
+    with open(ruta_csv, encoding="utf-8") as entrada, open(ruta_binaria, "wb") as salida:
+        while True:
+            lineas = entrada.readlines(tamano_bloque * 24)  # ~24 bytes por línea
+            if not lineas:
+                return total
+            valores = np.array("".join(lineas).replace(",", " ").split(), dtype=np.float64)
+            if len(valores) % 2:
+                raise ValueError("El CSV debe tener exactamente dos columnas: latitud,longitud.")
+            valores.tofile(salida)
+            total += len(valores) // 2
+
+
+def contar_hemisferios(puntos, tamano_bloque=TAMANO_BLOQUE):
+    """Cantidad de puntos por cuadrante (dict nombre -> cantidad), recorriendo por bloques."""
+    conteo = np.zeros(len(CUADRANTES), dtype=np.int64)
+    for inicio in range(0, len(puntos), tamano_bloque):
+        bloque = np.asarray(puntos[inicio:inicio + tamano_bloque])
+        conteo += np.bincount(clasificar(bloque[:, 0], bloque[:, 1]), minlength=len(CUADRANTES))
+    return dict(zip(CUADRANTES, conteo.tolist()))
+
+
+# ---------------------------------------------------------------------------
+# Índice espacial
+# ---------------------------------------------------------------------------
+
+class IndiceCuadricula:
+    """
+    Cuadrícula regular de `tamano_celda` grados. Los puntos se copian ordenados por celda
+    (fila * columnas + columna), así que las celdas contiguas de una fila son una sola rebanada.
+    Los resultados son índices de los puntos originales.
+    """
+
+    def __init__(self, latitudes, longitudes, tamano_celda=None):
+        _requiere_numpy()
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        if tamano_celda is None:
+            tamano_celda = self._celda_automatica(latitudes, longitudes)
+        self.tamano_celda = float(tamano_celda)
+        self.filas = math.ceil(180 / self.tamano_celda)
+        self.columnas = math.ceil(360 / self.tamano_celda)
+        celdas = self._celdas(latitudes, longitudes)
+        self.orden = np.argsort(celdas, kind="stable")
+        self.celdas = celdas[self.orden]
+        self.latitudes = latitudes[self.orden]
+        self.longitudes = longitudes[self.orden]
+
+    @staticmethod
+    def _celda_automatica(latitudes, longitudes):
+        if len(latitudes) < 2:
+            return 1.0
+        area = max(np.ptp(latitudes), 1e-6) * max(np.ptp(longitudes), 1e-6)
+        return float(np.clip(math.sqrt(area * PUNTOS_POR_CELDA / len(latitudes)), 1e-3, 10.0))
+
+    def _fila(self, latitudes):
+        return np.clip(((np.asarray(latitudes) + 90) // self.tamano_celda).astype(np.int64), 0, self.filas - 1)
+
+    def _columna(self, longitudes):
+        return np.clip(((np.asarray(longitudes) + 180) // self.tamano_celda).astype(np.int64), 0, self.columnas - 1)
+
+    def _celdas(self, latitudes, longitudes):
+        return self._fila(latitudes) * self.columnas + self._columna(longitudes)
+
+    def __len__(self):
+        return len(self.orden)
+
+    def _rebanadas(self, fila_min, fila_max, columna_min, columna_max):
+        """Posiciones (en el orden interno) de los puntos en el rectángulo de celdas dado."""
+        filas = np.arange(fila_min, fila_max + 1, dtype=np.int64) * self.columnas
+        inicios = np.searchsorted(self.celdas, filas + columna_min, side="left")
+        fines = np.searchsorted(self.celdas, filas + columna_max, side="right")
+        largos = fines - inicios
+        total = int(largos.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+        # concatenación vectorizada de los rangos [inicio, fin) de cada fila
+        desplazamientos = np.repeat(inicios - np.concatenate(([0], np.cumsum(largos)[:-1])), largos)
+        return np.arange(total, dtype=np.int64) + desplazamientos
+
+    def _candidatos_caja(self, lat_min, lon_min, lat_max, lon_max):
+        fila_min, fila_max = int(self._fila(lat_min)), int(self._fila(lat_max))
+        columna_min, columna_max = int(self._columna(lon_min)), int(self._columna(lon_max))
+        if lon_min <= lon_max:
+            return self._rebanadas(fila_min, fila_max, columna_min, columna_max)
+        if columna_min <= columna_max:  # los dos rectángulos se traslapan: basta con filas completas
+            return self._rebanadas(fila_min, fila_max, 0, self.columnas - 1)
+        return np.concatenate((  # cruza el antimeridiano: dos rectángulos
+            self._rebanadas(fila_min, fila_max, columna_min, self.columnas - 1),
+            self._rebanadas(fila_min, fila_max, 0, columna_max)))
+
+    def en_caja(self, lat_min, lon_min, lat_max, lon_max):
+        """Índices de los puntos dentro de la caja (bordes incluidos); lon_min > lon_max cruza el antimeridiano."""
+        if lat_min > lat_max:
+            return np.empty(0, dtype=np.int64)
+        posiciones = self._candidatos_caja(lat_min, lon_min, lat_max, lon_max)
+        dentro = _en_caja(self.latitudes[posiciones], self.longitudes[posiciones], lat_min, lon_min, lat_max, lon_max)
+        return np.sort(self.orden[posiciones[dentro]])
+
+    def mas_cercano(self, latitud, longitud):
+        """
+        (índice, distancia_km) del punto más cercano, o None si el índice está vacío.
+        1) anillos de celdas alrededor del punto hasta encontrar candidatos;
+        2) con esa distancia d, revisa la caja lat/lon que contiene a todo punto a menos de d.
+        """
+        if not len(self.orden):
+            return None
+        fila, columna = int(self._fila(latitud)), int(self._columna(longitud))
+        radio = 0
+        while True:
+            cercanos = self._rebanadas(max(fila - radio, 0), min(fila + radio, self.filas - 1),
+                                       max(columna - radio, 0), min(columna + radio, self.columnas - 1))
+            if len(cercanos):
+                break
+            radio = max(1, radio * 2)
+        mejor = float(haversine_km(latitud, longitud, self.latitudes[cercanos], self.longitudes[cercanos]).min())
+
+        angulo = mejor / RADIO_TIERRA_KM
+        delta_lat = math.degrees(angulo)
+        lat_min, lat_max = latitud - delta_lat, latitud + delta_lat
+        coseno = math.cos(math.radians(latitud))
+        if lat_min <= -90 or lat_max >= 90 or math.sin(angulo) >= coseno:
+            lon_min, lon_max = -180.0, 180.0  # la ventana alcanza un polo: todas las longitudes
+        else:
+            delta_lon = math.degrees(math.asin(math.sin(angulo) / coseno))
+            lon_min = longitud - delta_lon + (360 if longitud - delta_lon < -180 else 0)
+            lon_max = longitud + delta_lon - (360 if longitud + delta_lon > 180 else 0)
+        # los candidatos del anillo se suman para no depender del redondeo en el borde de la ventana
+        posiciones = np.concatenate((cercanos, self._candidatos_caja(max(lat_min, -90.0), lon_min,
+                                                                     min(lat_max, 90.0), lon_max)))
+        distancias = haversine_km(latitud, longitud, self.latitudes[posiciones], self.longitudes[posiciones])
+        k = int(np.argmin(distancias))
+        return int(self.orden[posiciones[k]]), float(distancias[k])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clasificación e índice espacial de coordenadas GPS.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("importar", help="convertir un CSV lat,lon al formato binario")
+    p.add_argument("csv")
+    p.add_argument("binario")
+    p = sub.add_parser("hemisferios", help="contar puntos por hemisferio")
+    p.add_argument("binario")
+    p = sub.add_parser("caja", help="puntos dentro de una caja lat/lon")
+    p.add_argument("binario")
+    for nombre in ("lat_min", "lon_min", "lat_max", "lon_max"):
+        p.add_argument(nombre, type=float)
+    p.add_argument("--limite", type=int, default=20, help="puntos a mostrar")
+    p.add_argument("--celda", type=float, help="tamaño de celda en grados (automático si se omite)")
+    p = sub.add_parser("cercano", help="punto más cercano a una coordenada")
+    p.add_argument("binario")
+    p.add_argument("latitud", type=float)
+    p.add_argument("longitud", type=float)
+    p.add_argument("--celda", type=float, help="tamaño de celda en grados (automático si se omite)")
+    args = parser.parse_args(argv)
+
+    if args.comando == "importar":
+        print(f"{importar_csv(args.csv, args.binario)} puntos guardados en '{args.binario}'")
+        return 0
+    puntos = abrir_puntos(args.binario)
+    if args.comando == "hemisferios":
+        for cuadrante, cantidad in contar_hemisferios(puntos).items():
+            print(f"- {cuadrante}: {cantidad}")
+        return 0
+    indice = IndiceCuadricula(puntos[:, 0], puntos[:, 1], args.celda)
+    if args.comando == "caja":
+        encontrados = indice.en_caja(args.lat_min, args.lon_min, args.lat_max, args.lon_max)
+        print(f"{len(encontrados)} puntos en la caja")
+        for i in encontrados[:args.limite].tolist():
+            print(f"- #{i}: ({puntos[i, 0]}, {puntos[i, 1]})")
+        return 0
+    resultado = indice.mas_cercano(args.latitud, args.longitud)
+    if resultado is None:
+        print("El archivo no tiene puntos.")
+        return 0
+    i, distancia = resultado
+    print(f"Más cercano: #{i} ({puntos[i, 0]}, {puntos[i, 1]}) a {distancia:.3f} km")
+    print(*hemisferios_tupla(puntos[i]), sep="\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
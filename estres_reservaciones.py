@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Prueba de estrés de reservaciones concurrentes
+- Crea una base temporal con un cliente y una sala
+- Lanza N procesos, cada uno con varios hilos, que intentan reservar el MISMO espacio a la vez
+- Comprueba que exactamente un folio gana y que la tabla tiene una sola reservación
+
+Uso:
+    python estres_reservaciones.py --procesos 8 --hilos 4
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import Evidencia_Tres as reservas
+from conexiones import cerrar_todas, conexion, en_transaccion
+
+FECHA = (datetime.now().date() + timedelta(days=10)).strftime("%d/%m/%Y")
+
+
+def _trabajador(db_file, id_proceso, hilos, barrera_inicio):
+    """Corre en otro proceso: `hilos` hilos reservan el mismo espacio; devuelve los folios ganadores."""
+    reservas.DB_FILE = db_file
+    fecha_iso = reservas.es_fecha_valida_str(FECHA).date().isoformat()
+    ganadores = []
+    errores = []
+    barrera = threading.Barrier(hilos)
+
+    def intentar(id_hilo):
+        barrera.wait()
+        try:
+            if id_hilo % 2:
+                # ruta por lote (CLI, servicio)
+                estado, detalle = reservas.registrar_reservaciones_lote(
+                    [(1, 1, f"P{id_proceso}-H{id_hilo}", "M", FECHA)])[0]
+                if estado == reservas.ACEPTADA:
+                    ganadores.append(detalle)
+            else:
+                # ruta interactiva
+                folio = en_transaccion(db_file, lambda conn: reservas._insertar_si_libre(
+                    conn, 1, 1, f"P{id_proceso}-H{id_hilo}", "M", fecha_iso))
+                if folio is not None:
+                    ganadores.append(folio)
+        except Exception as e:
+            errores.append(repr(e))
+
+    while time.time() < barrera_inicio:
+        time.sleep(0.001)
+    hilos_lista = [threading.Thread(target=intentar, args=(i,)) for i in range(hilos)]
+    for h in hilos_lista:
+        h.start()
+    for h in hilos_lista:
+        h.join()
+    return ganadores, errores
+
+
+def estresar(procesos=8, hilos=4):
+    """Devuelve (folios_ganadores, errores, filas_en_tabla)."""
+    directorio = tempfile.mkdtemp(prefix="estres_reservaciones_")
+    db_file = os.path.join(directorio, "estres.db")
+    reservas.DB_FILE = db_file
+    reservas.Crear_tabla()
+    reservas.agregar_cliente("Cliente estrés")
+    reservas.agregar_sala("Sala estrés", 10)
+
+    inicio = time.time() + 1.0  # todos los procesos arrancan al mismo instante
+    ganadores, errores = [], []
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [pool.submit(_trabajador, db_file, p, hilos, inicio) for p in range(procesos)]
+        for f in futuros:
+            g, e = f.result()
+            ganadores.extend(g)
+            errores.extend(e)
+
+    with conexion(db_file) as conn:
+        filas = conn.execute("SELECT COUNT(*) FROM Reservaciones").fetchone()[0]
+    cerrar_todas()
+    shutil.rmtree(directorio, ignore_errors=True)
+    return ganadores, errores, filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estrés de reservaciones concurrentes sobre un mismo espacio.")
+    parser.add_argument("--procesos", type=int, default=8)
+    parser.add_argument("--hilos", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    ganadores, errores, filas = estresar(args.procesos, args.hilos)
+    print(f"Intentos: {args.procesos * args.hilos}")
+    print(f"Folios ganadores: {ganadores}")
+    print(f"Filas en Reservaciones: {filas}")
+    for e in errores:
+        print("Error:", e)
+    assert not errores, "hubo errores (p. ej. 'database is locked')"
+    assert len(ganadores) == 1, "debe ganar exactamente un folio"
+    assert filas == 1, "debe existir exactamente una reservación"
+    print("OK: exactamente un folio ganó.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
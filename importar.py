@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Importación masiva de Usuarios y Salas
+- Lee archivos CSV (con encabezado) o JSON-lines, fila por fila con generadores
+- Valida igual que Registrar_Cliente / Registrar_Sala (nombre no vacío, capacidad > 0)
+- Inserta por lotes, una transacción por lote, así que sirve para archivos más grandes que la memoria
+- Reporta las claves asignadas y la velocidad en filas por segundo
+
+Uso:
+    python importar.py usuarios clientes.csv
+    python importar.py salas salas.jsonl --lote 5000 --claves claves_salas.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+
+import Evidencia_Tres
+from conexiones import en_transaccion
+
+TAMANO_LOTE = 1000
+
+
+def leer_filas(ruta):
+    """Genera (numero_de_linea, dict) desde un CSV con encabezado o un archivo JSON-lines."""
+    extension = os.path.splitext(ruta)[1].lower()
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        if extension in (".jsonl", ".json", ".ndjson"):
+            for num_linea, linea in enumerate(archivo, start=1):
+                linea = linea.strip()
+                if not linea:
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except json.JSONDecodeError as e:
+                    yield num_linea, ValueError(f"JSON inválido: {e}")
+                    continue
+                if not isinstance(fila, dict):
+                    yield num_linea, ValueError("Cada línea debe ser un objeto JSON con sus campos.")
+                    continue
+                yield num_linea, fila
+        else:
+            lector = csv.DictReader(archivo)
+            for fila in lector:
+                yield lector.line_num, fila
+
+
+def validar_usuario(fila):
+    nombre = str(fila.get("nombre") or "").strip()
+    if not nombre:
+        raise ValueError("El nombre del usuario no puede estar vacío.")
+    return (nombre,)
+
+
+def validar_sala(fila):
+    nombre = str(fila.get("nombre") or "").strip()
+    if not nombre:
+        raise ValueError("El nombre de la sala no puede estar vacío.")
+    try:
+        capacidad = int(fila.get("capacidad"))
+    except (TypeError, ValueError):
+        raise ValueError("Introduce un número válido para la capacidad.")
+    if capacidad <= 0:
+        raise ValueError("La capacidad debe ser mayor que cero.")
+    return (nombre, capacidad)
+
+
+TABLAS = {
+    "usuarios": ("Usuarios", "INSERT INTO Usuarios (nombre) VALUES (?)", validar_usuario),
+    "salas": ("Salas", "INSERT INTO Salas (nombre, capacidad) VALUES (?, ?)", validar_sala),
+}
+
+
+def _insertar_lote(tabla, sql, lote):
+    """
+    Inserta un lote en una transacción y devuelve la primera clave asignada.
+    en_transaccion usa BEGIN IMMEDIATE (y reintenta si otro proceso escribe), así que nadie más
+    escribe mientras tanto y las claves AUTOINCREMENT del lote son consecutivas a partir de
+    sqlite_sequence + 1.
+    """
+    def operacion(conn):
+        mi_cursor = conn.cursor()
+        mi_cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (tabla,))
+        fila = mi_cursor.fetchone()
+        mi_cursor.execute(f"SELECT COALESCE(MAX(clave), 0) FROM {tabla}")
+        ultima = max(fila[0] if fila else 0, mi_cursor.fetchone()[0])
+        mi_cursor.executemany(sql, lote)
+        return ultima + 1
+
+    primera = en_transaccion(Evidencia_Tres.DB_FILE, operacion)
+    if tabla == "Salas":
+        Evidencia_Tres.invalidar_cache_salas()
+    return primera
+
+
+def importar(ruta, tipo, tamano_lote=TAMANO_LOTE, salida_claves=None):
+    """
+    Importa `ruta` a la tabla de `tipo` ('usuarios' o 'salas').
+    salida_claves: archivo CSV opcional donde se escribe (linea, nombre, clave) por cada fila insertada.
+    Devuelve un resumen con filas leídas, insertadas, inválidas, rango de claves y filas por segundo.
+    """
+    tabla, sql, validar = TABLAS[tipo]
+    resumen = {"leidas": 0, "insertadas": 0, "invalidas": 0,
+               "primera_clave": None, "ultima_clave": None}
+    archivo_claves = open(salida_claves, "w", newline="", encoding="utf-8") if salida_claves else None
+    escritor = csv.writer(archivo_claves) if archivo_claves else None
+    if escritor:
+        escritor.writerow(["linea", "nombre", "clave"])
+
+    def vaciar(lote, lineas):
+        primera = _insertar_lote(tabla, sql, lote)
+        if resumen["primera_clave"] is None:
+            resumen["primera_clave"] = primera
+        resumen["ultima_clave"] = primera + len(lote) - 1
+        resumen["insertadas"] += len(lote)
+        if escritor:
+            for i, (linea, valores) in enumerate(zip(lineas, lote)):
+                escritor.writerow([linea, valores[0], primera + i])
+
+    inicio = time.perf_counter()
+    try:
+        lote, lineas = [], []
+        for num_linea, fila in leer_filas(ruta):
+            resumen["leidas"] += 1
+            try:
+                if isinstance(fila, Exception):
+                    raise fila
+                valores = validar(fila)
+            except ValueError as e:
+                resumen["invalidas"] += 1
+                print(f"Línea {num_linea}: {e}")
+                continue
+            lote.append(valores)
+            lineas.append(num_linea)
+            if len(lote) >= tamano_lote:
+                vaciar(lote, lineas)
+                lote, lineas = [], []
+        if lote:
+            vaciar(lote, lineas)
+    finally:
+        if archivo_claves:
+            archivo_claves.close()
+
+    segundos = time.perf_counter() - inicio
+    resumen["segundos"] = segundos
+    resumen["filas_por_segundo"] = resumen["leidas"] / segundos if segundos > 0 else 0.0
+    return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa Usuarios o Salas desde CSV o JSON-lines.")
+    parser.add_argument("tipo", choices=sorted(TABLAS), help="tabla destino")
+    parser.add_argument("archivo", help="archivo .csv (con encabezado) o .jsonl")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="filas por transacción")
+    parser.add_argument("--claves", help="CSV donde guardar las claves asignadas")
+    args = parser.parse_args(argv)
+
+    Evidencia_Tres.preparar_base()
+    resumen = importar(args.archivo, args.tipo, args.lote, args.claves)
+    print(f"Filas leídas: {resumen['leidas']}")
+    print(f"Filas insertadas: {resumen['insertadas']}")
+    print(f"Filas inválidas: {resumen['invalidas']}")
+    if resumen["insertadas"]:
+        print(f"Claves asignadas: {resumen['primera_clave']} a {resumen['ultima_clave']}")
+    print(f"Tiempo: {resumen['segundos']:.2f} s ({resumen['filas_por_segundo']:.0f} filas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Instrumentación opcional de operaciones y consultas SQL
+- Se activa con la variable de entorno RESERVAS_PERFIL=1 (o con activar(), p. ej. `cli.py --perfil`)
+- Mide cada sentencia SQL y cada operación pública de Evidencia_Tres: tiempo, consultas por
+  operación y filas leídas
+- Al salir imprime un resumen por sesión; con RESERVAS_TRAZA=archivo.json además guarda la traza
+Apagada no cuesta nada: no se envuelve ninguna función ni conexión.
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import conexiones
+
+MAX_EVENTOS = 100000  # tope de eventos en la traza para no crecer sin límite
+LARGO_SQL_TRAZA = 200  # caracteres de la sentencia en cada evento de la traza
+
+_activo = False
+_lock = threading.Lock()
+_local = threading.local()
+_operaciones = defaultdict(lambda: {"llamadas": 0, "ms": 0.0, "ms_sql": 0.0, "consultas": 0, "filas": 0})
+_sentencias = defaultdict(lambda: {"ejecuciones": 0, "ms": 0.0, "filas": 0})
+_eventos = []
+_eventos_descartados = 0
+_inicio_sesion = time.perf_counter()
+_ruta_traza = None
+
+
+def habilitado_por_entorno():
+    return os.environ.get("RESERVAS_PERFIL", "").lower() in ("1", "si", "true", "yes")
+
+
+def activa():
+    return _activo
+
+
+def _pila():
+    pila = getattr(_local, "pila", None)
+    if pila is None:
+        pila = _local.pila = []
+    return pila
+
+
+def _evento(tipo, nombre, inicio, ms, **extra):
+    global _eventos_descartados
+    if len(_eventos) >= MAX_EVENTOS:
+        _eventos_descartados += 1
+        return
+    _eventos.append({"tipo": tipo, "nombre": nombre, "inicio_ms": round((inicio - _inicio_sesion) * 1000, 3),
+                     "duracion_ms": round(ms, 3), "hilo": threading.get_ident(), **extra})
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalizar(sql):
+    """Sentencia completa en una línea: es la llave de _sentencias, así que no se recorta."""
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def _registrar_sql(sql, ms, filas):
+    texto = _normalizar(sql)
+    with _lock:
+        s = _sentencias[texto]
+        s["ejecuciones"] += 1
+        s["ms"] += ms
+        s["filas"] += filas
+        # se atribuye a todas las operaciones en curso (métricas inclusivas)
+        for nombre in _pila():
+            op = _operaciones[nombre]
+            op["consultas"] += 1
+            op["ms_sql"] += ms
+            op["filas"] += filas
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Mide execute/executemany y el tiempo y filas de los fetch posteriores."""
+
+    _sql = ""
+
+    def _medir(self, metodo, sql, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(self, sql, *args)
+        ms = (time.perf_counter() - inicio) * 1000
+        self._sql = sql
+        _registrar_sql(sql, ms, 0)
+        with _lock:
+            _evento("sql", _normalizar(sql)[:LARGO_SQL_TRAZA], inicio, ms, operacion=(_pila() or [None])[-1])
+        return resultado
+
+    def execute(self, sql, parametros=()):
+        return self._medir(sqlite3.Cursor.execute, sql, parametros)
+
+    def executemany(self, sql, secuencia):
+        return self._medir(sqlite3.Cursor.executemany, sql, secuencia)
+
+    def executescript(self, script):
+        return self._medir(sqlite3.Cursor.executescript, script)
+
+    def _leer(self, metodo, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(self, *args)
+        ms = (time.perf_counter() - inicio) * 1000
+        filas = len(resultado) if isinstance(resultado, list) else (1 if resultado is not None else 0)
+        with _lock:
+            s = _sentencias[_normalizar(self._sql)]
+            s["ms"] += ms
+            s["filas"] += filas
+            for nombre in _pila():
+                _operaciones[nombre]["ms_sql"] += ms
+                _operaciones[nombre]["filas"] += filas
+        return resultado
+
+    def fetchone(self):
+        return self._leer(sqlite3.Cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        return self._leer(sqlite3.Cursor.fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._leer(sqlite3.Cursor.fetchall)
+
+    def __next__(self):
+        fila = self._leer(lambda c: sqlite3.Cursor.__next__(c))
+        return fila
+
+
+class ConexionInstrumentada(sqlite3.Connection):
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, secuencia):
+        return self.cursor().executemany(sql, secuencia)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+
+def _envolver(nombre, funcion):
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        pila = _pila()
+        pila.append(nombre)
+        inicio = time.perf_counter()
+        try:
+            resultado = funcion(*args, **kwargs)
+            if inspect.isgenerator(resultado):
+                # los generadores trabajan al consumirse: se mide el recorrido completo
+                return _medir_generador(nombre, resultado, inicio)
+            return resultado
+        finally:
+            pila.pop()
+            ms = (time.perf_counter() - inicio) * 1000
+            with _lock:
+                op = _operaciones[nombre]
+                op["llamadas"] += 1
+                op["ms"] += ms
+                _evento("operacion", nombre, inicio, ms)
+    envoltura._instrumentada = True
+    return envoltura
+
+
+def _medir_generador(nombre, generador, inicio):
+    pila = _pila()
+    try:
+        while True:
+            pila.append(nombre)
+            try:
+                valor = next(generador)
+            except StopIteration:
+                return
+            finally:
+                pila.pop()
+            yield valor
+    finally:
+        ms = (time.perf_counter() - inicio) * 1000
+        with _lock:
+            _operaciones[nombre + " (recorrido)"]["llamadas"] += 1
+            _operaciones[nombre + " (recorrido)"]["ms"] += ms
+
+
+def instrumentar_modulo(modulo):
+    """Envuelve todas las funciones públicas definidas en `modulo`."""
+    for nombre, objeto in list(vars(modulo).items()):
+        if (nombre.startswith("_") or not inspect.isfunction(objeto)
+                or objeto.__module__ != modulo.__name__ or getattr(objeto, "_instrumentada", False)):
+            continue
+        setattr(modulo, nombre, _envolver(nombre, objeto))
+
+
+def activar(*modulos, traza=None):
+    """Activa la instrumentación: conexiones nuevas instrumentadas y funciones públicas envueltas."""
+    global _activo, _ruta_traza
+    _ruta_traza = traza or os.environ.get("RESERVAS_TRAZA") or _ruta_traza
+    for modulo in modulos:
+        instrumentar_modulo(modulo)
+    if _activo:
+        return
+    _activo = True
+    conexiones.cerrar_todas()  # las conexiones ya abiertas no están instrumentadas
+    conexiones.FABRICA_CONEXION = ConexionInstrumentada
+    atexit.register(volcar)
+
+
+def resumen():
+    """Métricas acumuladas de la sesión."""
+    with _lock:
+        return {
+            "segundos_sesion": round(time.perf_counter() - _inicio_sesion, 3),
+            "operaciones": {k: {**v, "ms": round(v["ms"], 3), "ms_sql": round(v["ms_sql"], 3)}
+                            for k, v in _operaciones.items()},
+            "sentencias": {k: {**v, "ms": round(v["ms"], 3)} for k, v in _sentencias.items()},
+        }
+
+
+def volcar(salida=sys.stderr):
+    """Imprime el resumen y, si se pidió, escribe la traza JSON."""
+    datos = resumen()
+    print("\n==== Perfil de la sesión ====", file=salida)
+    print(f"{'Operación':40s} {'llamadas':>8s} {'total ms':>10s} {'SQL ms':>10s} {'consultas':>9s} {'filas':>9s}",
+          file=salida)
+    for nombre, op in sorted(datos["operaciones"].items(), key=lambda x: -x[1]["ms"]):
+        print(f"{nombre[:40]:40s} {op['llamadas']:8d} {op['ms']:10.2f} {op['ms_sql']:10.2f} "
+              f"{op['consultas']:9d} {op['filas']:9d}", file=salida)
+    print(f"\n{'Sentencia SQL (más costosas)':70s} {'veces':>7s} {'ms':>10s} {'filas':>9s}", file=salida)
+    for sql, s in sorted(datos["sentencias"].items(), key=lambda x: -x[1]["ms"])[:15]:
+        print(f"{sql[:70]:70s} {s['ejecuciones']:7d} {s['ms']:10.2f} {s['filas']:9d}", file=salida)
+    if _ruta_traza:
+        with open(_ruta_traza, "w", encoding="utf-8") as f:
+            json.dump({**datos, "eventos": _eventos, "eventos_descartados": _eventos_descartados}, f)
+        print(f"\nTraza guardada en '{_ruta_traza}'", file=salida)
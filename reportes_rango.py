@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Reportes de reservaciones de muchas fechas en una sola corrida (p. ej. el cierre de mes)
+- Una sola consulta por rango (paginas_reservaciones) en lugar de abrir la base y hacer el join por
+  cada día; las filas llegan ordenadas por fecha y se agrupan al vuelo con groupby
+- Cada día se serializa en un proceso del pool: un archivo por día, con el mismo nombre que da
+  reporte_reservaciones_por_fecha (Reporte_Reservaciones_AAAA-MM-DD.xlsx)
+- Con --un-libro todo va a un solo libro con una hoja por día; openpyxl no puede unir libros escritos en
+  procesos distintos, así que ese modo escribe en el proceso principal mientras lee
+- Reporta el tiempo total, el de lectura y el de cada archivo
+
+Uso:
+    python reportes_rango.py 01/11/2030 30/11/2030 --procesos 4 --directorio reportes_noviembre
+    python reportes_rango.py 01/11/2030 30/11/2030 --un-libro --directorio reportes_noviembre
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from operator import itemgetter
+
+import Evidencia_Tres
+
+FORMATOS = {"xlsx": None, "csv": ",", "tsv": "\t"}  # formato -> delimitador
+
+
+def dias_del_rango(fecha_inicio_iso, fecha_fin_iso, tamano_pagina=Evidencia_Tres.TAMANO_BLOQUE):
+    """Genera (fecha_iso, filas) por cada día con reservaciones del rango, leyendo por páginas."""
+    filas = itertools.chain.from_iterable(
+        Evidencia_Tres.paginas_reservaciones(fecha_inicio_iso, fecha_fin_iso, tamano_pagina))
+    for fecha_iso, grupo in itertools.groupby(filas, key=itemgetter(5)):
+        yield fecha_iso, list(grupo)
+
+
+def _exportar_dia(fecha_iso, filas, directorio, formato):
+    """Corre en un proceso del pool. Devuelve (fecha, filas, segundos, archivo, error)."""
+    inicio = time.perf_counter()
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):  # los mensajes de cada proceso se mezclarían en la terminal
+        if formato == "xlsx":
+            total = Evidencia_Tres.exportar_registros_a_excel(filas, fecha_iso, directorio)
+        else:
+            total = Evidencia_Tres.exportar_registros_a_csv(filas, fecha_iso, FORMATOS[formato], directorio)
+    error = salida.getvalue().strip() if total is None else None
+    return (fecha_iso, len(filas), time.perf_counter() - inicio,
+            Evidencia_Tres.nombre_reporte(fecha_iso, formato, directorio), error)
+
+
+def generar_reportes(fecha_inicio_iso, fecha_fin_iso, procesos=None, directorio="", formato="xlsx",
+                     tamano_pagina=Evidencia_Tres.TAMANO_BLOQUE):
+    """
+    Un archivo por día con reservaciones entre las dos fechas (inclusive).
+    procesos: tamaño del pool (por defecto os.cpu_count()); con 1 se escribe en este mismo proceso.
+    Como mucho hay 2 días por proceso esperando turno, así que la memoria no crece con el rango.
+    Devuelve un resumen con la lista de archivos (fecha, filas, segundos, archivo), los errores y los tiempos.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    resumen = {"archivos": [], "errores": [], "segundos_lectura": 0.0}
+
+    def registrar(resultado):
+        fecha_iso, filas, segundos, archivo, error = resultado
+        if error:
+            resumen["errores"].append((fecha_iso, error))
+        else:
+            resumen["archivos"].append({"fecha": fecha_iso, "filas": filas, "segundos": segundos, "archivo": archivo})
+
+    inicio = time.perf_counter()
+    dias = dias_del_rango(fecha_inicio_iso, fecha_fin_iso, tamano_pagina)
+    pool = ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else None
+    pendientes = set()
+    try:
+        while True:
+            inicio_lectura = time.perf_counter()
+            dia = next(dias, None)
+            resumen["segundos_lectura"] += time.perf_counter() - inicio_lectura
+            if dia is None:
+                break
+            if pool is None:
+                registrar(_exportar_dia(*dia, directorio, formato))
+                continue
+            pendientes.add(pool.submit(_exportar_dia, *dia, directorio, formato))
+            if len(pendientes) >= 2 * procesos:
+                terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    registrar(futuro.result())
+        for futuro in pendientes:
+            registrar(futuro.result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    resumen["archivos"].sort(key=itemgetter("fecha"))
+    resumen["segundos_total"] = time.perf_counter() - inicio
+    return resumen
+
+
+def generar_libro_unico(fecha_inicio_iso, fecha_fin_iso, directorio="", tamano_pagina=Evidencia_Tres.TAMANO_BLOQUE):
+    """
+    Un solo libro de Excel con una hoja por día (nombrada AAAA-MM-DD), escrito en streaming.
+    El tiempo de cada hoja incluye leer sus filas; guardar el libro se reporta aparte.
+    """
+    import openpyxl  # se importa aquí, como en exportar_registros_a_excel
+
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    archivo = Evidencia_Tres.nombre_reporte(f"{fecha_inicio_iso}_a_{fecha_fin_iso}", "xlsx", directorio)
+    resumen = {"archivos": [], "errores": [], "libro": archivo}
+    inicio = time.perf_counter()
+    workbook = openpyxl.Workbook(write_only=True)
+    filas = itertools.chain.from_iterable(
+        Evidencia_Tres.paginas_reservaciones(fecha_inicio_iso, fecha_fin_iso, tamano_pagina))
+    inicio_hoja = time.perf_counter()
+    for fecha_iso, grupo in itertools.groupby(filas, key=itemgetter(5)):
+        hoja = workbook.create_sheet(fecha_iso)
+        hoja.append(Evidencia_Tres.ENCABEZADOS)
+        total = 0
+        for fila in grupo:
+            hoja.append(fila)
+            total += 1
+        fin_hoja = time.perf_counter()
+        resumen["archivos"].append({"fecha": fecha_iso, "filas": total, "segundos": fin_hoja - inicio_hoja,
+                                    "archivo": f"{archivo} [{fecha_iso}]"})
+        inicio_hoja = fin_hoja
+    inicio_guardar = time.perf_counter()
+    if resumen["archivos"]:
+        workbook.save(archivo)
+    resumen["segundos_guardar"] = time.perf_counter() - inicio_guardar
+    resumen["segundos_total"] = time.perf_counter() - inicio
+    return resumen
+
+
+def _fecha_iso(texto):
+    fecha_dt = Evidencia_Tres.es_fecha_valida_str(texto)
+    if not fecha_dt:
+        raise argparse.ArgumentTypeError("Formato de fecha no válido. Usa dd/mm/aaaa.")
+    return fecha_dt.date().isoformat()
+
+
+def imprimir_resumen(resumen):
+    if not resumen["archivos"] and not resumen["errores"]:
+        print("No hay reservaciones en ese rango de fechas.")
+        return
+    print("Fecha\tFilas\tSegundos\tArchivo")
+    for a in resumen["archivos"]:
+        print(f"{a['fecha']}\t{a['filas']}\t{a['segundos']:.3f}\t{a['archivo']}")
+    for fecha_iso, error in resumen["errores"]:
+        print(f"{fecha_iso}\tERROR\t{error}")
+    filas = sum(a["filas"] for a in resumen["archivos"])
+    suma = sum(a["segundos"] for a in resumen["archivos"])
+    print(f"Total: {len(resumen['archivos'])} reportes, {filas} filas en {resumen['segundos_total']:.2f} s "
+          f"(suma por reporte {suma:.2f} s)")
+    if "segundos_lectura" in resumen:
+        print(f"Lectura de la base: {resumen['segundos_lectura']:.2f} s")
+    if "segundos_guardar" in resumen:
+        print(f"Guardar el libro: {resumen['segundos_guardar']:.2f} s ({resumen['libro']})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reportes de reservaciones por día para un rango de fechas.")
+    parser.add_argument("fecha_inicio", type=_fecha_iso, help="dd/mm/aaaa")
+    parser.add_argument("fecha_fin", type=_fecha_iso, help="dd/mm/aaaa (inclusive)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count(), help="procesos que escriben archivos")
+    parser.add_argument("--directorio", default="", help="carpeta de salida (por defecto la actual)")
+    parser.add_argument("--formato", choices=sorted(FORMATOS), default="xlsx")
+    parser.add_argument("--un-libro", action="store_true", help="un solo libro de Excel con una hoja por día")
+    parser.add_argument("--pagina", type=int, default=Evidencia_Tres.TAMANO_BLOQUE, help="filas por página leída")
+    parser.add_argument("--db", help=f"archivo de base de datos (por defecto {Evidencia_Tres.DB_FILE})")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        Evidencia_Tres.DB_FILE = args.db
+    if args.fecha_inicio > args.fecha_fin:
+        print("La fecha inicial debe ser anterior o igual a la final.")
+        return 1
+    if args.un_libro and args.formato != "xlsx":
+        print("--un-libro sólo está disponible en formato xlsx.")
+        return 1
+    Evidencia_Tres.preparar_base()
+    if args.un_libro:
+        resumen = generar_libro_unico(args.fecha_inicio, args.fecha_fin, args.directorio, args.pagina)
+    else:
+        resumen = generar_reportes(args.fecha_inicio, args.fecha_fin, args.procesos, args.directorio,
+                                   args.formato, args.pagina)
+    imprimir_resumen(resumen)
+    return 1 if resumen["errores"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# encoding: utf-8
+"""
+Servicio HTTP/JSON local del Sistema de Reservaciones (asyncio, sólo biblioteca estándar)
+- GET    /disponibilidad?fecha=dd/mm/aaaa      espacios libres de la fecha
+- GET    /reporte?fecha=dd/mm/aaaa             reservaciones de la fecha
+- POST   /reservaciones                        {"cliente_clave", "sala_clave", "nombre", "horario", "fecha"}
+- DELETE /reservaciones/<folio>                regla de 3 días (404 si no existe, 409 si faltan menos de 3)
+- GET    /metricas                             latencia p50/p95/p99 por "MÉTODO ruta"
+El trabajo bloqueante de SQLite se hace en hilos: un pool para lecturas y uno pequeño,
+acotado, para escrituras (SQLite sólo admite un escritor a la vez).
+
+Uso:
+    python servicio.py --puerto 8080
+    python carga_servicio.py --url http://127.0.0.1:8080 --peticiones 5000 --concurrencia 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import Evidencia_Tres as reservas
+from conexiones import obtener_pool
+
+HILOS_LECTURA = 8
+HILOS_ESCRITURA = 2
+MUESTRAS_LATENCIA = 10000  # últimas mediciones que se guardan por ruta
+MAXIMO_CUERPO = 16 * 1024  # bytes; una reservación en JSON ocupa unos cien
+RAZONES = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+RUTAS = ("/disponibilidad", "/reporte", "/reservaciones", "/metricas")
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+def _leer_fecha(texto):
+    """Acepta dd/mm/aaaa o YYYY-MM-DD y devuelve la fecha en ISO."""
+    if not texto:
+        raise ErrorHTTP(400, "Falta el parámetro fecha.")
+    fecha_iso = reservas._texto_a_fecha_iso(texto)
+    if fecha_iso is None:
+        raise ErrorHTTP(400, "Formato de fecha no válido. Usa dd/mm/aaaa.")
+    return fecha_iso
+
+
+def _longitud_cuerpo(cabeceras):
+    """
+    Content-Length como entero >= 0; ErrorHTTP 400 si no es un número o es negativo
+    y 413 si pasa de MAXIMO_CUERPO (no se guarda en memoria un cuerpo arbitrario).
+    """
+    texto = cabeceras.get("content-length", "") or "0"
+    if not (texto.isascii() and texto.isdigit()):
+        raise ErrorHTTP(400, "Content-Length inválido.")
+    longitud = int(texto)
+    if longitud > MAXIMO_CUERPO:
+        raise ErrorHTTP(413, f"El cuerpo no puede pasar de {MAXIMO_CUERPO} bytes.")
+    return longitud
+
+
+def _etiqueta(metodo, ruta):
+    """Nombre de la petición en las métricas; es el mismo si la petición sale bien o con error."""
+    if ruta.startswith("/reservaciones/"):
+        ruta = "/reservaciones/<folio>"
+    elif ruta not in RUTAS:
+        ruta = "(otra)"  # las rutas desconocidas no abren una métrica cada una
+    return f"{metodo} {ruta}"
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    k = min(len(valores_ordenados) - 1, int(round(p / 100 * (len(valores_ordenados) - 1))))
+    return valores_ordenados[k]
+
+
+class Metricas:
+    """Latencias por ruta (en ms) en ventanas acotadas."""
+
+    def __init__(self, muestras=MUESTRAS_LATENCIA):
+        self._latencias = defaultdict(lambda: deque(maxlen=muestras))
+        self._conteo = defaultdict(int)
+
+    def registrar(self, ruta, ms):
+        self._latencias[ruta].append(ms)
+        self._conteo[ruta] += 1
+
+    def resumen(self):
+        resultado = {}
+        for ruta, valores in self._latencias.items():
+            ordenados = sorted(valores)
+            resultado[ruta] = {
+                "peticiones": self._conteo[ruta],
+                "p50_ms": round(percentil(ordenados, 50), 3),
+                "p95_ms": round(percentil(ordenados, 95), 3),
+                "p99_ms": round(percentil(ordenados, 99), 3),
+                "max_ms": round(ordenados[-1], 3) if ordenados else 0.0,
+            }
+        return resultado
+
+
+class ServicioReservaciones:
+    def __init__(self, hilos_lectura=HILOS_LECTURA, hilos_escritura=HILOS_ESCRITURA):
+        self.lecturas = ThreadPoolExecutor(max_workers=hilos_lectura, thread_name_prefix="lectura")
+        self.escrituras = ThreadPoolExecutor(max_workers=hilos_escritura, thread_name_prefix="escritura")
+        self.metricas = Metricas()
+        # hasta una conexión por hilo
+        pool = obtener_pool(reservas.DB_FILE)
+        pool.tamano = max(pool.tamano, hilos_lectura + hilos_escritura)
+
+    async def _en_hilo(self, executor, funcion, *args):
+        return await asyncio.get_running_loop().run_in_executor(executor, funcion, *args)
+
+    async def disponibilidad(self, consulta, cuerpo):
+        fecha_iso = _leer_fecha(consulta.get("fecha"))
+        filas = await self._en_hilo(self.lecturas, reservas.disponibilidad_por_fecha, fecha_iso)
+        return 200, {"fecha": fecha_iso,
+                     "disponibles": [{"sala_clave": c, "sala": n, "turno": t} for c, n, t in filas]}
+
+    async def reporte(self, consulta, cuerpo):
+        fecha_iso = _leer_fecha(consulta.get("fecha"))
+        filas = await self._en_hilo(self.lecturas, reservas.reservaciones_por_fecha, fecha_iso)
+        campos = [c.lower() for c in reservas.ENCABEZADOS]
+        return 200, {"fecha": fecha_iso, "reservaciones": [dict(zip(campos, f)) for f in filas]}
+
+    async def reservar(self, consulta, cuerpo):
+        try:
+            datos = json.loads(cuerpo or b"{}")
+            solicitud = (datos["cliente_clave"], datos["sala_clave"], datos["nombre"],
+                         datos["horario"], datos["fecha"])
+        except (ValueError, KeyError, TypeError):
+            raise ErrorHTTP(400, "Cuerpo JSON inválido; se esperan cliente_clave, sala_clave, nombre, horario y fecha.")
+        estado, detalle = (await self._en_hilo(
+            self.escrituras, reservas.registrar_reservaciones_lote, [solicitud]))[0]
+        if estado == reservas.ACEPTADA:
+            return 201, {"folio": detalle}
+        if estado == reservas.CONFLICTO:
+            return 409, {"error": detalle}
+        return 400, {"error": detalle}
+
+    async def eliminar(self, folio):
+        estado, mensaje = await self._en_hilo(self.escrituras, reservas.cancelar_reservacion, folio)
+        if estado == reservas.ELIMINADA:
+            return 200, {"mensaje": mensaje}
+        if estado == reservas.NO_ENCONTRADA:
+            return 404, {"error": mensaje}
+        return 409, {"error": mensaje}
+
+    async def despachar(self, metodo, ruta, consulta, cuerpo):
+        if ruta == "/disponibilidad" and metodo == "GET":
+            return await self.disponibilidad(consulta, cuerpo)
+        if ruta == "/reporte" and metodo == "GET":
+            return await self.reporte(consulta, cuerpo)
+        if ruta == "/reservaciones" and metodo == "POST":
+            return await self.reservar(consulta, cuerpo)
+        if ruta.startswith("/reservaciones/") and metodo == "DELETE":
+            try:
+                folio = int(ruta.rsplit("/", 1)[1])
+            except ValueError:
+                raise ErrorHTTP(400, "Folio inválido.")
+            return await self.eliminar(folio)
+        if ruta == "/metricas" and metodo == "GET":
+            return 200, {"latencias": self.metricas.resumen(), "cache": reservas.estadisticas_cache()}
+        if ruta in RUTAS:
+            raise ErrorHTTP(405, "Método no permitido.")
+        raise ErrorHTTP(404, "Ruta no encontrada.")
+
+    async def atender(self, reader, writer):
+        """Atiende una conexión; soporta keep-alive (varias peticiones por conexión)."""
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                inicio = time.perf_counter()
+                try:
+                    metodo, destino, version = linea.decode("latin-1").split()
+                except ValueError:
+                    break
+                cabeceras = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = h.decode("latin-1").partition(":")
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                cerrar = (cabeceras.get("connection", "").lower() == "close"
+                          or (version == "HTTP/1.0" and cabeceras.get("connection", "").lower() != "keep-alive"))
+
+                metodo = metodo.upper()
+                partes = urlsplit(destino)
+                etiqueta = _etiqueta(metodo, partes.path)
+                try:
+                    longitud = _longitud_cuerpo(cabeceras)
+                except ErrorHTTP as e:
+                    # sin una longitud válida (o aceptable) no se sabe dónde empieza la siguiente petición
+                    estado, datos, cerrar = e.estado, {"error": e.mensaje}, True
+                else:
+                    cuerpo = await reader.readexactly(longitud) if longitud else b""
+                    consulta = {k: v[0] for k, v in parse_qs(partes.query).items()}
+                    try:
+                        estado, datos = await self.despachar(metodo, partes.path, consulta, cuerpo)
+                    except ErrorHTTP as e:
+                        estado, datos = e.estado, {"error": e.mensaje}
+                    except Exception as e:
+                        estado, datos = 500, {"error": str(e)}
+
+                contenido = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {estado} {RAZONES.get(estado, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(contenido)}\r\n"
+                    f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n".encode("latin-1") + contenido
+                )
+                await writer.drain()
+                self.metricas.registrar(etiqueta, (time.perf_counter() - inicio) * 1000)
+                if cerrar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def cerrar(self):
+        self.lecturas.shutdown(wait=True)
+        self.escrituras.shutdown(wait=True)
+
+
+async def servir(host="127.0.0.1", puerto=8080, hilos_lectura=HILOS_LECTURA, hilos_escritura=HILOS_ESCRITURA):
+    servicio = ServicioReservaciones(hilos_lectura, hilos_escritura)
+    servidor = await asyncio.start_server(servicio.atender, host, puerto, backlog=1024)
+    print(f"Servicio de reservaciones escuchando en http://{host}:{puerto}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servicio.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON local de reservaciones.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--db", help=f"archivo de base de datos (por defecto {reservas.DB_FILE})")
+    parser.add_argument("--lecturas", type=int, default=HILOS_LECTURA, help="hilos para consultas")
+    parser.add_argument("--escrituras", type=int, default=HILOS_ESCRITURA, help="hilos/conexiones de escritura")
+    args = parser.parse_args(argv)
+    if args.db:
+        reservas.DB_FILE = args.db
+    reservas.preparar_base()
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.lecturas, args.escrituras))
+    except KeyboardInterrupt:
+        print("\nServicio detenido.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# encoding: utf-8
+"""Fixtures compartidas: cada prueba trabaja sobre su propia copia de la base en tmp_path."""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import conexiones  # noqa: E402
+import Evidencia_Tres  # noqa: E402
+
+
+def _usar_base(monkeypatch, ruta):
+    conexiones.cerrar_todas()
+    Evidencia_Tres.limpiar_cache()
+    monkeypatch.setattr(Evidencia_Tres, "DB_FILE", str(ruta))
+
+
+@pytest.fixture
+def base_vacia(tmp_path, monkeypatch):
+    """Base nueva con el esquema completo."""
+    ruta = tmp_path / "prueba.db"
+    _usar_base(monkeypatch, ruta)
+    Evidencia_Tres.preparar_base()
+    yield ruta
+    conexiones.cerrar_todas()
+
+
+@pytest.fixture
+def base_34(tmp_path, monkeypatch):
+    """Copia de la base incluida en el repositorio (34.db), sin migrar."""
+    ruta = tmp_path / "34.db"
+    shutil.copy(os.path.join(RAIZ, "34.db"), ruta)
+    _usar_base(monkeypatch, ruta)
+    yield ruta
+    conexiones.cerrar_todas()
+
+
+@pytest.fixture
+def base_con_datos(base_vacia):
+    """Base nueva con dos clientes y tres salas."""
+    for nombre in ("Ana", "Luis"):
+        Evidencia_Tres.agregar_cliente(nombre)
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.executemany("INSERT INTO Salas (nombre, capacidad) VALUES (?, ?)",
+                         [("Sala Azul", 10), ("Sala Roja", 20), ("Auditorio", 100)])
+    Evidencia_Tres.invalidar_cache_salas()
+    return base_vacia
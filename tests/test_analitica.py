@@ -0,0 +1,38 @@
+# encoding: utf-8
+import random
+
+import analitica_compras
+
+
+def _bitacora(tmp_path, cantidad=5000, semilla=5):
+    rnd = random.Random(semilla)
+    nombres = [rnd.choice(["Ana", "Luis", "Marta", "José", "Iñaki"]) + f" {rnd.randrange(800)}"
+               for _ in range(cantidad)]
+    ruta = tmp_path / "compras.txt"
+    ruta.write_text("\n".join(nombres) + "\n", encoding="utf-8")
+    return ruta, nombres
+
+
+def test_exacto_en_serie_y_en_paralelo(tmp_path):
+    ruta, nombres = _bitacora(tmp_path)
+    esperado = list(dict.fromkeys(nombres))
+    for procesos in (1, 3):
+        unicos = tmp_path / f"unicos_{procesos}.txt"
+        resumen = analitica_compras.resumir_archivo(str(ruta), procesos, "exacto", ruta_unicos=str(unicos))
+        assert resumen.como_dict()["compradores_distintos"] == len(esperado)
+        assert (resumen.ventas, resumen.primero, resumen.ultimo) == (len(nombres), nombres[0], nombres[-1])
+        assert unicos.read_text(encoding="utf-8").splitlines() == esperado
+
+
+def test_exacto_no_depende_de_las_huellas(monkeypatch):
+    monkeypatch.setattr(analitica_compras, "huella", lambda texto: 42)  # toda huella choca
+    exacto = analitica_compras.ResumenCompras("exacto").consumir(["Ana", "Luis", "Ana"])
+    huellas = analitica_compras.ResumenCompras("huellas").consumir(["Ana", "Luis", "Ana"])
+    assert exacto.distintos == 2
+    assert huellas.distintos == 1
+
+
+def test_aproximado_cerca_del_exacto(tmp_path):
+    ruta, nombres = _bitacora(tmp_path, 20000)
+    resumen = analitica_compras.resumir_archivo(str(ruta), 1, "aproximado")
+    assert abs(resumen.distintos - len(set(nombres))) / len(set(nombres)) < 0.05
@@ -0,0 +1,47 @@
+# encoding: utf-8
+import pytest
+
+import benchmark
+import conexiones
+import Evidencia_Tres
+
+OPERACIONES = {"conflicto", "disponibilidad", "recomendar_sala", "reporte_fecha", "historial_cliente", "eliminar"}
+
+
+@pytest.fixture
+def base_sintetica(tmp_path, monkeypatch):
+    """Base sintética mínima; generar_base y medir_operaciones cambian DB_FILE, aquí se restaura."""
+    conexiones.cerrar_todas()
+    monkeypatch.setattr(Evidencia_Tres, "DB_FILE", Evidencia_Tres.DB_FILE)
+    ruta = str(tmp_path / "bench.db")
+    meta = benchmark.generar_base(ruta, usuarios=5, salas=3, reservaciones=20)
+    yield ruta, meta
+    conexiones.cerrar_todas()
+    Evidencia_Tres.limpiar_cache()
+
+
+def test_medir_operaciones_en_una_base_pequena(base_sintetica):
+    ruta, meta = base_sintetica
+    assert meta["reservaciones"] == 20 and meta["dias"] >= 1
+    resultados = benchmark.medir_operaciones(ruta, meta, repeticiones=1, exportar=False)
+    assert set(resultados) == OPERACIONES
+    assert all(len(tiempos) == 1 and tiempos[0] >= 0 for tiempos in resultados.values())
+    with conexiones.conexion(ruta) as conn:  # lo eliminado se restaura para la siguiente corrida
+        assert conn.execute("SELECT COUNT(*) FROM Reservaciones").fetchone()[0] == 20
+
+
+def _informe(*resultados):
+    return {"resultados": [{"reservaciones": escala, "operacion": operacion, "mediana_ms": mediana}
+                           for escala, operacion, mediana in resultados]}
+
+
+def test_comparar_marca_solo_lo_que_supera_la_tolerancia():
+    referencia = _informe((1000, "conflicto", 10.0), (1000, "reporte_fecha", 10.0), (1000, "eliminar", 10.0))
+    actual = _informe((1000, "conflicto", 13.0),        # 30 % más lento: regresión
+                      (1000, "reporte_fecha", 12.0),    # 20 % más lento: dentro de la tolerancia
+                      (1000, "eliminar", 5.0),          # más rápido
+                      (1000, "exportar_csv", 99.0),     # sin referencia para esa operación
+                      (5000, "conflicto", 99.0))        # sin referencia para esa escala
+    assert benchmark.comparar(actual, referencia) == [(1000, "conflicto", 10.0, 13.0)]
+    assert benchmark.comparar(actual, referencia, tolerancia=1.1) == [
+        (1000, "conflicto", 10.0, 13.0), (1000, "reporte_fecha", 10.0, 12.0)]
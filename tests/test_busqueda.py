@@ -0,0 +1,75 @@
+# encoding: utf-8
+from datetime import datetime, timedelta
+
+import pytest
+
+import conexiones
+import Evidencia_Tres
+
+
+@pytest.fixture
+def base_busqueda(base_con_datos):
+    fecha = (datetime.now().date() + timedelta(days=5)).isoformat()
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.executemany("INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                         "VALUES (?, ?, ?, ?, ?)",
+                         [(1, 1, "Conferencia de Química", "M", fecha),
+                          (2, 2, "Taller de Python", "V", fecha),
+                          (2, 3, "Examen 100%_final", "N", fecha)])
+    return base_con_datos
+
+
+def _sin_fts5():
+    """Deja la base como la migra un SQLite sin FTS5: sin tabla Busqueda ni sus triggers."""
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        for nombre, _, _ in Evidencia_Tres._TRIGGERS_BUSQUEDA:
+            conn.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+        conn.execute("DROP TABLE Busqueda")
+
+
+def _eventos(filas):
+    return sorted(fila[6] for fila in filas)
+
+
+def test_fts5_sin_acentos_y_por_prefijo(base_busqueda):
+    assert _eventos(Evidencia_Tres.buscar_reservaciones("quimica")) == ["Conferencia de Química"]
+    assert _eventos(Evidencia_Tres.buscar_reservaciones("PYTH")) == ["Taller de Python"]
+    assert _eventos(Evidencia_Tres.buscar_reservaciones("luis")) == ["Examen 100%_final", "Taller de Python"]
+    assert _eventos(Evidencia_Tres.buscar_reservaciones("sala azul")) == ["Conferencia de Química"]
+    assert Evidencia_Tres.buscar_reservaciones("   ") == []
+
+
+def test_fts5_sigue_los_cambios_y_el_archivo(base_busqueda):
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.execute("UPDATE Salas SET nombre = 'Laboratorio' WHERE clave = 2")
+        conn.execute("UPDATE Reservaciones SET fecha = '2000-01-01' WHERE nombre = 'Taller de Python'")
+    assert _eventos(Evidencia_Tres.buscar_reservaciones("laboratorio")) == ["Taller de Python"]
+    Evidencia_Tres.archivar_reservaciones("2001-01-01")
+    assert _eventos(Evidencia_Tres.buscar_reservaciones("taller")) == ["Taller de Python"]
+
+
+def test_sin_fts5_usa_like(base_busqueda):
+    _sin_fts5()
+    assert _eventos(Evidencia_Tres.buscar_reservaciones("python")) == ["Taller de Python"]
+    assert _eventos(Evidencia_Tres.buscar_reservaciones("Luis")) == ["Examen 100%_final", "Taller de Python"]
+    # los comodines de LIKE se buscan como texto
+    assert _eventos(Evidencia_Tres.buscar_reservaciones("100%_")) == ["Examen 100%_final"]
+    assert _eventos(Evidencia_Tres.buscar_reservaciones("%")) == ["Examen 100%_final"]
+
+
+def _version():
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_sin_fts5_la_version_no_avanza_y_se_reintenta(base_vacia, monkeypatch):
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.execute("PRAGMA user_version = 0")
+    with monkeypatch.context() as m:
+        m.setattr(Evidencia_Tres, "_MIGRACIONES", tuple(
+            (lambda cursor: False) if paso is Evidencia_Tres._migracion_v5 else paso
+            for paso in Evidencia_Tres._MIGRACIONES))
+        assert Evidencia_Tres.preparar_base() is True
+        assert _version() == 4
+    assert Evidencia_Tres.preparar_base() is True
+    assert _version() == Evidencia_Tres.ESQUEMA_VERSION
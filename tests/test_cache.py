@@ -0,0 +1,155 @@
+# encoding: utf-8
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+import Evidencia_Tres
+from cache import CacheLRU
+
+
+def _fecha(dias):
+    return (datetime.now().date() + timedelta(days=dias)).strftime("%d/%m/%Y")
+
+
+def _iso(dias):
+    return (datetime.now().date() + timedelta(days=dias)).isoformat()
+
+
+def _contador():
+    llamadas = []
+
+    def calcular(valor):
+        def f():
+            llamadas.append(valor)
+            return valor
+        return f
+    return llamadas, calcular
+
+
+def test_aciertos_y_fallos():
+    cache = CacheLRU(maximo=4)
+    llamadas, calcular = _contador()
+    assert cache.obtener("a", calcular(1)) == 1
+    assert cache.obtener("a", calcular(2)) == 1
+    assert cache.obtener("b", calcular(3)) == 3
+    assert llamadas == [1, 3]
+    stats = cache.estadisticas()
+    assert (stats["aciertos"], stats["fallos"], stats["entradas"]) == (1, 2, 2)
+    assert stats["tasa_aciertos"] == pytest.approx(1 / 3)
+
+
+def test_desaloja_la_menos_usada():
+    cache = CacheLRU(maximo=2)
+    llamadas, calcular = _contador()
+    cache.obtener("a", calcular("a"))
+    cache.obtener("b", calcular("b"))
+    cache.obtener("a", calcular("a"))      # "b" queda como la menos usada
+    cache.obtener("c", calcular("c"))
+    assert cache.estadisticas()["desalojos"] == 1
+    cache.obtener("a", calcular("a"))
+    cache.obtener("b", calcular("b"))      # se había desalojado: se vuelve a calcular
+    assert llamadas == ["a", "b", "c", "b"]
+
+
+def test_invalidar_por_clave_y_por_condicion():
+    cache = CacheLRU()
+    llamadas, calcular = _contador()
+    for clave in (("x", 1), ("x", 2), ("y", 1)):
+        cache.obtener(clave, calcular(clave))
+    cache.invalidar(("x", 1))
+    cache.invalidar_si(lambda c: c[0] == "y")
+    for clave in (("x", 1), ("x", 2), ("y", 1)):
+        cache.obtener(clave, calcular(clave))
+    assert llamadas == [("x", 1), ("x", 2), ("y", 1), ("x", 1), ("y", 1)]
+    cache.limpiar()
+    assert cache.estadisticas()["entradas"] == 0
+
+
+def test_no_guarda_un_valor_calculado_durante_una_invalidacion():
+    cache = CacheLRU()
+
+    def calcular_mientras_escriben():
+        cache.invalidar("otra")  # una escritura termina mientras se calcula
+        return "viejo"
+
+    assert cache.obtener("k", calcular_mientras_escriben) == "viejo"
+    assert cache.obtener("k", lambda: "nuevo") == "nuevo"
+    assert cache.obtener("k", lambda: "otro") == "nuevo"
+
+
+def _insertar_sin_invalidar(fila):
+    with sqlite3.connect(Evidencia_Tres.DB_FILE) as conn:
+        conn.execute("INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                     "VALUES (?, ?, ?, ?, ?)", fila)
+
+
+def _responder(monkeypatch, *respuestas):
+    respuestas = iter(respuestas)
+    monkeypatch.setattr("builtins.input", lambda _: next(respuestas))
+
+
+def test_las_consultas_se_sirven_de_la_cache(base_con_datos):
+    libres = Evidencia_Tres.disponibilidad_por_fecha(_iso(5))
+    assert Evidencia_Tres.reservaciones_por_fecha(_iso(5)) == []
+    assert Evidencia_Tres.disponibilidad_por_fecha(_iso(5)) == libres
+    assert Evidencia_Tres.reservaciones_por_fecha(_iso(5)) == []
+    assert Evidencia_Tres.estadisticas_cache()["aciertos"] >= 2
+
+
+def test_escrituras_de_otra_conexion_o_proceso_vacian_la_cache(base_con_datos):
+    libres = Evidencia_Tres.disponibilidad_por_fecha(_iso(5))
+    assert Evidencia_Tres.reservaciones_por_fecha(_iso(5)) == []
+    _insertar_sin_invalidar((1, 1, "Por fuera", "M", _iso(5)))  # sin pasar por las funciones que escriben
+    assert Evidencia_Tres.disponibilidad_por_fecha(_iso(5)) == [e for e in libres if e != (1, "Sala Azul", "M")]
+    assert [r[6] for r in Evidencia_Tres.reservaciones_por_fecha(_iso(5))] == ["Por fuera"]
+
+    codigo = ("import sqlite3, sys\n"
+              "with sqlite3.connect(sys.argv[1]) as conn:\n"
+              "    conn.execute(\"INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+              "VALUES (2, 2, 'Otro proceso', 'N', ?)\", (sys.argv[2],))\n")
+    subprocess.run([sys.executable, "-c", codigo, Evidencia_Tres.DB_FILE, _iso(5)], check=True)
+    assert (2, "Sala Roja", "N") not in Evidencia_Tres.disponibilidad_por_fecha(_iso(5))
+    assert len(Evidencia_Tres.reservaciones_por_fecha(_iso(5))) == 2
+
+
+def test_reservar_y_eliminar_invalidan_la_fecha(base_con_datos, monkeypatch):
+    libres = Evidencia_Tres.disponibilidad_por_fecha(_iso(5))
+    otra_fecha = Evidencia_Tres.disponibilidad_por_fecha(_iso(6))
+    assert Evidencia_Tres.reservaciones_por_fecha(_iso(5)) == []
+
+    [(estado, folio)] = Evidencia_Tres.registrar_reservaciones_lote([(1, 1, "Clase", "M", _fecha(5))])
+    assert estado == Evidencia_Tres.ACEPTADA
+    assert (1, "Sala Azul", "M") not in Evidencia_Tres.disponibilidad_por_fecha(_iso(5))
+    assert [r[0] for r in Evidencia_Tres.reservaciones_por_fecha(_iso(5))] == [folio]
+    assert Evidencia_Tres.disponibilidad_por_fecha(_iso(6)) == otra_fecha
+
+    _responder(monkeypatch, str(folio), "S")
+    Evidencia_Tres.eliminar_reservacion()
+    assert Evidencia_Tres.disponibilidad_por_fecha(_iso(5)) == libres
+    assert Evidencia_Tres.reservaciones_por_fecha(_iso(5)) == []
+
+
+def test_una_sala_nueva_invalida_catalogo_y_disponibilidad(base_con_datos, monkeypatch):
+    assert len(Evidencia_Tres.listar_salas()) == 3
+    libres = Evidencia_Tres.disponibilidad_por_fecha(_iso(5))
+    _responder(monkeypatch, "Sala Nueva", "30")
+    Evidencia_Tres.Registrar_Sala()
+    assert [s[1] for s in Evidencia_Tres.listar_salas()] == ["Sala Azul", "Sala Roja", "Auditorio", "Sala Nueva"]
+    nuevas = [(c, n, t) for c, n, t in Evidencia_Tres.disponibilidad_por_fecha(_iso(5)) if n == "Sala Nueva"]
+    assert len(nuevas) == len(Evidencia_Tres.TURNOS)
+    assert len(Evidencia_Tres.disponibilidad_por_fecha(_iso(5))) == len(libres) + len(Evidencia_Tres.TURNOS)
+
+
+def test_funciones_sin_menu_tambien_invalidan(base_con_datos):
+    Evidencia_Tres.disponibilidad_por_fecha(_iso(5))
+    Evidencia_Tres.listar_salas()
+    clave = Evidencia_Tres.agregar_sala("Sala Extra", 5)
+    assert Evidencia_Tres.listar_salas()[-1] == (clave, "Sala Extra", 5)
+    [(_, folio)] = Evidencia_Tres.registrar_reservaciones_lote([(1, clave, "Clase", "N", _fecha(5))])
+    assert (clave, "Sala Extra", "N") not in Evidencia_Tres.disponibilidad_por_fecha(_iso(5))
+    Evidencia_Tres.cancelar_reservacion(folio)
+    assert (clave, "Sala Extra", "N") in Evidencia_Tres.disponibilidad_por_fecha(_iso(5))
+    assert Evidencia_Tres.reservaciones_por_fecha(_iso(5)) == []
@@ -0,0 +1,83 @@
+# encoding: utf-8
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import catalogo  # noqa: E402
+
+
+def test_semantica_de_dict_con_precios_decimales():
+    productos = catalogo.CatalogoPrecios({"manzana": 10, "pan": 15.5})
+    productos["leche"] = 19.99
+    productos.actualizar(["pan", "huevo", "pan"], [16.25, 20, 17.75])
+    assert productos["leche"] == 19.99
+    assert dict(productos.items()) == {"manzana": 10.0, "pan": 17.75, "leche": 19.99, "huevo": 20.0}
+    assert "huevo" in productos and "queso" not in productos
+    assert productos.get("queso", 0) == 0
+    with pytest.raises(KeyError):
+        productos["queso"]
+
+
+def test_aumento_sobre_la_columna_con_el_dtype_por_omision():
+    productos = catalogo.CatalogoPrecios({"a": 10, "b": 19.99})
+    productos.precios[:] *= 1.1
+    assert productos["a"] == pytest.approx(11.0)
+    assert productos["b"] == pytest.approx(21.989)
+
+
+def test_columna_entera_rechaza_decimales_sin_truncar():
+    productos = catalogo.CatalogoPrecios({"a": 10}, dtype="int64")
+    productos["b"] = 20.0
+    for operacion in (lambda: productos.__setitem__("c", 19.99),
+                      lambda: productos.actualizar(["a"], [1.5]),
+                      lambda: productos.actualizar(["a"], [float("nan")])):
+        with pytest.raises(ValueError):
+            operacion()
+    assert dict(productos.items()) == {"a": 10, "b": 20}
+
+
+def test_update_vacio_y_generadores():
+    productos = catalogo.CatalogoPrecios()
+    productos.update(())
+    productos.update(iter([]))
+    productos.update((f"p{i}", i * 0.5) for i in range(3))
+    assert len(productos) == 3 and productos["p2"] == 1.0
+
+
+def test_muchos_productos_y_reindexado(monkeypatch):
+    monkeypatch.setattr(catalogo, "MINIMO_PENDIENTES", 16)
+    nombres = [f"producto {i}" for i in range(1000)]
+    productos = catalogo.CatalogoPrecios(zip(nombres, range(1000)))
+    assert list(productos.keys()) == nombres
+    assert productos.consultar(["producto 999", "producto 0"]).tolist() == [999.0, 0.0]
+    assert productos.posiciones(["producto 5", "no existe"]).tolist() == [5, -1]
+
+
+def test_guardar_y_abrir(tmp_path):
+    ruta = str(tmp_path / "precios.cat")
+    productos = catalogo.CatalogoPrecios({"manzana": 10, "piña": 32.5})
+    productos.guardar(ruta)
+    abierto = catalogo.CatalogoPrecios.abrir(ruta, "r+")
+    assert dict(abierto.items()) == {"manzana": 10.0, "piña": 32.5}
+    abierto["manzana"] = 11.5
+    abierto.sincronizar(ruta)
+    assert catalogo.CatalogoPrecios.abrir(ruta)["manzana"] == 11.5
+
+
+def test_cargar_csv_en_columna_entera(tmp_path):
+    ruta = tmp_path / "precios.csv"
+    ruta.write_text("a,10\nb,19.99\n", encoding="utf-8")
+    assert catalogo.cargar_csv(catalogo.CatalogoPrecios(), str(ruta)) == 2
+    with pytest.raises(ValueError):
+        catalogo.cargar_csv(catalogo.CatalogoPrecios(dtype="int64"), str(ruta))
+
+
+def test_cargar_csv_omite_el_encabezado(tmp_path):
+    ruta = tmp_path / "precios.csv"
+    ruta.write_text("clave,precio\na,10\nb,2.5\n", encoding="utf-8")
+    productos = catalogo.CatalogoPrecios()
+    assert catalogo.cargar_csv(productos, str(ruta)) == 2
+    assert dict(productos.items()) == {"a": 10.0, "b": 2.5}
+    ruta.write_text("a,10\nprecio,x\n", encoding="utf-8")  # sólo la primera fila puede ser encabezado
+    with pytest.raises(ValueError):
+        catalogo.cargar_csv(catalogo.CatalogoPrecios(), str(ruta))
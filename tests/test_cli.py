@@ -0,0 +1,97 @@
+# encoding: utf-8
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import cli
+import conexiones
+import Evidencia_Tres
+from conftest import RAIZ
+
+
+def _fecha(dias):
+    return (datetime.now().date() + timedelta(days=dias)).strftime("%d/%m/%Y")
+
+
+def _salida(capsys):
+    return capsys.readouterr().out.splitlines()
+
+
+def test_reservar_y_conflicto(base_con_datos, capsys):
+    assert cli.main(["reservar", "1", "1", "Clase", "m", _fecha(5)]) == 0
+    assert _salida(capsys) == ["Folio asignado: 1"]
+    assert cli.main(["reservar", "2", "1", "Otra", "M", _fecha(5)]) == 1
+    assert _salida(capsys)[0].startswith(Evidencia_Tres.CONFLICTO)
+    assert cli.main(["reservar", "1", "1", "Pronto", "M", _fecha(1)]) == 1
+    assert _salida(capsys)[0].startswith(Evidencia_Tres.INVALIDA)
+
+
+def test_disponibilidad_de_una_fecha_y_de_un_rango(base_con_datos, capsys):
+    cli.main(["reservar", "1", "1", "Clase", "M", _fecha(5)])
+    capsys.readouterr()
+    assert cli.main(["disponibilidad", _fecha(5)]) == 0
+    libres = _salida(capsys)[1:]
+    assert len(libres) == 3 * len(Evidencia_Tres.TURNOS) - 1
+    assert "1\tSala Azul\tM" not in libres
+
+    assert cli.main(["disponibilidad", _fecha(4), "--hasta", _fecha(5), "--capacidad", "20"]) == 0
+    libres = _salida(capsys)[1:]
+    assert len(libres) == 2 * 2 * len(Evidencia_Tres.TURNOS)
+    assert not [l for l in libres if l.startswith("1\t")]
+
+
+def test_lote_sigue_tras_una_linea_invalida(base_con_datos, tmp_path, capsys):
+    lote = tmp_path / "comandos.txt"
+    lote.write_text("\n".join([
+        "# comentario",
+        f"reservar 1 1 Clase M {_fecha(5)}",
+        "reservar uno 1 Clase M",
+        f"lote {lote}",
+        f"--db otra.db reservar 1 2 Clase M {_fecha(5)}",
+        f"--tiempos reservar 1 2 Clase M {_fecha(5)}",
+        f"--perfil --traza t.json reservar 1 2 Clase M {_fecha(5)}",
+        "",
+        f"reservar 2 3 Taller N {_fecha(6)}",
+    ]), encoding="utf-8")
+    assert cli.main(["lote", str(lote)]) == 1
+    salida = _salida(capsys)
+    assert salida[0] == "Folio asignado: 1"
+    assert salida[1].startswith("Línea 3: comando inválido")
+    assert salida[2] == "Línea 4: no se permite 'lote' dentro de un lote."
+    assert salida[3] == "Línea 5: no se permiten opciones globales dentro de un lote: --db."
+    assert salida[4] == "Línea 6: no se permiten opciones globales dentro de un lote: --tiempos."
+    assert salida[5] == "Línea 7: no se permiten opciones globales dentro de un lote: --perfil, --traza."
+    assert salida[6] == "Folio asignado: 2"
+    assert not os.path.exists("otra.db")
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM Reservaciones").fetchone()[0] == 2
+
+
+def test_salida_cortada_termina_sin_traceback(base_con_datos):
+    conexiones.cerrar_todas()
+    proceso = subprocess.Popen(
+        [sys.executable, os.path.join(RAIZ, "cli.py"), "--db", str(base_con_datos),
+         "disponibilidad", _fecha(3), "--hasta", _fecha(2000)],
+        cwd=RAIZ, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert proceso.stdout.readline().startswith(b"Clave")
+    proceso.stdout.close()
+    errores = proceso.stderr.read().decode("utf-8")
+    proceso.wait(timeout=30)
+    proceso.stderr.close()
+    assert "Traceback" not in errores and "BrokenPipeError" not in errores
+
+
+def test_reporte_de_un_rango_por_paginas(base_con_datos, capsys):
+    for dias, sala in ((4, 1), (5, 2), (5, 3), (7, 3)):
+        cli.main(["reservar", "1", str(sala), "Clase", "V", _fecha(dias)])
+    capsys.readouterr()
+    assert cli.main(["reporte", _fecha(4), "--hasta", _fecha(5), "--pagina", "2"]) == 0
+    salida = _salida(capsys)
+    assert salida[0] == "\t".join(Evidencia_Tres.ENCABEZADOS)
+    hoy = datetime.now().date()
+    assert [(l.split("\t")[5], l.split("\t")[2]) for l in salida[1:]] == [
+        ((hoy + timedelta(days=4)).isoformat(), "1"), ((hoy + timedelta(days=5)).isoformat(), "2"),
+        ((hoy + timedelta(days=5)).isoformat(), "3")]
+    assert cli.main(["reporte", _fecha(6)]) == 0
+    assert _salida(capsys) == ["No hay reservaciones para esa fecha."]
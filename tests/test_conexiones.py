@@ -0,0 +1,82 @@
+# encoding: utf-8
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import conexiones
+import Evidencia_Tres
+
+
+def test_pool_reutiliza_y_revierte(tmp_path):
+    ruta = str(tmp_path / "pool.db")
+    with conexiones.conexion(ruta) as conn:
+        conn.execute("CREATE TABLE t (x)")
+    pool = conexiones.obtener_pool(ruta)
+    with pytest.raises(ZeroDivisionError):
+        with conexiones.conexion(ruta) as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            1 / 0
+    with conexiones.conexion(ruta) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    assert pool._creadas == 1
+    conexiones.cerrar_todas()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requiere os.fork")
+def test_hijo_no_finaliza_las_conexiones_del_padre(tmp_path):
+    ruta = str(tmp_path / "fork.db")
+    with conexiones.conexion(ruta) as conn:
+        conn.execute("CREATE TABLE t (x)")
+    padre = conexiones.obtener_pool(ruta)
+    en_uso = padre.tomar()  # checada por otro "hilo" del padre al momento del fork
+    pid = os.fork()
+    if pid == 0:
+        codigo = 1
+        try:
+            import gc
+            gc.collect()
+            if padre in conexiones._heredados and conexiones.obtener_pool(ruta) is not padre:
+                with conexiones.conexion(ruta) as conn:
+                    conn.execute("INSERT INTO t VALUES (1)")
+                codigo = 0
+        finally:
+            os._exit(codigo)
+    assert os.waitpid(pid, 0)[1] == 0
+    assert en_uso in padre._abiertas
+    en_uso.execute("INSERT INTO t VALUES (2)")
+    en_uso.commit()
+    padre.devolver(en_uso)
+    with sqlite3.connect(ruta) as conn:
+        assert sorted(x for x, in conn.execute("SELECT x FROM t")) == [1, 2]
+    conexiones.cerrar_todas()
+
+
+def test_pool_agotado_lanza_error_en_lugar_de_esperar_siempre(tmp_path):
+    pool = conexiones.PoolConexiones(str(tmp_path / "agotado.db"), tamano=1, espera=0.05)
+    conn = pool.tomar()
+    with pytest.raises(conexiones.PoolAgotado):
+        pool.tomar()
+    pool.devolver(conn)
+    assert pool.tomar() is conn
+    conn.close()
+
+
+def test_eliminar_reservacion_con_una_sola_conexion(base_con_datos, monkeypatch, capsys):
+    fecha = (datetime.now().date() + timedelta(days=10)).isoformat()
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.execute("INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                     "VALUES (1, 1, 'Clase', 'M', ?)", (fecha,))
+    conexiones.cerrar_todas()
+    pool = conexiones.obtener_pool(Evidencia_Tres.DB_FILE)
+    pool.tamano, pool.espera = 1, 2
+    respuestas = iter(["1", "S"])
+    monkeypatch.setattr("builtins.input", lambda _: next(respuestas))
+
+    Evidencia_Tres.eliminar_reservacion()
+    assert "eliminada exitosamente" in capsys.readouterr().out
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM Reservaciones").fetchone()[0] == 0
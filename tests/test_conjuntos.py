@@ -0,0 +1,84 @@
+# encoding: utf-8
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import conjuntos  # noqa: E402
+
+
+@pytest.fixture(params=["ordenado", "bitmap", "auto"])
+def respaldo(request):
+    return request.param
+
+
+def _muestras(semilla):
+    rnd = random.Random(semilla)
+    a = {rnd.randrange(-50, 500) for _ in range(300)}
+    b = {rnd.randrange(0, 800) for _ in range(300)}
+    return a, b
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_operaciones_como_set(respaldo, semilla):
+    a, b = _muestras(semilla)
+    ca, cb = conjuntos.crear(a, respaldo), conjuntos.crear(b, respaldo)
+    assert set(ca.union(cb)) == a | b
+    assert set(ca.intersection(cb)) == a & b
+    assert set(ca.difference(cb)) == a - b
+    assert set(ca.symmetric_difference(cb)) == a ^ b
+    assert len(ca) == len(a)
+    assert all(x in ca for x in a) and 10 ** 6 not in ca
+    assert ca.issubset(ca.union(cb)) and ca.union(cb).issuperset(cb)
+    assert ca.isdisjoint(conjuntos.crear([10 ** 6], respaldo))
+
+
+def test_actualizaciones_en_sitio(respaldo):
+    a, b = _muestras(9)
+    c = conjuntos.crear(a, respaldo)
+    c.update(conjuntos.crear(b, respaldo))
+    c.difference_update(conjuntos.crear(range(100), respaldo))
+    c.add(-7)
+    c.discard(-7)
+    c.add(10 ** 4)
+    assert set(c) == ((a | b) - set(range(100))) | {10 ** 4}
+    with pytest.raises(KeyError):
+        c.remove(-12345)
+
+
+def test_bitmap_no_crece_por_un_valor_lejano_del_otro_conjunto():
+    bitmap = conjuntos.ConjuntoBitmap(range(1000))
+    for otro in (conjuntos.ConjuntoOrdenado([5, 10 ** 10]), [5, -10 ** 10, 10 ** 10],
+                 conjuntos.ConjuntoBitmap([5, 10 ** 7])):
+        interseccion = bitmap.intersection(otro)
+        diferencia = bitmap.difference(otro)
+        assert set(interseccion) == {5} and interseccion.bits.nbytes == bitmap.bits.nbytes
+        assert set(diferencia) == set(range(1000)) - {5} and diferencia.bits.nbytes == bitmap.bits.nbytes
+        assert not bitmap.issuperset(otro) and not bitmap.issubset(otro)
+    assert bitmap.issuperset(conjuntos.ConjuntoOrdenado([0, 999]))
+    copia = bitmap.copy()
+    copia &= [3, 4, 10 ** 10]
+    assert set(copia) == {3, 4} and copia.bits.nbytes == bitmap.bits.nbytes
+
+
+def test_combinar_por_bloques_pequenos():
+    a, b = _muestras(3)
+    ordenado_a = np.array(sorted(a), dtype=np.int64)
+    ordenado_b = np.array(sorted(b), dtype=np.int64)
+    for operacion, esperado in (("union", a | b), ("interseccion", a & b),
+                                ("diferencia", a - b), ("diferencia_simetrica", a ^ b)):
+        bloques = conjuntos.combinar_por_bloques(ordenado_a, ordenado_b, operacion, tamano_bloque=16)
+        resultado = np.concatenate(list(bloques)).tolist()
+        assert resultado == sorted(esperado)
+
+
+def test_operar_archivos_con_ids_de_texto(tmp_path):
+    a, b = _muestras(4)
+    ruta_a, ruta_b, salida = tmp_path / "a.txt", tmp_path / "b.txt", tmp_path / "salida.txt"
+    ruta_a.write_text("\n".join(f"A{x:05d}" for x in a) + "\n\n", encoding="utf-8")
+    ruta_b.write_text("\n".join(f"A{x:05d}" for x in b), encoding="utf-8")
+    total = conjuntos.operar_archivos(str(ruta_a), str(ruta_b), "interseccion", str(salida),
+                                      tamano_bloque=32, convertir=lambda texto: int(texto[1:]))
+    assert total == len(a & b)
+    assert [int(x) for x in salida.read_text(encoding="utf-8").split()] == sorted(a & b)
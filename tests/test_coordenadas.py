@@ -0,0 +1,45 @@
+# encoding: utf-8
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import coordenadas  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def puntos():
+    rng = np.random.default_rng(3)
+    latitudes = np.concatenate((rng.uniform(-90, 90, 4000), rng.normal(19.4, 0.2, 1000)))
+    longitudes = np.concatenate((rng.uniform(-180, 180, 4000), rng.normal(-99.1, 0.2, 1000)))
+    return np.clip(latitudes, -90, 90), longitudes
+
+
+@pytest.mark.parametrize("caja", [
+    (10, -20, 30, 40),
+    (19.0, -99.5, 19.8, -98.7),
+    (-40, 170, 40, -170),        # cruza el antimeridiano
+    (-10, 179.9, 10, 179.8),     # casi todo el globo, también cruzando
+    (-90, -180, 90, 180),
+    (50, 0, 40, 10),             # vacía
+])
+def test_en_caja_igual_al_recorrido(puntos, caja):
+    latitudes, longitudes = puntos
+    indice = coordenadas.IndiceCuadricula(latitudes, longitudes)
+    esperado = np.flatnonzero(coordenadas._en_caja(latitudes, longitudes, *caja)) if caja[0] <= caja[2] else []
+    assert indice.en_caja(*caja).tolist() == list(esperado)
+
+
+@pytest.mark.parametrize("punto", [(19.4, -99.1), (0, 179.99), (89.9, 10), (-89.9, -170), (45, -0.01)])
+def test_mas_cercano_igual_al_recorrido(puntos, punto):
+    latitudes, longitudes = puntos
+    indice = coordenadas.IndiceCuadricula(latitudes, longitudes, tamano_celda=2.0)
+    _, distancia = indice.mas_cercano(*punto)
+    assert distancia == pytest.approx(float(coordenadas.haversine_km(*punto, latitudes, longitudes).min()))
+
+
+def test_clasificar_como_la_version_por_tupla(puntos):
+    latitudes, longitudes = puntos
+    codigos = coordenadas.clasificar(latitudes, longitudes)
+    for lat, lon, codigo in zip(latitudes[:200].tolist(), longitudes[:200].tolist(), codigos[:200].tolist()):
+        norte_sur, oriente_occidente = coordenadas.hemisferios_tupla((lat, lon))
+        assert coordenadas.CUADRANTES[codigo] == f"{norte_sur.split()[1]}-{oriente_occidente.split()[1]}"
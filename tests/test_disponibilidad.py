@@ -0,0 +1,72 @@
+# encoding: utf-8
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import Evidencia_Tres
+
+
+def _iso(dias):
+    return (datetime.now().date() + timedelta(days=dias)).isoformat()
+
+
+def _insertar(filas):
+    """Inserta (cliente, sala, nombre, horario, fecha_iso) directo en Reservaciones."""
+    with sqlite3.connect(Evidencia_Tres.DB_FILE) as conn:
+        conn.executemany("INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                         "VALUES (?, ?, ?, ?, ?)", filas)
+
+
+def _disponibilidad_por_bucle(fecha_iso):
+    """La consulta anterior: un SELECT por cada sala y turno, en Reservaciones y en el archivo."""
+    disponibles = []
+    with sqlite3.connect(Evidencia_Tres.DB_FILE) as conn:
+        mi_cursor = conn.cursor()
+        mi_cursor.execute("SELECT clave, nombre FROM Salas ORDER BY clave")
+        for sala_clave, sala_nombre in mi_cursor.fetchall():
+            for t in Evidencia_Tres.TURNOS:
+                ocupado = False
+                for tabla in ("Reservaciones", "ReservacionesArchivo"):
+                    mi_cursor.execute(
+                        f"SELECT 1 FROM {tabla} WHERE sala_clave = ? AND fecha = ? AND horario = ? LIMIT 1",
+                        (sala_clave, fecha_iso, t))
+                    ocupado = ocupado or mi_cursor.fetchone() is not None
+                if not ocupado:
+                    disponibles.append((sala_clave, sala_nombre, t))
+    return disponibles
+
+
+@pytest.fixture
+def base_ocupada(base_con_datos):
+    _insertar([(1, 1, "Clase", "M", _iso(5)), (2, 1, "Taller", "N", _iso(5)), (1, 3, "Junta", "V", _iso(5)),
+               (1, 2, "Clase", "M", _iso(6)), (2, 2, "Clase", "V", _iso(6)), (1, 2, "Clase", "N", _iso(6))])
+    return base_con_datos
+
+
+@pytest.mark.parametrize("dias", [4, 5, 6])
+def test_anti_join_igual_al_bucle_por_sala_y_turno(base_ocupada, dias):
+    assert Evidencia_Tres.disponibilidad_por_fecha(_iso(dias)) == _disponibilidad_por_bucle(_iso(dias))
+
+
+def test_espacios_ocupados_no_aparecen(base_ocupada):
+    libres = Evidencia_Tres.disponibilidad_por_fecha(_iso(6))
+    assert len(libres) == 3 * len(Evidencia_Tres.TURNOS) - 3
+    assert not [c for c, _, _ in libres if c == 2]
+
+
+def test_sin_salas_no_hay_disponibilidad(base_vacia):
+    assert Evidencia_Tres.disponibilidad_por_fecha(_iso(5)) == []
+    assert _disponibilidad_por_bucle(_iso(5)) == []
+
+
+def test_espacios_archivados_siguen_ocupados(base_con_datos):
+    _insertar([(1, 1, "Pasado", "M", _iso(-400)), (1, 2, "Pasado", "N", _iso(-400))])
+    antes = Evidencia_Tres.disponibilidad_por_fecha(_iso(-400))
+    Evidencia_Tres.limpiar_cache()
+    assert Evidencia_Tres.archivar_reservaciones(_iso(-1)) == 2
+
+    despues = Evidencia_Tres.disponibilidad_por_fecha(_iso(-400))
+    assert despues == antes == _disponibilidad_por_bucle(_iso(-400))
+    assert (1, "Sala Azul", "M") not in despues and (2, "Sala Roja", "N") not in despues
+    assert len(despues) == 3 * len(Evidencia_Tres.TURNOS) - 2
@@ -0,0 +1,118 @@
+# encoding: utf-8
+import random
+import sqlite3
+
+import pytest
+
+import conexiones
+import Evidencia_Tres
+
+
+def _version(ruta):
+    with sqlite3.connect(ruta) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+class _ConexionTrazada(sqlite3.Connection):
+    sentencias = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(self.sentencias.append)
+
+
+@pytest.fixture
+def trazar_sql(monkeypatch):
+    """Registra cada sentencia que ejecutan las conexiones que se abran a partir de aquí."""
+    conexiones.cerrar_todas()
+    _ConexionTrazada.sentencias = []
+    monkeypatch.setattr(conexiones, "FABRICA_CONEXION", _ConexionTrazada)
+    return _ConexionTrazada.sentencias
+
+
+def _ddl(sentencias):
+    return [s for s in sentencias if s.lstrip().upper().startswith(("CREATE", "DROP", "ALTER"))]
+
+
+def test_base_nueva_queda_en_la_version_actual(base_vacia):
+    assert _version(base_vacia) == Evidencia_Tres.ESQUEMA_VERSION
+
+
+def test_segundo_preparar_base_no_ejecuta_ddl(base_vacia, trazar_sql):
+    assert Evidencia_Tres.preparar_base() is False
+    assert trazar_sql and not _ddl(trazar_sql)
+
+
+def test_duplicados_no_detienen_la_version(base_34, trazar_sql, capsys):
+    # 34.db trae dos reservaciones en la sala 5, 2025-10-30, turno N
+    assert Evidencia_Tres.preparar_base() is True
+    assert _version(base_34) == Evidencia_Tres.ESQUEMA_VERSION
+    assert "duplicadas" in capsys.readouterr().out
+    assert _ddl(trazar_sql)
+
+    trazar_sql.clear()
+    assert Evidencia_Tres.preparar_base() is False
+    assert not _ddl(trazar_sql)
+    assert "duplicadas" not in capsys.readouterr().out
+
+
+def test_34db_migrada_tiene_ocupacion_y_busqueda(base_34):
+    Evidencia_Tres.preparar_base()
+    with sqlite3.connect(base_34) as conn:
+        reservaciones = conn.execute("SELECT COUNT(*) FROM Reservaciones").fetchone()[0]
+        assert conn.execute("SELECT SUM(reservadas) FROM OcupacionDiaria").fetchone()[0] == reservaciones
+        assert conn.execute("SELECT SUM(reservadas) FROM OcupacionMensual").fetchone()[0] == reservaciones
+        assert conn.execute("SELECT COUNT(*) FROM Busqueda").fetchone()[0] == reservaciones
+
+
+def _tablas_de_ocupacion():
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        return [sorted(conn.execute(f"SELECT * FROM {tabla} WHERE reservadas > 0").fetchall())
+                for tabla in ("OcupacionDiaria", "OcupacionMensual")]
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_reconstruir_ocupacion_coincide_con_los_triggers(base_con_datos, semilla):
+    rnd = random.Random(semilla)
+    fechas = [f"2020-0{m}-{d:02d}" for m in (1, 2) for d in (3, 17, 28)] + ["2030-05-05", "2030-06-06"]
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        for _ in range(300):
+            folios = [f for f, in conn.execute("SELECT folio FROM Reservaciones")]
+            accion = rnd.random()
+            if accion < 0.55 or not folios:
+                conn.execute("INSERT OR IGNORE INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                             "VALUES (?, ?, 'Evento', ?, ?)",
+                             (rnd.choice((1, 2)), rnd.choice((1, 2, 3)), rnd.choice(Evidencia_Tres.TURNOS),
+                              rnd.choice(fechas)))
+            elif accion < 0.85:
+                columna, valor = rnd.choice((("fecha", rnd.choice(fechas)), ("sala_clave", rnd.choice((1, 2, 3))),
+                                             ("horario", rnd.choice(Evidencia_Tres.TURNOS))))
+                conn.execute(f"UPDATE OR IGNORE Reservaciones SET {columna} = ? WHERE folio = ?",
+                             (valor, rnd.choice(folios)))
+            else:
+                conn.execute("DELETE FROM Reservaciones WHERE folio = ?", (rnd.choice(folios),))
+    assert Evidencia_Tres.archivar_reservaciones("2020-02-15", tamano_lote=4) > 0
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.execute("DELETE FROM ReservacionesArchivo WHERE folio IN "
+                     "(SELECT folio FROM ReservacionesArchivo ORDER BY folio LIMIT 2)")
+
+    incrementales = _tablas_de_ocupacion()
+    Evidencia_Tres.reconstruir_ocupacion()
+    assert _tablas_de_ocupacion() == incrementales
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        total = conn.execute("SELECT (SELECT COUNT(*) FROM Reservaciones)"
+                             " + (SELECT COUNT(*) FROM ReservacionesArchivo)").fetchone()[0]
+    assert sum(fila[-1] for fila in incrementales[0]) == sum(fila[-1] for fila in incrementales[1]) == total
+
+
+def test_restriccion_unica_pendiente_se_completa(base_34, capsys):
+    Evidencia_Tres.preparar_base()
+    assert Evidencia_Tres.completar_restriccion_unica() == [("2025-10-30", 5, "N", 2)]
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.execute("DELETE FROM Reservaciones WHERE folio = (SELECT MAX(folio) FROM Reservaciones "
+                     "WHERE fecha = '2025-10-30' AND sala_clave = 5 AND horario = 'N')")
+    assert Evidencia_Tres.mantenimiento_base() == []
+    with sqlite3.connect(base_34) as conn:
+        indices = {fila[0] for fila in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "ux_reservaciones_espacio" in indices and "ix_reservaciones_espacio" not in indices
+    assert Evidencia_Tres.completar_restriccion_unica() == []
@@ -0,0 +1,73 @@
+# encoding: utf-8
+import csv
+from datetime import datetime, timedelta
+
+import pytest
+
+import conexiones
+import Evidencia_Tres
+
+FILAS = [
+    (1, "Mónica Núñez", 1, "Sala Azul", "M", "2030-03-01", "Taller, parte 1"),
+    (2, "Luis", 2, "Sala Roja", "N", "2030-03-02", 'Junta "anual"\tde año'),
+]
+
+
+def _iso(dias):
+    return (datetime.now().date() + timedelta(days=dias)).isoformat()
+
+
+def _responder(monkeypatch, *respuestas):
+    respuestas = iter(respuestas)
+    monkeypatch.setattr("builtins.input", lambda _: next(respuestas))
+
+
+@pytest.mark.parametrize("delimitador, extension", [(",", "csv"), ("\t", "tsv")])
+def test_csv_y_tsv_se_leen_de_vuelta(tmp_path, delimitador, extension):
+    total = Evidencia_Tres.exportar_registros_a_csv(iter(FILAS), "2030-03", delimitador, str(tmp_path))
+    ruta = tmp_path / f"Reporte_Reservaciones_2030-03.{extension}"
+    assert total == len(FILAS) and ruta.exists()
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        filas = list(csv.reader(archivo, delimiter=delimitador))
+    assert filas[0] == Evidencia_Tres.ENCABEZADOS
+    assert filas[1:] == [[str(valor) for valor in fila] for fila in FILAS]
+
+
+def test_excel_en_modo_write_only_se_lee_de_vuelta(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    assert Evidencia_Tres.exportar_registros_a_excel((fila for fila in FILAS), "", str(tmp_path)) == len(FILAS)
+    libro = openpyxl.load_workbook(tmp_path / "Reporte_Reservaciones_todos.xlsx", read_only=True)
+    hoja = libro["Reservaciones"]
+    filas = list(hoja.iter_rows(values_only=True))
+    libro.close()
+    assert list(filas[0]) == Evidencia_Tres.ENCABEZADOS
+    assert filas[1:] == FILAS
+
+
+def test_exportar_la_base_vacia_no_crea_archivos(base_con_datos, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    _responder(monkeypatch, "1", "2")
+    Evidencia_Tres.exportar_base_de_datos_a_excel()
+    _responder(monkeypatch, "2", datetime.now().strftime("%d/%m/%Y"), "3")
+    Evidencia_Tres.exportar_base_de_datos_a_excel()
+    salida = capsys.readouterr().out
+    assert "No hay reservaciones en la base de datos." in salida
+    assert "No hay reservaciones para esa fecha." in salida
+    assert not list(tmp_path.glob("Reporte_Reservaciones_*"))
+
+
+@pytest.mark.parametrize("formato, extension", [("2", "csv"), ("3", "tsv"), ("1", "xlsx")])
+def test_exportar_la_base_en_el_formato_elegido(base_con_datos, tmp_path, monkeypatch, formato, extension):
+    if extension == "xlsx":
+        pytest.importorskip("openpyxl")
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.executemany("INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                         "VALUES (1, ?, 'Clase', 'M', ?)", [(1, _iso(5)), (2, _iso(6))])
+    monkeypatch.chdir(tmp_path)
+    _responder(monkeypatch, "1", formato)
+    Evidencia_Tres.exportar_base_de_datos_a_excel()
+    assert [p.name for p in tmp_path.glob("Reporte_Reservaciones_*")] == [f"Reporte_Reservaciones_todas.{extension}"]
+    if extension != "xlsx":
+        with open(tmp_path / f"Reporte_Reservaciones_todas.{extension}", newline="", encoding="utf-8") as archivo:
+            filas = list(csv.reader(archivo, delimiter="," if extension == "csv" else "\t"))
+        assert [fila[5] for fila in filas[1:]] == [_iso(5), _iso(6)]
@@ -0,0 +1,45 @@
+# encoding: utf-8
+from datetime import datetime, timedelta
+
+import conexiones
+import Evidencia_Tres
+
+
+def _iso(dias):
+    return (datetime.now().date() + timedelta(days=dias)).isoformat()
+
+
+def _insertar(filas):
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.executemany("INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                         "VALUES (?, ?, ?, ?, ?)", filas)
+
+
+def _fechas(cliente, proximas, **kwargs):
+    return [(r[5], r[6]) for r in Evidencia_Tres.iterar_reservaciones_cliente(cliente, proximas, **kwargs)]
+
+
+def test_proximas_y_pasadas_de_un_cliente(base_con_datos):
+    _insertar([(1, 1, "Lejana", "M", _iso(10)), (1, 2, "Hoy", "V", _iso(0)), (1, 1, "Cercana", "N", _iso(3)),
+               (1, 1, "Ayer", "M", _iso(-1)), (1, 3, "Antigua", "M", _iso(-20)),
+               (2, 1, "De Luis", "V", _iso(3)), (2, 2, "De Luis", "V", _iso(-1))])
+    assert _fechas(1, True) == [(_iso(0), "Hoy"), (_iso(3), "Cercana"), (_iso(10), "Lejana")]
+    assert _fechas(1, False) == [(_iso(-1), "Ayer"), (_iso(-20), "Antigua")]
+    assert _fechas(1, False, tamano_bloque=1) == _fechas(1, False)
+    assert _fechas(2, True) == [(_iso(3), "De Luis")]
+    assert _fechas(3, True) == _fechas(3, False) == []
+
+
+def test_pasadas_incluyen_el_archivo(base_con_datos):
+    _insertar([(1, 1, "Archivada", "M", _iso(-400)), (1, 2, "Archivada antes", "M", _iso(-500)),
+               (2, 1, "De Luis", "V", _iso(-450)), (1, 1, "Reciente", "V", _iso(-2)),
+               (1, 1, "Próxima", "N", _iso(4))])
+    assert Evidencia_Tres.archivar_reservaciones(_iso(-100)) == 3
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM ReservacionesArchivo").fetchone()[0] == 3
+    assert _fechas(1, False) == [(_iso(-2), "Reciente"), (_iso(-400), "Archivada"),
+                                 (_iso(-500), "Archivada antes")]
+    assert _fechas(1, True) == [(_iso(4), "Próxima")]
+    assert _fechas(2, False) == [(_iso(-450), "De Luis")]
+    filas = list(Evidencia_Tres.iterar_reservaciones_cliente(1, False))
+    assert filas[1] == (filas[1][0], "Ana", 1, "Sala Azul", "M", _iso(-400), "Archivada")
@@ -0,0 +1,65 @@
+# encoding: utf-8
+import sqlite3
+
+import conexiones
+import Evidencia_Tres
+import importar
+
+
+def test_jsonl_con_lineas_invalidas(base_vacia, tmp_path, capsys):
+    ruta = tmp_path / "salas.jsonl"
+    ruta.write_text('{"nombre": "Sala A", "capacidad": 10}\n'
+                    '[1, 2]\n'
+                    '"texto"\n'
+                    '{no es json}\n'
+                    '\n'
+                    '{"nombre": "", "capacidad": 5}\n'
+                    '{"nombre": "Sala B", "capacidad": "0"}\n'
+                    '{"nombre": "Sala C", "capacidad": "7"}\n', encoding="utf-8")
+    claves = tmp_path / "claves.csv"
+    resumen = importar.importar(str(ruta), "salas", tamano_lote=1, salida_claves=str(claves))
+    assert (resumen["leidas"], resumen["insertadas"], resumen["invalidas"]) == (7, 2, 5)
+    assert "Línea 2: Cada línea debe ser un objeto JSON" in capsys.readouterr().out
+    assert claves.read_text(encoding="utf-8").splitlines()[1:] == [
+        f"1,Sala A,{resumen['primera_clave']}", f"8,Sala C,{resumen['ultima_clave']}"]
+
+
+def test_csv_de_usuarios(base_vacia, tmp_path):
+    ruta = tmp_path / "clientes.csv"
+    ruta.write_text("nombre\nAna\n  \nLuis\n", encoding="utf-8")
+    resumen = importar.importar(str(ruta), "usuarios")
+    assert (resumen["insertadas"], resumen["invalidas"]) == (2, 1)
+
+
+def test_main_migra_una_base_anterior(base_34, tmp_path, capsys):
+    ruta = tmp_path / "salas.csv"
+    ruta.write_text("nombre,capacidad\nSala Nueva,12\n", encoding="utf-8")
+    importar.main(["salas", str(ruta)])
+    with sqlite3.connect(base_34) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == Evidencia_Tres.ESQUEMA_VERSION
+        assert conn.execute("SELECT COUNT(*) FROM Salas WHERE nombre = 'Sala Nueva'").fetchone()[0] == 1
+    assert "Filas insertadas: 1" in capsys.readouterr().out
+
+    importar.main(["salas", str(ruta)])  # ya migrada: preparar_base no vuelve a ejecutar el DDL
+    assert "Tablas creadas" not in capsys.readouterr().out
+
+
+def test_un_lote_bloqueado_se_reintenta(base_vacia, tmp_path, monkeypatch):
+    bloqueos = []
+
+    def en_transaccion_ocupada(db_file, operacion):
+        def primero_bloqueado(conn):
+            if not bloqueos:
+                bloqueos.append(db_file)
+                raise sqlite3.OperationalError("database is locked")
+            return operacion(conn)
+        return conexiones.en_transaccion(db_file, primero_bloqueado)
+
+    monkeypatch.setattr(importar, "en_transaccion", en_transaccion_ocupada)
+    ruta = tmp_path / "clientes.csv"
+    ruta.write_text("nombre\nAna\nLuis\nEva\n", encoding="utf-8")
+    resumen = importar.importar(str(ruta), "usuarios", tamano_lote=2)
+    assert bloqueos == [Evidencia_Tres.DB_FILE]
+    assert (resumen["insertadas"], resumen["primera_clave"], resumen["ultima_clave"]) == (3, 1, 3)
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        assert conn.execute("SELECT nombre FROM Usuarios ORDER BY clave").fetchall() == [("Ana",), ("Luis",), ("Eva",)]
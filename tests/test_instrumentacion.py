@@ -0,0 +1,125 @@
+# encoding: utf-8
+import io
+import json
+import sqlite3
+import types
+
+import pytest
+
+import conexiones
+import Evidencia_Tres
+import instrumentacion
+
+
+@pytest.fixture
+def instrumentado(base_con_datos, monkeypatch):
+    """Instrumentación activa con métricas vacías; al terminar todo vuelve a como estaba."""
+    monkeypatch.setattr(instrumentacion, "_activo", False)
+    monkeypatch.setattr(instrumentacion, "_ruta_traza", None)
+    monkeypatch.setattr(conexiones, "FABRICA_CONEXION", conexiones.FABRICA_CONEXION)
+    for nombre in ("_sentencias", "_operaciones"):
+        metricas = getattr(instrumentacion, nombre)
+        monkeypatch.setattr(instrumentacion, nombre, type(metricas)(metricas.default_factory))
+    monkeypatch.setattr(instrumentacion, "_eventos", [])
+    monkeypatch.setattr(instrumentacion.atexit, "register", lambda funcion: None)
+    yield base_con_datos
+    conexiones.cerrar_todas()
+
+
+def _modulo_de_prueba():
+    """Un módulo con una operación normal y una generadora, para no envolver Evidencia_Tres."""
+    modulo = types.ModuleType("modulo_de_prueba")
+
+    def nombres_de_salas():
+        with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+            return [fila[0] for fila in conn.execute("SELECT nombre FROM Salas ORDER BY clave").fetchall()]
+
+    def recorrer_clientes():
+        with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+            for fila in conn.execute("SELECT clave, nombre FROM Usuarios ORDER BY clave"):
+                yield fila
+
+    for funcion in (nombres_de_salas, recorrer_clientes):
+        funcion.__module__ = modulo.__name__
+        setattr(modulo, funcion.__name__, funcion)
+    return modulo
+
+
+def _abrir_conexion():
+    # la primera conexión del pool ejecuta los PRAGMAS; se abre antes para no contarlos en la operación
+    with conexiones.conexion(Evidencia_Tres.DB_FILE):
+        pass
+
+
+def test_cuenta_ejecuciones_filas_y_tiempo_por_sentencia(instrumentado):
+    modulo = _modulo_de_prueba()
+    instrumentacion.activar(modulo)
+    _abrir_conexion()
+    assert modulo.nombres_de_salas() == ["Sala Azul", "Sala Roja", "Auditorio"]
+    modulo.nombres_de_salas()
+
+    datos = instrumentacion.resumen()
+    sentencia = datos["sentencias"]["SELECT nombre FROM Salas ORDER BY clave"]
+    assert (sentencia["ejecuciones"], sentencia["filas"]) == (2, 6) and sentencia["ms"] >= 0
+    operacion = datos["operaciones"]["nombres_de_salas"]
+    assert (operacion["llamadas"], operacion["consultas"], operacion["filas"]) == (2, 2, 6)
+    assert operacion["ms"] >= operacion["ms_sql"] >= 0
+
+
+def test_un_generador_se_mide_mientras_se_consume(instrumentado):
+    modulo = _modulo_de_prueba()
+    instrumentacion.activar(modulo)
+    _abrir_conexion()
+    recorrido = modulo.recorrer_clientes()
+    assert instrumentacion.resumen()["operaciones"]["recorrer_clientes"]["consultas"] == 0  # aún sin consumir
+    assert [nombre for _, nombre in recorrido] == ["Ana", "Luis"]
+
+    datos = instrumentacion.resumen()
+    assert datos["sentencias"]["SELECT clave, nombre FROM Usuarios ORDER BY clave"]["filas"] == 2
+    operacion = datos["operaciones"]["recorrer_clientes"]
+    assert (operacion["consultas"], operacion["filas"]) == (1, 2)
+    assert datos["operaciones"]["recorrer_clientes (recorrido)"]["llamadas"] == 1
+
+
+def test_volcar_escribe_la_traza_json(instrumentado, tmp_path):
+    ruta = tmp_path / "traza.json"
+    modulo = _modulo_de_prueba()
+    instrumentacion.activar(modulo, traza=str(ruta))
+    modulo.nombres_de_salas()
+    salida = io.StringIO()
+    instrumentacion.volcar(salida)
+
+    assert "Perfil de la sesión" in salida.getvalue() and str(ruta) in salida.getvalue()
+    traza = json.loads(ruta.read_text(encoding="utf-8"))
+    assert traza["operaciones"]["nombres_de_salas"]["llamadas"] == 1
+    assert traza["sentencias"]["SELECT nombre FROM Salas ORDER BY clave"]["filas"] == 3
+    tipos = {(e["tipo"], e["nombre"]) for e in traza["eventos"]}
+    assert ("operacion", "nombres_de_salas") in tipos
+    assert ("sql", "SELECT nombre FROM Salas ORDER BY clave") in tipos
+    assert traza["eventos_descartados"] == 0
+
+
+def test_apagada_no_envuelve_conexiones_ni_funciones(base_con_datos, monkeypatch):
+    monkeypatch.delenv("RESERVAS_PERFIL", raising=False)
+    assert not instrumentacion.habilitado_por_entorno() and not instrumentacion.activa()
+    assert conexiones.FABRICA_CONEXION is sqlite3.Connection
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        assert type(conn) is sqlite3.Connection
+        assert type(conn.cursor()) is sqlite3.Cursor
+    publicas = [f for n, f in vars(Evidencia_Tres).items() if not n.startswith("_") and callable(f)]
+    assert not any(getattr(f, "_instrumentada", False) for f in publicas)
+
+
+def test_sentencias_con_el_mismo_prefijo_largo_no_se_mezclan(instrumentado):
+    instrumentacion.activar()
+    columnas = ", ".join(f"r.folio AS folio_{i}" for i in range(12))
+    prefijo = (f"SELECT {columnas}, u.nombre, s.nombre FROM Reservaciones r "
+               "JOIN Usuarios u ON u.clave = r.cliente_clave JOIN Salas s ON s.clave = r.sala_clave")
+    assert len(prefijo) > instrumentacion.LARGO_SQL_TRAZA
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.execute(prefijo + " WHERE r.folio = 1").fetchall()
+        conn.execute(prefijo + " WHERE r.folio = 2").fetchall()
+        conn.execute(prefijo + " WHERE r.folio = 2").fetchall()
+    sentencias = instrumentacion.resumen()["sentencias"]
+    assert sentencias[" ".join((prefijo + " WHERE r.folio = 1").split())]["ejecuciones"] == 1
+    assert sentencias[" ".join((prefijo + " WHERE r.folio = 2").split())]["ejecuciones"] == 2
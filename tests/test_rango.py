@@ -0,0 +1,74 @@
+# encoding: utf-8
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import Evidencia_Tres
+
+
+def _iso(dias):
+    return (datetime.now().date() + timedelta(days=dias)).isoformat()
+
+
+def _insertar(filas):
+    with sqlite3.connect(Evidencia_Tres.DB_FILE) as conn:
+        conn.executemany("INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                         "VALUES (?, ?, ?, ?, ?)", filas)
+
+
+OCUPADOS = [(1, _iso(3), "M"), (1, _iso(4), "M"), (1, _iso(5), "M"),
+            (2, _iso(4), "V"), (3, _iso(5), "N"), (3, _iso(9), "N")]  # la última queda fuera del rango
+
+
+@pytest.fixture
+def base_ocupada(base_con_datos):
+    _insertar([(1, sala, "Evento", turno, fecha) for sala, fecha, turno in OCUPADOS])
+    return base_con_datos
+
+
+def _esperados(salas, fechas, turnos=Evidencia_Tres.TURNOS):
+    return [(c, n, f, t) for c, n in salas for f in fechas for t in turnos if (c, f, t) not in OCUPADOS]
+
+
+def test_libres_en_un_rango_de_varios_dias(base_ocupada):
+    fechas = [_iso(d) for d in (3, 4, 5)]
+    matriz = Evidencia_Tres.disponibilidad_rango(fechas[0], fechas[-1])
+    salas = [(1, "Sala Azul"), (2, "Sala Roja"), (3, "Auditorio")]
+    assert matriz.fechas == fechas
+    assert list(matriz.libres()) == _esperados(salas, fechas)
+    assert list(matriz.libres(fechas[1], "V")) == [(1, "Sala Azul", fechas[1], "V"), (3, "Auditorio", fechas[1], "V")]
+    assert matriz.ocupado(3, fechas[2], "N") and not matriz.ocupado(3, fechas[1], "N")
+
+
+def test_salas_libres_en_todas_las_fechas(base_ocupada):
+    matriz = Evidencia_Tres.disponibilidad_rango(_iso(3), _iso(5))
+    assert [s[0] for s in matriz.salas_libres_en_todas("M")] == [2, 3]
+    assert [s[0] for s in matriz.salas_libres_en_todas("N")] == [1, 2]
+    assert [s[0] for s in matriz.salas_libres_en_todas("N", [_iso(3), _iso(4)])] == [1, 2, 3]
+    dia = datetime.fromisoformat(_iso(4)).weekday()
+    assert matriz.fechas_por_dia_semana(dia) == [_iso(4)]
+
+
+def test_capacidad_minima_deja_fuera_las_salas_chicas(base_ocupada):
+    fechas = [_iso(d) for d in (3, 4, 5)]
+    matriz = Evidencia_Tres.disponibilidad_rango(fechas[0], fechas[-1], capacidad_minima=20)
+    assert [s[0] for s in matriz.salas] == [2, 3]
+    assert list(matriz.libres()) == _esperados([(2, "Sala Roja"), (3, "Auditorio")], fechas)
+    assert [s[0] for s in matriz.salas_libres_en_todas("M")] == [2, 3]
+    assert Evidencia_Tres.disponibilidad_rango(fechas[0], fechas[-1], capacidad_minima=1000).salas == []
+
+
+def test_un_solo_dia_y_rango_invertido(base_ocupada):
+    matriz = Evidencia_Tres.disponibilidad_rango(_iso(5), _iso(5))
+    assert list(matriz.libres()) == _esperados([(1, "Sala Azul"), (2, "Sala Roja"), (3, "Auditorio")], [_iso(5)])
+    with pytest.raises(ValueError):
+        Evidencia_Tres.disponibilidad_rango(_iso(5), _iso(3))
+
+
+def test_rango_con_reservaciones_archivadas(base_con_datos):
+    _insertar([(1, 1, "Pasado", "M", _iso(-400)), (1, 3, "Pasado", "V", _iso(-399))])
+    assert Evidencia_Tres.archivar_reservaciones(_iso(-1)) == 2
+    matriz = Evidencia_Tres.disponibilidad_rango(_iso(-401), _iso(-399))
+    assert matriz.ocupado(1, _iso(-400), "M") and matriz.ocupado(3, _iso(-399), "V")
+    assert len(list(matriz.libres())) == 3 * 3 * len(Evidencia_Tres.TURNOS) - 2
@@ -0,0 +1,61 @@
+# encoding: utf-8
+from datetime import datetime, timedelta
+
+import conexiones
+import Evidencia_Tres
+
+
+def _fecha(dias):
+    return (datetime.now().date() + timedelta(days=dias)).strftime("%d/%m/%Y")
+
+
+def _iso(dias):
+    return (datetime.now().date() + timedelta(days=dias)).isoformat()
+
+
+def _claves(salas):
+    return [s[0] for s in salas]
+
+
+def test_la_sala_mas_chica_que_alcanza_va_primero(base_con_datos):
+    # Sala Azul 10, Sala Roja 20, Auditorio 100
+    assert _claves(Evidencia_Tres.recomendar_salas(15, _iso(5), "M")) == [2, 3]
+    assert _claves(Evidencia_Tres.recomendar_salas(10, _iso(5), "M")) == [1, 2, 3]
+    assert _claves(Evidencia_Tres.recomendar_salas(1, _iso(5), "M", cantidad=2)) == [1, 2]
+    assert Evidencia_Tres.recomendar_salas(101, _iso(5), "M") == []
+
+
+def test_empates_de_capacidad_por_clave():
+    indice = Evidencia_Tres.IndiceCapacidad([(3, "C", 20), (1, "A", 20), (2, "B", 5)])
+    assert _claves(indice.desde(6)) == [1, 3]
+    assert _claves(indice.desde(0)) == [2, 1, 3]
+    assert list(indice.desde(21)) == [] and len(indice) == 3
+
+
+def test_excluye_los_espacios_ocupados(base_con_datos):
+    assert _claves(Evidencia_Tres.recomendar_salas(15, _iso(5), "M")) == [2, 3]
+    resultados = Evidencia_Tres.registrar_reservaciones_lote([(1, 2, "Clase", "M", _fecha(5))])
+    assert resultados[0][0] == Evidencia_Tres.ACEPTADA
+    assert _claves(Evidencia_Tres.recomendar_salas(15, _iso(5), "M")) == [3]
+    assert _claves(Evidencia_Tres.recomendar_salas(15, _iso(5), "V")) == [2, 3]
+    assert _claves(Evidencia_Tres.recomendar_salas(15, _iso(6), "M")) == [2, 3]
+
+
+def test_los_espacios_archivados_siguen_ocupados(base_con_datos):
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.executemany("INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                         "VALUES (1, ?, 'Pasado', 'M', ?)", [(2, _iso(-400)), (3, _iso(-399))])
+    assert Evidencia_Tres.archivar_reservaciones(_iso(-1)) == 2
+    libres = [c for c, _, t in Evidencia_Tres.disponibilidad_por_fecha(_iso(-400)) if t == "M" and c != 1]
+    assert _claves(Evidencia_Tres.recomendar_salas(15, _iso(-400), "M")) == libres == [3]  # Sala Azul no alcanza
+    assert _claves(Evidencia_Tres.recomendar_salas(15, _iso(-399), "M")) == [2]
+    assert Evidencia_Tres.espacios_ocupados(_iso(-400)) == {(2, "M")}
+
+
+def test_el_indice_se_rehace_al_agregar_una_sala(base_con_datos):
+    antes = Evidencia_Tres.indice_capacidad()
+    assert Evidencia_Tres.indice_capacidad() is antes
+    assert _claves(Evidencia_Tres.recomendar_salas(12, _iso(5), "N")) == [2, 3]
+    clave = Evidencia_Tres.agregar_sala("Sala Media", 12)
+    assert Evidencia_Tres.indice_capacidad() is not antes and len(Evidencia_Tres.indice_capacidad()) == 4
+    assert _claves(Evidencia_Tres.recomendar_salas(12, _iso(5), "N")) == [clave, 2, 3]
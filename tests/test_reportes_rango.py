@@ -0,0 +1,59 @@
+# encoding: utf-8
+import csv
+from datetime import datetime, timedelta
+
+import pytest
+
+import conexiones
+import Evidencia_Tres
+import reportes_rango
+
+
+def _iso(dias):
+    return (datetime.now().date() + timedelta(days=dias)).isoformat()
+
+
+@pytest.fixture
+def base_de_varios_dias(base_con_datos):
+    # 3, 1, 0 y 5 reservaciones en los días 3, 4, 5 y 6; el día 8 queda fuera del rango
+    filas = [(1, sala, f"E{dia}{sala}{turno}", turno, _iso(dia))
+             for dia, n in ((3, 3), (4, 1), (6, 5), (8, 2))
+             for sala, turno in [(s, t) for s in (1, 2, 3) for t in Evidencia_Tres.TURNOS][:n]]
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.executemany("INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                         "VALUES (?, ?, ?, ?, ?)", filas)
+    return base_con_datos
+
+
+def _leer(ruta):
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        return list(csv.reader(archivo))
+
+
+@pytest.mark.parametrize("procesos", [1, 2])
+def test_un_archivo_por_dia_con_sus_filas(base_de_varios_dias, tmp_path, procesos):
+    directorio = tmp_path / "reportes"
+    resumen = reportes_rango.generar_reportes(_iso(3), _iso(7), procesos, str(directorio), "csv", tamano_pagina=2)
+    assert resumen["errores"] == []
+    assert [(a["fecha"], a["filas"]) for a in resumen["archivos"]] == [(_iso(3), 3), (_iso(4), 1), (_iso(6), 5)]
+    assert sorted(p.name for p in directorio.iterdir()) == [
+        f"Reporte_Reservaciones_{_iso(d)}.csv" for d in (3, 4, 6)]
+    for a in resumen["archivos"]:
+        filas = _leer(a["archivo"])
+        assert filas[0] == Evidencia_Tres.ENCABEZADOS
+        assert len(filas) - 1 == a["filas"]
+        assert {f[5] for f in filas[1:]} == {a["fecha"]}
+
+
+def test_rango_sin_reservaciones_no_escribe_archivos(base_de_varios_dias, tmp_path, capsys):
+    directorio = tmp_path / "vacio"
+    resumen = reportes_rango.generar_reportes(_iso(20), _iso(25), 1, str(directorio), "tsv")
+    assert resumen["archivos"] == [] and resumen["errores"] == []
+    assert list(directorio.iterdir()) == []
+    reportes_rango.imprimir_resumen(resumen)
+    assert "No hay reservaciones" in capsys.readouterr().out
+
+
+def test_dias_del_rango_agrupa_por_fecha(base_de_varios_dias):
+    dias = [(fecha, len(filas)) for fecha, filas in reportes_rango.dias_del_rango(_iso(0), _iso(10), 4)]
+    assert dias == [(_iso(3), 3), (_iso(4), 1), (_iso(6), 5), (_iso(8), 2)]
@@ -0,0 +1,204 @@
+# encoding: utf-8
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import conexiones
+import Evidencia_Tres
+
+
+def _fecha(dias):
+    return (datetime.now().date() + timedelta(days=dias)).strftime("%d/%m/%Y")
+
+
+def _iso(dias):
+    return (datetime.now().date() + timedelta(days=dias)).isoformat()
+
+
+def _insertar_directo(filas):
+    """Inserta (cliente, sala, nombre, horario, fecha_iso) sin reglas de negocio, p. ej. fechas pasadas."""
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        conn.executemany("INSERT INTO Reservaciones (cliente_clave, sala_clave, nombre, horario, fecha) "
+                         "VALUES (?, ?, ?, ?, ?)", filas)
+
+
+def test_insertar_si_libre_un_solo_ganador_entre_hilos(base_con_datos):
+    hilos = 8
+    barrera = threading.Barrier(hilos)
+    folios = []
+
+    def reservar(cliente):
+        barrera.wait()
+        folios.append(conexiones.en_transaccion(Evidencia_Tres.DB_FILE, lambda conn: (
+            Evidencia_Tres._insertar_si_libre(conn, cliente, 1, f"Evento {cliente}", "M", _iso(5)))))
+
+    trabajadores = [threading.Thread(target=reservar, args=(1 + i % 2,)) for i in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    assert len(folios) == hilos
+    assert len([f for f in folios if f is not None]) == 1
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM Reservaciones").fetchone()[0] == 1
+
+
+def test_insertar_si_libre_otro_turno_u_otra_sala_si_entra(base_con_datos):
+    def insertar(sala, horario):
+        return conexiones.en_transaccion(Evidencia_Tres.DB_FILE, lambda conn: (
+            Evidencia_Tres._insertar_si_libre(conn, 1, sala, "Clase", horario, _iso(5))))
+
+    assert insertar(1, "M") is not None
+    assert insertar(1, "M") is None
+    assert insertar(1, "V") is not None
+    assert insertar(2, "M") is not None
+
+
+def test_indice_unico_rechaza_un_espacio_repetido(base_con_datos):
+    _insertar_directo([(1, 1, "Uno", "M", _iso(5))])
+    with pytest.raises(sqlite3.IntegrityError):
+        _insertar_directo([(2, 1, "Dos", "M", _iso(5))])
+
+
+def test_registrar_reservaciones_lote(base_con_datos):
+    resultados = Evidencia_Tres.registrar_reservaciones_lote([
+        (1, 1, "Clase", "M", _fecha(5)),
+        (2, 1, "Choque", "m", _fecha(5)),        # mismo espacio dentro del lote
+        (1, 2, "Tarde", "V", _fecha(5)),
+        (1, 99, "Sin sala", "M", _fecha(5)),
+        (1, 1, "Muy pronto", "M", _fecha(1)),
+        (1, 1, None, "M", _fecha(6)),
+        (1, 1, "Horario raro", 3, _fecha(6)),
+        (1, 1, "Fecha imposible", "N", "31/02/2030"),
+    ])
+    estados = [estado for estado, _ in resultados]
+    assert estados == [Evidencia_Tres.ACEPTADA, Evidencia_Tres.CONFLICTO, Evidencia_Tres.ACEPTADA,
+                       Evidencia_Tres.INVALIDA, Evidencia_Tres.INVALIDA, Evidencia_Tres.INVALIDA,
+                       Evidencia_Tres.INVALIDA, Evidencia_Tres.INVALIDA]
+
+
+def test_validar_solicitud_campos_que_no_son_texto():
+    limite = _iso(2)
+    assert Evidencia_Tres.validar_solicitud((1, 1, 123, "M", _fecha(5)), limite)[0] == Evidencia_Tres.INVALIDA
+    assert Evidencia_Tres.validar_solicitud((1, 1, "Clase", None, _fecha(5)), limite)[0] == Evidencia_Tres.INVALIDA
+    assert Evidencia_Tres.validar_solicitud((1, 1, "Clase", "m", _fecha(5)), limite) == (
+        None, (1, 1, "Clase", "M", _iso(5)))
+
+
+def test_archivar_conserva_ocupacion_y_reporte(base_con_datos):
+    pasadas = [(1, sala, f"Pasado {sala}", "M", _iso(-400)) for sala in (1, 2, 3)]
+    _insertar_directo(pasadas + [(2, 1, "Futuro", "V", _iso(10))])
+    antes = Evidencia_Tres.ocupacion_diaria(_iso(-400))
+
+    assert Evidencia_Tres.archivar_reservaciones(_iso(-1)) == 3
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM Reservaciones").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM ReservacionesArchivo").fetchone()[0] == 3
+    assert Evidencia_Tres.ocupacion_diaria(_iso(-400)) == antes
+    assert len(Evidencia_Tres.reservaciones_por_fecha(_iso(-400))) == 3
+    with pytest.raises(ValueError):
+        Evidencia_Tres.archivar_reservaciones(_iso(1))
+
+
+def test_ocupacion_diaria_por_sala(base_con_datos):
+    _insertar_directo([(1, 1, "A", "M", _iso(5)), (1, 2, "B", "M", _iso(5)), (1, 2, "C", "N", _iso(5))])
+    todas = {t: n for t, n, _, _ in Evidencia_Tres.ocupacion_diaria(_iso(5))}
+    sala_2 = {t: n for t, n, _, _ in Evidencia_Tres.ocupacion_diaria(_iso(5), 2)}
+    assert todas == {"M": 2, "V": 0, "N": 1}
+    assert sala_2 == {"M": 1, "V": 0, "N": 1}
+
+
+def _ocupacion_de(fecha_iso, sala_clave, horario):
+    with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+        fila = conn.execute("SELECT reservadas FROM OcupacionDiaria WHERE fecha = ? AND sala_clave = ? AND horario = ?",
+                            (fecha_iso, sala_clave, horario)).fetchone()
+    return fila[0] if fila else None
+
+
+def test_ocupacion_mensual_por_sala_y_turno(base_con_datos):
+    _insertar_directo([(1, 1, "A", "M", "2030-03-01"), (1, 1, "B", "M", "2030-03-31"),
+                       (2, 3, "C", "N", "2030-03-15"), (2, 3, "D", "N", "2030-04-01")])
+    marzo = {(c, t): (n, dias, tasa) for c, _, t, n, dias, tasa in Evidencia_Tres.ocupacion_mensual("2030-03")}
+    assert len(marzo) == 3 * len(Evidencia_Tres.TURNOS)
+    assert marzo[(1, "M")] == (2, 31, 2 / 31)
+    assert marzo[(3, "N")] == (1, 31, 1 / 31)
+    assert marzo[(2, "V")] == (0, 31, 0.0)
+    abril = {(c, t): n for c, _, t, n, _, _ in Evidencia_Tres.ocupacion_mensual("2030-04")}
+    assert abril[(3, "N")] == 1 and sum(abril.values()) == 1
+
+
+def test_modificar_un_espacio_mueve_la_ocupacion(base_con_datos):
+    _insertar_directo([(1, 1, "Clase", "M", "2030-03-10"), (2, 2, "Otra", "M", "2030-03-10")])
+    cambios = (("fecha", "2030-04-02"), ("sala_clave", 3), ("horario", "N"))
+    anterior = ("2030-03-10", 1, "M")
+    for columna, valor in cambios:
+        with conexiones.conexion(Evidencia_Tres.DB_FILE) as conn:
+            conn.execute(f"UPDATE Reservaciones SET {columna} = ? WHERE folio = 1", (valor,))
+        actual = {"fecha": (valor, anterior[1], anterior[2]), "sala_clave": (anterior[0], valor, anterior[2]),
+                  "horario": (anterior[0], anterior[1], valor)}[columna]
+        assert _ocupacion_de(*anterior) == 0 and _ocupacion_de(*actual) == 1
+        anterior = actual
+    assert _ocupacion_de("2030-03-10", 2, "M") == 1  # la otra reservación no se toca
+    meses = {(c, t): n for c, _, t, n, _, _ in Evidencia_Tres.ocupacion_mensual("2030-03")}
+    assert meses[(1, "M")] == 0 and meses[(2, "M")] == 1
+    assert {(c, t): n for c, _, t, n, _, _ in Evidencia_Tres.ocupacion_mensual("2030-04") if n} == {(3, "N"): 1}
+
+
+def test_eliminar_baja_la_ocupacion_hasta_cero(base_con_datos):
+    [(_, folio)] = Evidencia_Tres.registrar_reservaciones_lote([(1, 2, "Clase", "V", _fecha(5))])
+    assert Evidencia_Tres.ocupacion_diaria(_iso(5), 2)[1][:2] == ("V", 1)
+    assert Evidencia_Tres.cancelar_reservacion(folio)[0] == Evidencia_Tres.ELIMINADA
+    assert _ocupacion_de(_iso(5), 2, "V") == 0
+    assert Evidencia_Tres.ocupacion_diaria(_iso(5)) == [(t, 0, 3, 0.0) for t in Evidencia_Tres.TURNOS]
+    mes = {(c, t): n for c, _, t, n, _, _ in Evidencia_Tres.ocupacion_mensual(_iso(5)[:7])}
+    assert mes[(2, "V")] == 0
+
+
+def test_paginas_por_llave_igual_al_recorrido_completo(base_con_datos):
+    filas = [(1, sala, f"E{dia}-{sala}-{turno}", turno, _iso(dia))
+             for dia in range(3, 9) for sala in (1, 2, 3) for turno in Evidencia_Tres.TURNOS]
+    _insertar_directo(filas)
+    completas = list(Evidencia_Tres.iterar_reservaciones())
+    paginas = list(Evidencia_Tres.paginas_reservaciones(tamano_pagina=7))
+    assert [len(p) for p in paginas[:-1]] == [7] * (len(paginas) - 1)
+    assert [f for p in paginas for f in p] == completas
+    assert len(completas) == len(filas)
+
+    mitad = len(completas) // 2
+    desde = Evidencia_Tres.llave_pagina(completas[mitad])
+    resto = [f for p in Evidencia_Tres.paginas_reservaciones(tamano_pagina=5, desde=desde) for f in p]
+    assert resto == completas[mitad + 1:]
+
+    rango = [f for p in Evidencia_Tres.paginas_reservaciones(_iso(4), _iso(5), 4) for f in p]
+    assert rango == [f for f in completas if _iso(4) <= f[5] <= _iso(5)]
+
+
+def test_reporte_del_menu_lee_por_paginas(base_con_datos, monkeypatch, capsys):
+    _insertar_directo([(1, sala, f"E{sala}{turno}", turno, _iso(5))
+                       for sala in (1, 2, 3) for turno in Evidencia_Tres.TURNOS])
+    monkeypatch.setattr(Evidencia_Tres, "TAMANO_PAGINA", 4)
+    paginas = []
+    original = Evidencia_Tres.paginas_reservaciones
+
+    def paginas_espiadas(*args):
+        for pagina in original(*args):
+            paginas.append(len(pagina))
+            yield pagina
+
+    def no_usar(*args):
+        raise AssertionError("el menú no debe cargar la fecha completa")
+
+    exportadas = []
+    monkeypatch.setattr(Evidencia_Tres, "paginas_reservaciones", paginas_espiadas)
+    monkeypatch.setattr(Evidencia_Tres, "reservaciones_por_fecha", no_usar)
+    monkeypatch.setattr(Evidencia_Tres, "exportar_registros_a_excel",
+                        lambda registros, etiqueta: exportadas.extend(registros))
+    respuestas = iter([_fecha(5), "", "Q", "S"])
+    monkeypatch.setattr("builtins.input", lambda _: next(respuestas))
+
+    Evidencia_Tres.reporte_reservaciones_por_fecha()
+    filas = [l for l in capsys.readouterr().out.splitlines() if l[:1].isdigit()]
+    assert len(filas) == 8 and paginas[:2] == [4, 4]
+    assert exportadas == list(Evidencia_Tres.iterar_reservaciones(_iso(5))) and len(exportadas) == 9
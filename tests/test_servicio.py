@@ -0,0 +1,124 @@
+# encoding: utf-8
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import servicio
+
+
+async def _conversar(servicio_http, *peticiones):
+    """Envía peticiones HTTP crudas por una sola conexión y devuelve [(estado, cuerpo)] hasta que se cierre."""
+    servidor = await asyncio.start_server(servicio_http.atender, "127.0.0.1", 0)
+    puerto = servidor.sockets[0].getsockname()[1]
+    async with servidor:
+        reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+        writer.write(b"".join(peticiones))
+        await writer.drain()
+        respuestas = []
+        while True:
+            linea = await asyncio.wait_for(reader.readline(), 5)
+            if not linea:
+                break
+            cabeceras = {}
+            while (h := await reader.readline()) not in (b"\r\n", b""):
+                nombre, _, valor = h.decode("latin-1").partition(":")
+                cabeceras[nombre.strip().lower()] = valor.strip()
+            cuerpo = await reader.readexactly(int(cabeceras["content-length"]))
+            respuestas.append((int(linea.split()[1]), json.loads(cuerpo)))
+            if len(respuestas) == len(peticiones) or cabeceras.get("connection") == "close":
+                break
+        writer.close()
+        return respuestas
+
+
+@pytest.fixture
+def servicio_http(base_con_datos):
+    s = servicio.ServicioReservaciones(hilos_lectura=2, hilos_escritura=1)
+    yield s
+    s.cerrar()
+
+
+def _peticion(linea, cuerpo=b"", **cabeceras):
+    texto = linea + "\r\n" + "".join(f"{k.replace('_', '-')}: {v}\r\n" for k, v in cabeceras.items()) + "\r\n"
+    return texto.encode("latin-1") + cuerpo
+
+
+@pytest.mark.parametrize("longitud", ["abc", "-5", "1e3", "²"])
+def test_content_length_invalido_responde_400_y_cierra(servicio_http, longitud):
+    respuestas = asyncio.run(_conversar(
+        servicio_http,
+        _peticion("POST /reservaciones HTTP/1.1", b"{}", Content_Length=longitud),
+        _peticion("GET /metricas HTTP/1.1")))
+    assert respuestas == [(400, {"error": "Content-Length inválido."})]
+
+
+def test_errores_y_aciertos_con_la_misma_etiqueta(servicio_http):
+    fecha = (datetime.now().date() + timedelta(days=5)).strftime("%d/%m/%Y")
+    reserva = json.dumps({"cliente_clave": 1, "sala_clave": 1, "nombre": "Clase",
+                          "horario": "M", "fecha": fecha}).encode()
+    respuestas = asyncio.run(_conversar(
+        servicio_http,
+        _peticion(f"GET /disponibilidad?fecha={fecha} HTTP/1.1"),
+        _peticion("GET /disponibilidad?fecha=mañana HTTP/1.1"),
+        _peticion("POST /reservaciones HTTP/1.1", reserva, Content_Length=len(reserva)),
+        _peticion("POST /reservaciones HTTP/1.1", reserva, Content_Length=len(reserva)),
+        _peticion("POST /reservaciones HTTP/1.1", b"[]", Content_Length=2),
+        _peticion("DELETE /reservaciones/abc HTTP/1.1"),
+        _peticion("PUT /reporte HTTP/1.1"),
+        _peticion("GET /no-existe HTTP/1.1"),
+        _peticion("GET /metricas HTTP/1.1", Connection="close")))
+    assert [estado for estado, _ in respuestas] == [200, 400, 201, 409, 400, 400, 405, 404, 200]
+    latencias = respuestas[-1][1]["latencias"]
+    assert latencias["GET /disponibilidad"]["peticiones"] == 2
+    assert latencias["POST /reservaciones"]["peticiones"] == 3
+    assert latencias["DELETE /reservaciones/<folio>"]["peticiones"] == 1
+    assert latencias["PUT /reporte"]["peticiones"] == 1
+    assert latencias["GET (otra)"]["peticiones"] == 1
+
+
+def test_validacion_de_tipos_responde_400(servicio_http):
+    fecha = (datetime.now().date() + timedelta(days=5)).strftime("%d/%m/%Y")
+    reserva = json.dumps({"cliente_clave": 1, "sala_clave": 1, "nombre": ["x"],
+                          "horario": 7, "fecha": fecha}).encode()
+    respuestas = asyncio.run(_conversar(
+        servicio_http, _peticion("POST /reservaciones HTTP/1.1", reserva, Content_Length=len(reserva))))
+    assert respuestas[0][0] == 400
+
+
+def test_eliminar_distingue_folio_inexistente_y_plazo(servicio_http):
+    def reservar(dias):
+        fecha = (datetime.now().date() + timedelta(days=dias)).strftime("%d/%m/%Y")
+        cuerpo = json.dumps({"cliente_clave": 1, "sala_clave": 1, "nombre": "Clase",
+                             "horario": "M", "fecha": fecha}).encode()
+        return _peticion("POST /reservaciones HTTP/1.1", cuerpo, Content_Length=len(cuerpo))
+
+    respuestas = asyncio.run(_conversar(
+        servicio_http,
+        reservar(2),                                   # folio 1: dentro de la ventana de 3 días
+        reservar(10),                                  # folio 2
+        _peticion("DELETE /reservaciones/999 HTTP/1.1"),
+        _peticion("DELETE /reservaciones/1 HTTP/1.1"),
+        _peticion("DELETE /reservaciones/2 HTTP/1.1"),
+        _peticion("DELETE /reservaciones/2 HTTP/1.1")))
+    assert [estado for estado, _ in respuestas] == [201, 201, 404, 409, 200, 404]
+
+
+def test_cuerpo_demasiado_grande_responde_413_y_cierra(servicio_http):
+    respuestas = asyncio.run(_conversar(
+        servicio_http,
+        _peticion("POST /reservaciones HTTP/1.1", Content_Length=servicio.MAXIMO_CUERPO + 1),
+        _peticion("GET /metricas HTTP/1.1")))
+    assert [estado for estado, _ in respuestas] == [413]
+
+
+def test_fecha_en_iso_o_dd_mm_aaaa(servicio_http):
+    fecha = datetime.now().date() + timedelta(days=5)
+    respuestas = asyncio.run(_conversar(
+        servicio_http,
+        _peticion(f"GET /reporte?fecha={fecha.isoformat()} HTTP/1.1"),
+        _peticion(f"GET /reporte?fecha={fecha.strftime('%d/%m/%Y')} HTTP/1.1"),
+        _peticion("GET /reporte HTTP/1.1")))
+    assert [estado for estado, _ in respuestas] == [200, 200, 400]
+    assert respuestas[0][1] == respuestas[1][1] == {"fecha": fecha.isoformat(), "reservaciones": []}